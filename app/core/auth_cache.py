@@ -0,0 +1,130 @@
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas import user as user_schemas
+
+logger = logging.getLogger(__name__)
+
+
+class AuthCache:
+    """
+    Кэш данных авторизации (id, роль, время смены пароля) по id пользователя.
+
+    Первый уровень — TTL/LRU в памяти процесса, второй (AUTH_CACHE_REDIS) — общий
+    для всех воркеров Redis. Запись сбрасывается при изменении пользователя.
+
+    Сброс в других воркерах доходит только через Redis: с общим уровнем локальная копия
+    живёт не дольше AUTH_CACHE_LOCAL_TTL_SECONDS. Сброс увеличивает поколение пользователя
+    в Redis; запись в Redis действительна, только пока её поколение совпадает с текущим,
+    поэтому данные, прочитанные из БД до сброса в другом воркере, не вернутся в кэш.
+    """
+
+    def __init__(self):
+        self.local = TTLCache(max_size=settings.AUTH_CACHE_MAX_SIZE, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+        self.redis_hits = 0
+        self.redis_errors = 0
+        # Увеличивается при каждом сбросе в этом воркере: данные, прочитанные до сброса, в кэш не попадают
+        self.generation = 0
+        self._redis = None
+
+    def _key(self, user_id: int) -> str:
+        return f"auth:user:{user_id}"
+
+    def _generation_key(self, user_id: int) -> str:
+        return f"auth:generation:{user_id}"
+
+    def _get_redis(self):
+        if not settings.AUTH_CACHE_REDIS:
+            return None
+        if self._redis is None:
+            from redis import asyncio as aioredis
+            self._redis = aioredis.from_url(settings.BROKER_URL, decode_responses=True)
+        return self._redis
+
+    def _local_ttl(self) -> float:
+        if settings.AUTH_CACHE_REDIS:
+            return min(settings.AUTH_CACHE_LOCAL_TTL_SECONDS, settings.AUTH_CACHE_TTL_SECONDS)
+        return settings.AUTH_CACHE_TTL_SECONDS
+
+    async def get(self, user_id: int) -> Tuple[Optional[user_schemas.AuthUser], Tuple[int, Optional[int]]]:
+        """
+        Returns:
+            Tuple[Optional[AuthUser], Tuple[int, Optional[int]]]: Данные пользователя (None — промах) и поколение,
+            которое при промахе передаётся в set() вместе с данными, прочитанными из БД.
+        """
+
+        generation = (self.generation, None)
+        user = self.local.get(user_id)
+        if user is not None:
+            return user, generation
+
+        redis = self._get_redis()
+        if redis is None:
+            return None, generation
+        try:
+            raw, redis_generation = await redis.mget(self._key(user_id), self._generation_key(user_id))
+        except Exception:
+            self.redis_errors += 1
+            logger.exception("Auth cache: Redis get failed")
+            return None, generation
+
+        redis_generation = int(redis_generation or 0)
+        generation = (self.generation, redis_generation)
+        if raw is None:
+            return None, generation
+        entry = json.loads(raw)
+        if entry["generation"] != redis_generation:
+            return None, generation
+
+        user = user_schemas.AuthUser.model_validate(entry["user"])
+        self.redis_hits += 1
+        self.local.set(user_id, user, ttl=self._local_ttl())
+        return user, generation
+
+    async def set(self, user: user_schemas.AuthUser, generation: Tuple[int, Optional[int]]) -> None:
+        """Сохраняет данные, если с момента get() (значение generation) пользователя не сбрасывали."""
+
+        local_generation, redis_generation = generation
+        if local_generation != self.generation:
+            return
+        self.local.set(user.id, user, ttl=self._local_ttl())
+
+        redis = self._get_redis()
+        if redis is None or redis_generation is None:
+            return
+        entry = json.dumps({"generation": redis_generation, "user": user.model_dump(mode="json")})
+        try:
+            await redis.set(self._key(user.id), entry, ex=settings.AUTH_CACHE_TTL_SECONDS)
+        except Exception:
+            self.redis_errors += 1
+            logger.exception("Auth cache: Redis set failed")
+
+    async def invalidate(self, user_id: int) -> None:
+        self.generation += 1
+        self.local.delete(user_id)
+
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            # Поколение живёт не меньше записей: запись со старым поколением истечёт раньше него
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(self._generation_key(user_id))
+                pipe.expire(self._generation_key(user_id), settings.AUTH_CACHE_TTL_SECONDS)
+                pipe.delete(self._key(user_id))
+                await pipe.execute()
+        except Exception:
+            self.redis_errors += 1
+            logger.exception("Auth cache: Redis invalidate failed")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats["redis_enabled"] = settings.AUTH_CACHE_REDIS
+        stats["redis_hits"] = self.redis_hits
+        stats["redis_errors"] = self.redis_errors
+        return stats
+
+
+auth_cache = AuthCache()
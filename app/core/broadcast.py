@@ -0,0 +1,123 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], Awaitable[None]]
+
+
+class BroadcastBackend:
+    """
+    Транспорт рассылки сообщений чата между воркерами.
+
+    publish() отправляет сообщение всем подписчикам канала, включая текущий процесс;
+    полученные сообщения передаются в handler, который раздаёт их локальным сокетам.
+    """
+
+    def __init__(self):
+        self._handler: Optional[MessageHandler] = None
+
+    async def connect(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    async def disconnect(self) -> None:
+        self._handler = None
+
+    async def publish(self, message: str) -> None:
+        raise NotImplementedError
+
+
+class LocalBroadcast(BroadcastBackend):
+    """Рассылка внутри одного процесса (по умолчанию)."""
+
+    async def publish(self, message: str) -> None:
+        if self._handler is not None:
+            await self._handler(message)
+
+
+class RedisBroadcast(BroadcastBackend):
+    """Рассылка через Redis pub/sub: каждый воркер подписан на общий канал."""
+
+    def __init__(self, url: str, channel: str, client=None, reconnect_delay: float = 1.0):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._client = client
+        self._listener: Optional[asyncio.Task] = None
+
+    async def connect(self, handler: MessageHandler) -> None:
+        await super().connect(handler)
+        if self._client is None:
+            from redis import asyncio as aioredis
+            self._client = aioredis.from_url(self.url, decode_responses=True)
+
+        # Подписываемся до возврата, чтобы не потерять сообщения, опубликованные сразу после старта
+        pubsub = await self._subscribe()
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def disconnect(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await super().disconnect()
+
+    async def publish(self, message: str) -> None:
+        await self._client.publish(self.channel, message)
+
+    async def _subscribe(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        return pubsub
+
+    async def _listen(self, pubsub) -> None:
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    if message is None or message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    try:
+                        await self._handler(data)
+                    except Exception:
+                        logger.exception("Chat broadcast handler failed")
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception:
+                logger.exception("Redis broadcast subscription lost, reconnecting")
+
+            await pubsub.aclose()
+            while True:
+                await asyncio.sleep(self.reconnect_delay)
+                try:
+                    pubsub = await self._subscribe()
+                    break
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Redis broadcast resubscribe failed")
+
+
+def create_broadcast_backend() -> BroadcastBackend:
+    """Создаёт транспорт рассылки по настройке CHAT_BROADCAST_BACKEND."""
+
+    if settings.CHAT_BROADCAST_BACKEND == "redis":
+        return RedisBroadcast(settings.BROKER_URL, settings.CHAT_BROADCAST_CHANNEL)
+    if settings.CHAT_BROADCAST_BACKEND == "local":
+        return LocalBroadcast()
+    raise ValueError(f"Unknown CHAT_BROADCAST_BACKEND: {settings.CHAT_BROADCAST_BACKEND}")
+
+
+broadcaster = create_broadcast_backend()
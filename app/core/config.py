@@ -1,6 +1,7 @@
 from pydantic import AnyHttpUrl, ConfigDict, BaseModel
 from pydantic_settings import BaseSettings
 import os
+from typing import List, Optional
 from cryptography.fernet import Fernet
 
 class Settings(BaseSettings):
@@ -15,7 +16,68 @@ class Settings(BaseSettings):
     CRYPTOGRAPHY_KEY: str
     
     BROKER_URL: str
-    ELASTICSEARCH_URL: str 
+    # Не используется: поиск работает на индексах PostgreSQL (GET /search)
+    ELASTICSEARCH_URL: Optional[str] = None
+
+    # Рассылка сообщений чата между воркерами: "local" (один процесс) или "redis" (pub/sub через BROKER_URL)
+    CHAT_BROADCAST_BACKEND: str = "local"
+    CHAT_BROADCAST_CHANNEL: str = "chat"
+    # Исходящая очередь каждого сокета: размер и политика переполнения ("drop_oldest" или "disconnect").
+    # Отправка накопившихся сообщений одним кадром-массивом меняет формат кадров, поэтому по умолчанию
+    # выключена; клиент включает её для своего сокета параметром ?batch=true
+    CHAT_SEND_QUEUE_SIZE: int = 256
+    CHAT_OVERFLOW_POLICY: str = "drop_oldest"
+    CHAT_COALESCE_FRAMES: bool = False
+    # Групповая запись сообщений: максимум сообщений в одном INSERT и ожидание добора пакета
+    CHAT_WRITE_BATCH_SIZE: int = 500
+    CHAT_WRITE_FLUSH_INTERVAL_MS: int = 10
+    CHAT_WRITE_QUEUE_SIZE: int = 10000
+    # Сколько пропущенных сообщений отправлять при переподключении с ?after=<uuid>
+    CHAT_REPLAY_LIMIT: int = 500
+
+    # Кэш данных авторизации: срок жизни записи, размер, общий уровень в Redis (BROKER_URL)
+    # и срок локальной копии при общем уровне (столько другие воркеры могут не видеть сброс)
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    AUTH_CACHE_REDIS: bool = False
+    AUTH_CACHE_LOCAL_TTL_SECONDS: int = 2
+
+    # Кэш ответов GET /project и /project/{uuid}: срок жизни, размер, общий уровень в Redis (BROKER_URL)
+    # и срок жизни локальной копии при включённом Redis (сброс в другом воркере виден не позже него)
+    PROJECT_CACHE_TTL_SECONDS: int = 300
+    PROJECT_CACHE_MAX_SIZE: int = 1000
+    PROJECT_CACHE_REDIS: bool = False
+    PROJECT_CACHE_LOCAL_TTL_SECONDS: int = 2
+
+    # Поиск: сколько слов запроса искать по префиксу
+    SEARCH_MAX_PREFIX_WORDS: int = 8
+
+    # Фоновые задачи (Celery, брокер BROKER_URL): хранилище статусов (по умолчанию BROKER_URL),
+    # выполнение прямо в процессе API (тесты, без воркеров), каталог готовых файлов, общий для API
+    # и воркеров, и срок хранения результатов
+    JOBS_RESULT_BACKEND: Optional[str] = None
+    JOBS_EAGER: bool = False
+    JOBS_RESULT_DIR: str = "job_results"
+    JOBS_RESULT_TTL_SECONDS: int = 24 * 60 * 60
+
+    # Максимум задач в одном запросе /task/bulk
+    TASK_BULK_MAX_ITEMS: int = 1000
+
+    # Хеширование паролей: стоимость bcrypt, число потоков и длина очереди ожидания
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 256
+
+    # Аватары: лимит загрузки, лимит разрешения (защита от «бомб»), размеры миниатюр и пул обработки
+    AVATAR_MAX_UPLOAD_BYTES: int = 5 * 1024 * 1024
+    AVATAR_MAX_PIXELS: int = 40_000_000
+    AVATAR_SIZES: List[int] = [32, 64, 256]
+    AVATAR_WORKERS: int = 2
+    AVATAR_MAX_PENDING: int = 32
+    # Раздача аватаров: срок кэширования в браузере и горячий набор миниатюр в памяти
+    AVATAR_CACHE_MAX_AGE: int = 365 * 24 * 60 * 60
+    AVATAR_HOT_CACHE_SIZE: int = 1024
+    AVATAR_HOT_CACHE_MAX_FILE_BYTES: int = 64 * 1024
 
     SECRET_KEY: str
     REFRESH_SECRET_KEY: str
@@ -23,6 +85,40 @@ class Settings(BaseSettings):
     SQLALCHEMY_DATABASE_URL: str
     SQLALCHEMY_DATABASE_SYNC_URL: str
 
+    # Пул соединений с БД: размер, переполнение, ожидание свободного соединения,
+    # пересоздание старых соединений, проверка перед выдачей и кэш подготовленных запросов asyncpg
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Сколько соединений открыть при старте приложения
+    DB_POOL_WARMUP: int = 5
+
+    # Реплики для чтения (JSON-список URL asyncpg): маршруты только на чтение обращаются к ним по кругу.
+    # Окно чтения с основной БД после своей записи (не меньше допустимого отставания) и общий для
+    # воркеров учёт этих окон в Redis, допустимое отставание, период и таймаут проверки реплик,
+    # таймаут подключения к реплике
+    SQLALCHEMY_REPLICA_URLS: List[str] = []
+    DB_REPLICA_STICKY_SECONDS: float = 10
+    DB_REPLICA_STICKY_REDIS: bool = False
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5
+    DB_REPLICA_CHECK_INTERVAL: float = 5
+    DB_REPLICA_CHECK_TIMEOUT: float = 2
+    DB_REPLICA_CONNECT_TIMEOUT: float = 2
+
+    # Запуск API (python main.py): адрес, число процессов-воркеров, цикл событий и HTTP-парсер
+    # (auto — uvloop и httptools, если установлены), keep-alive (дольше, чем у прокси перед API,
+    # иначе прокси получает обрыв переиспользуемого соединения) и очередь входящих соединений
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8082
+    WEB_WORKERS: int = 1
+    WEB_LOOP: str = "auto"
+    WEB_HTTP: str = "auto"
+    WEB_KEEP_ALIVE_SECONDS: int = 75
+    WEB_BACKLOG: int = 2048
+
     model_config = ConfigDict(env_file=".env", env_file_encoding="utf-8")   
 
 # Инициализируем объект настроек
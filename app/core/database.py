@@ -1,35 +1,226 @@
 import asyncio
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import functools
+import logging
+import time
+from typing import Any, Dict
+from fastapi import Request
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import select, insert, create_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import DDL, event, select, insert, create_engine, text, exc
+from sqlalchemy.engine import Engine
 from app.utils import user as user_utils
 from app.models.user import User
+from app.models import chat as chat_models
+from app.models import task as task_models
+from app.models import stats as stats_models
 from .config import settings
+from .metrics import instrument_engine
+from .replicas import RecentWriters, ReplicaSet, is_disconnect
 from .base import Base
 
+logger = logging.getLogger(__name__)
 
-engine = create_async_engine(url=settings.SQLALCHEMY_DATABASE_URL)
-engine_sync = create_engine(url=settings.SQLALCHEMY_DATABASE_SYNC_URL)
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, который считает выдачи соединений, время ожидания и таймауты."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.acquisitions += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # dispose() пересоздаёт пул: счётчики переносим, чтобы статистика не обнулялась
+        pool = super().recreate()
+        pool.acquisitions, pool.timeouts = self.acquisitions, self.timeouts
+        pool.wait_total, pool.wait_max = self.wait_total, self.wait_max
+        return pool
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "acquisitions": self.acquisitions,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": self.wait_total / self.acquisitions * 1000 if self.acquisitions else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+        }
+
+
+def _create_engine(url: str, **connect_args: Any) -> AsyncEngine:
+    async_engine = create_async_engine(
+        url=url,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE, **connect_args},
+    )
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+engine = _create_engine(settings.SQLALCHEMY_DATABASE_URL)
+
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+# Недоступная реплика не должна держать запрос дольше таймаута подключения
+replicas = ReplicaSet([
+    _create_engine(url, timeout=settings.DB_REPLICA_CONNECT_TIMEOUT)
+    for url in settings.SQLALCHEMY_REPLICA_URLS
+])
+recent_writers = RecentWriters()
+
+# Триграммные индексы поиска требуют pg_trgm до создания таблиц
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+# Идемпотентные изменения схемы, которые create_all не применяет к существующим таблицам
+SCHEMA_UPGRADES = [
+    "ALTER TABLE chat ALTER COLUMN uuid SET DEFAULT gen_random_uuid()",
+    "ALTER TABLE chat ALTER COLUMN created_at SET DEFAULT clock_timestamp()::timestamp",
+    'ALTER TABLE "user" ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now()',
+    # Столбец с постоянным значением по умолчанию добавляется без перезаписи таблицы
+    "ALTER TABLE task ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE project ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1",
+    # Добавление генерируемого столбца переписывает таблицу: на больших таблицах — в окно обслуживания
+    f"ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({task_models.SEARCH_VECTOR}) STORED",
+    f"ALTER TABLE chat ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ({chat_models.SEARCH_VECTOR}) STORED",
+    "ALTER TABLE task_stats ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT clock_timestamp()::timestamp",
+    # Счётчики task_stats: триггеры на task и заполнение по уже существующим задачам
+    *stats_models.TRIGGER_DDL,
+    stats_models.BACKFILL_DDL,
+]
 
 
 async def get_session():
-    sessionmaker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with sessionmaker() as session:
+    async with SessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
 
+
+async def get_read_session(request: Request):
+    """
+    Сессия для маршрутов только на чтение: очередная здоровая реплика или основная БД,
+    если реплик нет, все выбыли или пользователь из токена недавно писал (recent_writers).
+    Реплика, к которой не удалось подключиться, выводится из ротации, и запрос читает
+    с основной БД; обрыв соединения уже во время запроса тоже выводит её из ротации.
+    """
+
+    primary = False
+    if replicas.replicas:
+        user_id = user_utils.get_token_user_id(request.headers.get("Authorization"))
+        primary = user_id is not None and await recent_writers.is_recent(user_id)
+    replica = replicas.choose(primary=primary)
+    session = SessionLocal() if replica is None else replica.sessionmaker()
+    if replica is not None:
+        try:
+            # Соединение берётся до маршрута: пока он ничего не выполнил, можно перейти на основную БД
+            await session.connection()
+        except Exception as error:
+            await session.close()
+            if not is_disconnect(error):
+                raise
+            replicas.eject(replica, f"{type(error).__name__}: {error}")
+            replicas.primary_reads += 1
+            replica, session = None, SessionLocal()
+
+    try:
+        yield session
+    except Exception as error:
+        if replica is not None and is_disconnect(error):
+            replicas.eject(replica, f"{type(error).__name__}: {error}")
+        raise
+    finally:
+        await session.close()
+
+
+async def warmup_pool(connections: int = settings.DB_POOL_WARMUP) -> None:
+    """Заранее открывает соединения пула, чтобы первые запросы не ждали подключения к БД."""
+
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections <= 0:
+        return
+
+    async def _open():
+        conn = await engine.connect()
+        await conn.exec_driver_sql("SELECT 1")
+        return conn
+
+    results = await asyncio.gather(*(_open() for _ in range(connections)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning(f"Database pool warmup failed: {result}")
+        else:
+            await result.close()
+
+
+@functools.cache
+def get_engine_sync() -> Engine:
+    """
+    Синхронный движок (psycopg): создание таблиц, экспорт и фоновые задачи. Создаётся
+    при первом обращении, чтобы воркер API не импортировал драйвер при старте.
+    """
+
+    engine_sync = create_engine(
+        url=settings.SQLALCHEMY_DATABASE_SYNC_URL,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    instrument_engine(engine_sync)
+    return engine_sync
+
+
+async def dispose_engines() -> None:
+    await engine.dispose()
+    await replicas.dispose()
+    if get_engine_sync.cache_info().currsize:
+        get_engine_sync().dispose()
+
+
+def pool_stats() -> Dict[str, Any]:
+    return engine.pool.stats()
+
+
 def create_tables():
     # Base.metadata.drop_all(engine_sync, checkfirst=True)
     # search_utils.delete_index("products")
     # search_utils.create_index("products")
-    Base.metadata.create_all(engine_sync, checkfirst=True)
-    ...
+    Base.metadata.create_all(get_engine_sync(), checkfirst=True)
+
+    # create_all не меняет уже существующие таблицы: применяем изменения схемы и добавляем недостающие индексы
+    with get_engine_sync().begin() as conn:
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
     
 
 def create_test_user():
-    with engine_sync.connect() as conn:
+    with get_engine_sync().connect() as conn:
         result = conn.execute(
             select(User)
             .filter(User.login == 'admin')
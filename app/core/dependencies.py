@@ -5,10 +5,15 @@ from app.core import database
 from app.models.user import User
 import jwt
 from app.core.config import settings
+from app.core.auth_cache import auth_cache
+from app.schemas import user as user_schemas
+from app.utils import user as user_utils
 from fastapi.security import OAuth2PasswordBearer
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="Bearer")
 SessionDep = Annotated[AsyncSession, Depends(database.get_session)]
+# Маршруты только на чтение: реплика, если настроены (SQLALCHEMY_REPLICA_URLS)
+ReadSessionDep = Annotated[AsyncSession, Depends(database.get_read_session)]
 
 async def get_current_user(session: SessionDep, token: Annotated[str, Depends(oauth2_scheme)]):
     """Получение юзера по jwt токену который находится в cookie"""
@@ -21,7 +26,15 @@ async def get_current_user(session: SessionDep, token: Annotated[str, Depends(oa
         if not decoded_token.get('sub'):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail={"message": "Token is missing 'sub' claim"})
         
-        user = await User.get_by_id(session=session, user_id=decoded_token['sub'])
+        # Данные для проверки токена берутся из кэша, в БД идём только при промахе
+        user, generation = await auth_cache.get(decoded_token['sub'])
+        if user is None:
+            db_user = await User.get_by_id(session=session, user_id=decoded_token['sub'])
+            if db_user is None:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail={"message": "User not found"})
+            
+            user = user_schemas.AuthUser(id=db_user.id, role=db_user.role, password_changed_at=db_user.password_changed_at)
+            await auth_cache.set(user, generation)
 
         if decoded_token['pwd_changed_at'] == user.password_changed_at.timestamp():
             return user
@@ -34,7 +47,21 @@ async def get_current_user(session: SessionDep, token: Annotated[str, Depends(oa
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail={"message": "Invalid token"})    
     
 
-UserTokenDep = Annotated[User, Depends(get_current_user)]
+UserTokenDep = Annotated[user_schemas.AuthUser, Depends(get_current_user)]
+
+
+async def records_write(request: Request):
+    """
+    Зависимость маршрутов, которые меняют данные: после успешного ответа чтения пользователя
+    из токена DB_REPLICA_STICKY_SECONDS идут на основную БД, и он видит свою запись (при репликах).
+    Токен только читается: авторизацию проверяет сам маршрут.
+    """
+
+    yield
+    if database.replicas.replicas:
+        user_id = user_utils.get_token_user_id(request.headers.get("Authorization"))
+        if user_id is not None:
+            await database.recent_writers.mark(user_id)
 
 
 
@@ -0,0 +1,171 @@
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "<unmatched>"
+BACKGROUND_ROUTE = "<background>"
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being processed",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES = Counter(
+    "db_queries_total",
+    "SQL statements executed, attributed to the route that issued them",
+    ["route"],
+)
+DB_QUERY_DURATION = Counter(
+    "db_query_duration_seconds_total",
+    "Time spent in SQL statements, attributed to the route that issued them",
+    ["route"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+
+PROJECT_CACHE_LOOKUPS = Counter(
+    "project_cache_lookups_total",
+    "Project response cache lookups by response kind and result (local_hit, redis_hit, miss)",
+    ["kind", "result"],
+)
+PROJECT_CACHE_INVALIDATIONS = Counter(
+    "project_cache_invalidations_total",
+    "Project response cache entries dropped by the write path that changed them",
+    ["reason"],
+)
+
+
+@dataclass
+class RequestStats:
+    """Счётчики SQL-запросов, выполненных в рамках одного HTTP-запроса."""
+
+    queries: int = 0
+    db_time: float = 0.0
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+    else:
+        # Запросы вне HTTP-запроса: чат по WebSocket, групповая запись, экспорт после ответа
+        DB_QUERIES.labels(BACKGROUND_ROUTE).inc()
+        DB_QUERY_DURATION.labels(BACKGROUND_ROUTE).inc(elapsed)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подключает подсчёт SQL-запросов к движку (для AsyncEngine передаётся engine.sync_engine)."""
+
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(scope: Scope, root_path: str) -> str:
+    """
+    Шаблон маршрута вместо фактического пути, чтобы UUID и id не раздували число меток.
+    Для смонтированных приложений (статика) используется префикс монтирования.
+    """
+
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is not None:
+        return scope.get("root_path", "")[len(root_path):] + path_format
+
+    mount_path = scope.get("root_path", "")[len(root_path):]
+    return f"{mount_path}/*" if mount_path else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: задержка, число запросов в работе и коды ответа по маршрутам,
+    число SQL-запросов и время в БД на каждый запрос, заголовок Server-Timing.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        root_path = scope.get("root_path", "")
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'app;dur={total:.1f}, db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"',
+                )
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            request_stats.reset(token)
+
+            route = route_label(scope, root_path)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            REQUEST_DB_QUERIES.labels(route).observe(stats.queries)
+            if stats.queries:
+                DB_QUERIES.labels(route).inc(stats.queries)
+                DB_QUERY_DURATION.labels(route).inc(stats.db_time)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Метрики в текстовом формате Prometheus."""
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Несколько воркеров: собираем метрики всех процессов из общего каталога
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,201 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+from uuid import UUID
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import PROJECT_CACHE_INVALIDATIONS, PROJECT_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    """Готовый JSON-ответ вместе с валидаторами для условных запросов."""
+
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+    def dump(self) -> str:
+        return json.dumps({
+            "body": self.body.decode("utf-8"),
+            "etag": self.etag,
+            "last_modified": self.last_modified.isoformat() if self.last_modified else None,
+        })
+
+    @classmethod
+    def load(cls, raw: str) -> "CachedResponse":
+        data = json.loads(raw)
+        last_modified = datetime.fromisoformat(data["last_modified"]) if data["last_modified"] else None
+        return cls(data["body"].encode("utf-8"), data["etag"], last_modified)
+
+
+class ProjectCache:
+    """
+    Кэш сериализованных ответов GET /project (сводка и дерево) и GET /project/{uuid}.
+
+    Первый уровень — TTL/LRU в памяти процесса, второй (PROJECT_CACHE_REDIS) — общий
+    для всех воркеров Redis. Записи сбрасываются маршрутами, которые меняют проекты,
+    задачи и пользователей, после фиксации транзакции.
+
+    Сброс увеличивает поколение каждого ключа в Redis, а ответ записывается, только если
+    поколение не изменилось с чтения из БД, поэтому ответ, собранный из данных до сброса
+    в другом воркере, не попадает ни в Redis, ни в локальную копию.
+    """
+
+    SUMMARIES = "summaries"
+    TREE = "tree"
+
+    def __init__(self):
+        self.local = TTLCache(max_size=settings.PROJECT_CACHE_MAX_SIZE, ttl=settings.PROJECT_CACHE_TTL_SECONDS)
+        self.redis_hits = 0
+        self.redis_errors = 0
+        self.invalidations: Dict[str, int] = {}
+        # Увеличивается при каждом сбросе: ответ, собранный до сброса, в кэш не попадает
+        self.generation = 0
+        self._redis = None
+
+    def detail_key(self, project_uuid: UUID) -> str:
+        return f"project:detail:{project_uuid}"
+
+    def list_key(self, kind: str) -> str:
+        return f"project:list:{kind}"
+
+    def _generation_key(self, key: str) -> str:
+        return f"project:generation:{key}"
+
+    def _get_redis(self):
+        if not settings.PROJECT_CACHE_REDIS:
+            return None
+        if self._redis is None:
+            from redis import asyncio as aioredis
+            self._redis = aioredis.from_url(settings.BROKER_URL, decode_responses=True)
+        return self._redis
+
+    def _local_ttl(self) -> float:
+        # С общим уровнем локальная копия живёт недолго: сбросы из других воркеров приходят только в Redis
+        if settings.PROJECT_CACHE_REDIS:
+            return min(settings.PROJECT_CACHE_LOCAL_TTL_SECONDS, settings.PROJECT_CACHE_TTL_SECONDS)
+        return settings.PROJECT_CACHE_TTL_SECONDS
+
+    async def get(self, key: str) -> Tuple[Optional[CachedResponse], Tuple[int, Optional[int]]]:
+        """
+        Returns:
+            Tuple[Optional[CachedResponse], Tuple[int, Optional[int]]]: Ответ (None — промах) и поколение,
+            которое при промахе передаётся в set() вместе с ответом, собранным из БД.
+        """
+
+        kind = key.split(":")[1]
+        generation = (self.generation, None)
+        cached = self.local.get(key)
+        if cached is not None:
+            PROJECT_CACHE_LOOKUPS.labels(kind, "local_hit").inc()
+            return cached, generation
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                raw, redis_generation = await redis.mget(key, self._generation_key(key))
+            except Exception:
+                self.redis_errors += 1
+                logger.exception("Project cache: Redis get failed")
+            else:
+                redis_generation = int(redis_generation or 0)
+                generation = (self.generation, redis_generation)
+                if raw is not None:
+                    cached = CachedResponse.load(raw)
+                    self.redis_hits += 1
+                    self.local.set(key, cached, ttl=self._local_ttl())
+                    PROJECT_CACHE_LOOKUPS.labels(kind, "redis_hit").inc()
+                    return cached, generation
+
+        PROJECT_CACHE_LOOKUPS.labels(kind, "miss").inc()
+        return None, generation
+
+    async def set(self, key: str, cached: CachedResponse, generation: Tuple[int, Optional[int]]) -> None:
+        """
+        Сохраняет ответ, если с момента get() (значение generation, полученное до чтения
+        из БД) ключ не сбрасывали: иначе ответ мог быть собран из данных до изменения.
+        """
+
+        local_generation, redis_generation = generation
+        if local_generation != self.generation:
+            return
+
+        redis = self._get_redis()
+        if redis is not None and redis_generation is not None:
+            try:
+                if not await self._set_if_generation(redis, key, cached.dump(), redis_generation):
+                    # Ключ сбросили в другом воркере: ответ устарел и для локальной копии
+                    return
+            except Exception:
+                self.redis_errors += 1
+                logger.exception("Project cache: Redis set failed")
+        self.local.set(key, cached, ttl=self._local_ttl())
+
+    async def _set_if_generation(self, redis, key: str, raw: str, redis_generation: int) -> bool:
+        """Записывает ответ, только если поколение ключа в Redis всё ещё redis_generation (WATCH/MULTI)."""
+
+        from redis.exceptions import WatchError
+
+        async with redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(self._generation_key(key))
+            if int(await pipe.get(self._generation_key(key)) or 0) != redis_generation:
+                return False
+            pipe.multi()
+            pipe.set(key, raw, ex=settings.PROJECT_CACHE_TTL_SECONDS)
+            try:
+                await pipe.execute()
+            except WatchError:
+                return False
+        return True
+
+    async def invalidate(self, project_uuids: Iterable[UUID], reason: str, summaries: bool = True) -> None:
+        """
+        Сбрасывает ответы по указанным проектам и списки проектов.
+
+        Args:
+            project_uuids (Iterable[UUID]): Изменённые проекты (включая проекты изменённых задач).
+            reason (str): Маршрут-источник изменения, метка метрики.
+            summaries (bool): Сбрасывать ли сводку: изменения пользователей в неё не входят.
+        """
+
+        keys = [self.detail_key(project_uuid) for project_uuid in set(project_uuids)]
+        if not keys and not summaries:
+            # Пользователь без задач не входит ни в один ответ
+            return
+        keys.append(self.list_key(self.TREE))
+        if summaries:
+            keys.append(self.list_key(self.SUMMARIES))
+
+        self.generation += 1
+        self.invalidations[reason] = self.invalidations.get(reason, 0) + 1
+        PROJECT_CACHE_INVALIDATIONS.labels(reason).inc()
+        for key in keys:
+            self.local.delete(key)
+
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                for key in keys:
+                    pipe.incr(self._generation_key(key))
+                    pipe.expire(self._generation_key(key), settings.PROJECT_CACHE_TTL_SECONDS)
+                pipe.delete(*keys)
+                await pipe.execute()
+        except Exception:
+            self.redis_errors += 1
+            logger.exception("Project cache: Redis invalidate failed")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats["redis_enabled"] = settings.PROJECT_CACHE_REDIS
+        stats["redis_hits"] = self.redis_hits
+        stats["redis_errors"] = self.redis_errors
+        stats["invalidations"] = dict(self.invalidations)
+        return stats
+
+
+project_cache = ProjectCache()
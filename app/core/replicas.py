@@ -0,0 +1,201 @@
+import asyncio
+import contextlib
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Сколько недавно писавших пользователей помнит процесс
+RECENT_WRITERS_MAX_SIZE = 100_000
+
+# Отставание реплики в секундах. Если всё полученное уже применено — 0: без записей
+# на основной БД время последней применённой транзакции стареет, но реплика актуальна.
+# После перезапуска реплики приём WAL возобновляется с начала сегмента, поэтому <=, а не =
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() <= pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+def is_disconnect(error: BaseException) -> bool:
+    """Ошибка соединения с БД (сервер недоступен или оборвал соединение), а не ошибка запроса."""
+
+    if isinstance(error, exc.DBAPIError):
+        return error.connection_invalidated
+    return isinstance(error, OSError)
+
+
+@dataclass
+class Replica:
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker
+    healthy: bool = True
+    lag: Optional[float] = None
+    reads: int = 0
+    ejections: int = 0
+    last_error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+
+class ReplicaSet:
+    """
+    Реплики для чтения.
+
+    choose() выдаёт здоровые реплики по кругу. Реплика выбывает при обрыве соединения
+    в запросе (eject) или при фоновой проверке, если недоступна или отстаёт больше
+    DB_REPLICA_MAX_LAG_SECONDS, и возвращается после успешной проверки. Если здоровых
+    реплик нет, чтение идёт с основной БД.
+    """
+
+    def __init__(self, engines: List[AsyncEngine]):
+        self.replicas = [
+            Replica(engine, async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+            for engine in engines
+        ]
+        self.primary_reads = 0
+        self._next = 0
+        self._checker: Optional[asyncio.Task] = None
+
+    def choose(self, primary: bool = False) -> Optional[Replica]:
+        """Следующая здоровая реплика или None — читать с основной БД."""
+
+        healthy = [replica for replica in self.replicas if replica.healthy] if not primary else []
+        if not healthy:
+            self.primary_reads += 1
+            return None
+        replica = healthy[self._next % len(healthy)]
+        self._next += 1
+        replica.reads += 1
+        return replica
+
+    def eject(self, replica: Replica, reason: str) -> None:
+        if replica.healthy:
+            replica.healthy = False
+            replica.ejections += 1
+            logger.warning(f"Read replica {replica.name} ejected: {reason}")
+        replica.last_error = reason
+
+    async def _probe(self, replica: Replica) -> float:
+        async with replica.engine.connect() as conn:
+            return float(await conn.scalar(LAG_QUERY))
+
+    async def check(self, replica: Replica) -> None:
+        try:
+            replica.lag = await asyncio.wait_for(self._probe(replica), settings.DB_REPLICA_CHECK_TIMEOUT)
+        except Exception as error:
+            replica.lag = None
+            self.eject(replica, f"{type(error).__name__}: {error}")
+            return
+
+        if replica.lag > settings.DB_REPLICA_MAX_LAG_SECONDS:
+            self.eject(replica, f"replication lag {replica.lag:.1f} s")
+        elif not replica.healthy:
+            replica.healthy = True
+            replica.last_error = None
+            logger.info(f"Read replica {replica.name} is back in rotation")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check(replica) for replica in self.replicas))
+            await asyncio.sleep(settings.DB_REPLICA_CHECK_INTERVAL)
+
+    async def start(self) -> None:
+        if self.replicas and self._checker is None:
+            self._checker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._checker is None:
+            return
+        self._checker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._checker
+        self._checker = None
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "primary_reads": self.primary_reads,
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "reads": replica.reads,
+                    "ejections": replica.ejections,
+                    "last_error": replica.last_error,
+                    "pool": replica.engine.pool.stats(),
+                }
+                for replica in self.replicas
+            ],
+        }
+
+
+class RecentWriters:
+    """
+    Пользователи, которые недавно писали в основную БД: DB_REPLICA_STICKY_SECONDS их
+    чтения идут на основную БД, и они видят свою запись, даже если реплики её ещё не применили.
+
+    Отметку ставят маршруты записи (зависимость records_write) после успешного ответа.
+    Первый уровень — память процесса, второй (DB_REPLICA_STICKY_REDIS) — общий для всех
+    воркеров Redis: следующий запрос клиента может попасть в другой воркер.
+    """
+
+    def __init__(self):
+        self.local = TTLCache(max_size=RECENT_WRITERS_MAX_SIZE, ttl=settings.DB_REPLICA_STICKY_SECONDS)
+        self.redis_errors = 0
+        self._redis = None
+
+    def _key(self, user_id: int) -> str:
+        return f"replica:sticky:{user_id}"
+
+    def _get_redis(self):
+        if not settings.DB_REPLICA_STICKY_REDIS:
+            return None
+        if self._redis is None:
+            from redis import asyncio as aioredis
+            self._redis = aioredis.from_url(settings.BROKER_URL, decode_responses=True)
+        return self._redis
+
+    async def mark(self, user_id: int) -> None:
+        self.local.set(user_id, True)
+
+        redis = self._get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(self._key(user_id), 1, px=math.ceil(settings.DB_REPLICA_STICKY_SECONDS * 1000))
+        except Exception:
+            self.redis_errors += 1
+            logger.exception("Recent writers: Redis set failed")
+
+    async def is_recent(self, user_id: int) -> bool:
+        if self.local.get(user_id):
+            return True
+
+        redis = self._get_redis()
+        if redis is None:
+            return False
+        try:
+            remaining_ms = await redis.pttl(self._key(user_id))
+        except Exception:
+            # Не знаем, писал ли пользователь: безопаснее прочитать с основной БД
+            self.redis_errors += 1
+            logger.exception("Recent writers: Redis get failed")
+            return True
+        if remaining_ms <= 0:
+            return False
+        # Отметка из другого воркера: до её истечения Redis больше не спрашиваем
+        self.local.set(user_id, True, ttl=remaining_ms / 1000)
+        return True
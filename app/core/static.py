@@ -0,0 +1,88 @@
+import os
+import re
+import stat
+from typing import Any, Dict
+import anyio
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# <sha256>/<размер>.<формат> — содержимое по такому пути никогда не меняется
+IMMUTABLE_PATH_RE = re.compile(r"^(?P<digest>[0-9a-f]{64})/(?P<name>\d+\.(?:webp|png|jpg))$")
+
+IMMUTABLE_CACHE_CONTROL = f"public, max-age={settings.AVATAR_CACHE_MAX_AGE}, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class AvatarFiles(StaticFiles):
+    """
+    Раздача аватаров.
+
+    Миниатюры лежат под хешем содержимого, поэтому отдаются с
+    Cache-Control: immutable и сильным ETag из самого пути: браузер не
+    перепроверяет их вовсе, а на If-None-Match получает 304 без обращения к диску.
+    Небольшие миниатюры держатся в памяти (AVATAR_HOT_CACHE_SIZE), запросы
+    с Range и крупные файлы отдаются с диска через FileResponse.
+    Прочие файлы (например, аватар по умолчанию) перепроверяются по ETag на каждый запрос.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # TTL не нужен: файл по неизменяемому пути не устаревает, вытесняем только по LRU
+        self.hot_cache = TTLCache(max_size=settings.AVATAR_HOT_CACHE_SIZE, ttl=float("inf"))
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        match = IMMUTABLE_PATH_RE.match(path.replace(os.sep, "/"))
+        if match is None or scope["method"] not in ("GET", "HEAD"):
+            response = await super().get_response(path, scope)
+            if response.status_code in (200, 304):
+                response.headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+            return response
+
+        request_headers = Headers(scope=scope)
+        etag = f'"{match.group("digest")}-{match.group("name")}"'
+        if self._etag_matches(etag, request_headers):
+            return NotModifiedResponse(Headers({"etag": etag, "cache-control": IMMUTABLE_CACHE_CONTROL}))
+
+        if request_headers.get("range") is None:
+            cached = self.hot_cache.get(path)
+            if cached is not None:
+                body, headers = cached
+                return Response(body, headers=headers)
+
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            raise HTTPException(status_code=404)
+
+        headers = {"etag": etag, "cache-control": IMMUTABLE_CACHE_CONTROL}
+        response = FileResponse(full_path, stat_result=stat_result, headers=headers)
+        if stat_result.st_size > settings.AVATAR_HOT_CACHE_MAX_FILE_BYTES or request_headers.get("range") is not None:
+            return response
+
+        body = await anyio.to_thread.run_sync(_read_file, full_path)
+        headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+        self.hot_cache.set(path, (body, headers))
+        return Response(body, headers=headers)
+
+    @staticmethod
+    def _etag_matches(etag: str, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is None:
+            return False
+        return if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+    def stats(self) -> Dict[str, Any]:
+        return self.hot_cache.stats()
+
+
+avatar_files = AvatarFiles(directory="static/avatars")
@@ -0,0 +1,26 @@
+from celery import Celery
+from app.core.config import settings
+
+celery_app = Celery(
+    "task_manager",
+    broker="memory://" if settings.JOBS_EAGER else settings.BROKER_URL,
+    # В режиме JOBS_EAGER статусы хранятся в памяти процесса API
+    backend="cache+memory://" if settings.JOBS_EAGER else (settings.JOBS_RESULT_BACKEND or settings.BROKER_URL),
+    include=["app.jobs.tasks"],
+)
+
+celery_app.conf.update(
+    task_always_eager=settings.JOBS_EAGER,
+    task_store_eager_result=True,
+    task_track_started=True,
+    # Аргументы задачи сохраняются вместе с результатом: по ним проверяется владелец
+    result_extended=True,
+    result_expires=settings.JOBS_RESULT_TTL_SECONDS,
+    # Тяжёлые задачи: воркер берёт следующую только после завершения текущей
+    # и подтверждает её после выполнения, чтобы при падении задача не потерялась
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+)
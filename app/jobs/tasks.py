@@ -0,0 +1,77 @@
+import os
+import time
+from typing import Any, Dict
+from uuid import UUID
+from app.core import database
+from app.core.config import settings
+from app.jobs.celery_app import celery_app
+from app.models.stats import TaskStats
+from app.schemas.job import PROGRESS
+from app.utils import export as export_utils
+
+
+def result_path(job_id: str, suffix: str) -> str:
+    return os.path.join(settings.JOBS_RESULT_DIR, f"{job_id}{suffix}")
+
+
+def purge_expired_results() -> None:
+    """Удаляет файлы результатов старше JOBS_RESULT_TTL_SECONDS: статусов к ним уже нет."""
+
+    expires_before = time.time() - settings.JOBS_RESULT_TTL_SECONDS
+    with os.scandir(settings.JOBS_RESULT_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < expires_before:
+                os.remove(entry.path)
+
+
+@celery_app.task(bind=True, name="export.tasks_xlsx")
+def export_tasks_xlsx(self, project_uuid: str, owner_id: int) -> Dict[str, Any]:
+    """
+    Экспорт задач проекта в XLSX на воркере. Прогресс — число записанных строк.
+
+    Args:
+        project_uuid (str): UUID проекта.
+        owner_id (int): Пользователь, поставивший задачу: только он (и админ) получает результат.
+
+    Returns:
+        Dict[str, Any]: Путь к файлу, имя для скачивания, тип и число строк.
+    """
+
+    os.makedirs(settings.JOBS_RESULT_DIR, exist_ok=True)
+    purge_expired_results()
+
+    def on_progress(done: int, total: int) -> None:
+        self.update_state(state=PROGRESS, meta={"done": done, "total": total})
+
+    path = result_path(self.request.id, ".xlsx")
+    try:
+        rows = export_utils.write_tasks_xlsx(UUID(project_uuid), path, on_progress)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return {
+        "path": path,
+        "filename": "tasks.xlsx",
+        "media_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "rows": rows,
+    }
+
+
+@celery_app.task(bind=True, name="stats.rebuild")
+def rebuild_task_stats(self, owner_id: int) -> Dict[str, Any]:
+    """
+    Пересчёт счётчиков task_stats с нуля в одной транзакции. Запись задач
+    на это время ждёт: запускать после ручных правок БД, а не по расписанию.
+
+    Args:
+        owner_id (int): Администратор, поставивший задачу.
+
+    Returns:
+        Dict[str, Any]: Число строк статистики.
+    """
+
+    with database.get_engine_sync().begin() as conn:
+        rows = TaskStats.rebuild_sync(conn)
+    return {"rows": rows}
@@ -1,4 +1,5 @@
 from .task import Task
 from .user import User
 from .project import Project
-from .chat import Chat
\ No newline at end of file
+from .chat import Chat
+from .stats import TaskStats
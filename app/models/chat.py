@@ -1,9 +1,10 @@
 from fastapi import HTTPException, status
-from sqlalchemy import String, BigInteger, Sequence, DateTime, Enum, and_, delete, select, ForeignKey, UUID as PostgresUUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
+from sqlalchemy import String, BigInteger, Sequence, DateTime, Enum, Float, Index, Computed, and_, cast, delete, func, insert, literal_column, null, or_, select, text, tuple_, ForeignKey, UUID as PostgresUUID
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, aliased, mapped_column, relationship, selectinload
 from app.core.base import Base
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from app.schemas import user as user_schemas
 from sqlalchemy.exc import IntegrityError
@@ -13,15 +14,31 @@ from app.schemas import user as user_schemas
 from app.utils import user as user_utils
 from app.schemas import chat as chat_schemas
 
+# Поисковый вектор сообщения в русской и английской морфологии
+SEARCH_VECTOR = "to_tsvector('russian', coalesce(message, '')) || to_tsvector('english', coalesce(message, ''))"
+
+
 class Chat(Base):
     __tablename__ = 'chat'
     
-    uuid: Mapped[UUID] = mapped_column(PostgresUUID(as_uuid=True), primary_key=True, default=uuid4, index=True)
+    # uuid и время создания генерирует сервер БД, чтобы пакетная вставка возвращала их через RETURNING;
+    # clock_timestamp() отличается у каждой строки пакета и сохраняет порядок сообщений
+    uuid: Mapped[UUID] = mapped_column(PostgresUUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid(), index=True)
     message: Mapped[str] = mapped_column(String(312))
     user_id: Mapped[int] = mapped_column(ForeignKey('user.id'))
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=text("clock_timestamp()::timestamp"))
+    # Генерируемый столбец: БД пересчитывает его при каждой записи строки, в ORM не загружается
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True), deferred=True)
     
     user = relationship("User", back_populates="chat")
+
+    # История читается страницами по (created_at, uuid) в обе стороны
+    __table_args__ = (
+        Index('ix_chat_created_at_uuid', 'created_at', 'uuid'),
+        # Полнотекстовый и нечёткий (pg_trgm) поиск по сообщениям
+        Index('ix_chat_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_chat_message_trgm', 'message', postgresql_using='gin', postgresql_ops={'message': 'gin_trgm_ops'}),
+    )
     
     @staticmethod
     async def create_chat_message(session: AsyncSession, payload: chat_schemas.ChatMessageCreate, user_id) -> 'Chat':
@@ -48,16 +65,40 @@ class Chat(Base):
         return new_chat_message
 
     @staticmethod
-    async def get_all(session: AsyncSession, limit: int) -> List['Chat']:
+    async def insert_chat_messages(conn: AsyncConnection, messages: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Пакетная вставка сообщений одним многострочным INSERT.
+
+        Args:
+            conn (AsyncConnection): Соединение с открытой транзакцией.
+            messages (List[Dict[str, Any]]): Значения message и user_id для каждого сообщения.
+
+        Returns:
+            List[Row]: uuid и created_at вставленных сообщений в порядке messages.
+        """
+        # Один INSERT ... VALUES (...), (...) RETURNING: PostgreSQL возвращает строки в порядке VALUES
+        stmt = insert(Chat).values(messages).returning(Chat.uuid, Chat.created_at)
+        result = await conn.execute(stmt)
+        return result.all()
+
+    @staticmethod
+    async def get_all(session: AsyncSession, limit: int, before: Optional[UUID] = None, after: Optional[UUID] = None) -> Optional[List['Chat']]:
         """
-        Получение всех сообщений из чата.
+        Получение страницы сообщений из чата.
+
+        Без курсоров возвращает последние сообщения (от новых к старым). С before —
+        сообщения старше указанного (бесконечная прокрутка, от новых к старым),
+        с after — пропущенные сообщения новее указанного (от старых к новым).
 
         Args:
             session (AsyncSession): Асинхронная сессия SQLAlchemy.
-            linit (int)
+            limit (int): Максимальное количество сообщений.
+            before (Optional[UUID]): UUID сообщения, до которого читать историю.
+            after (Optional[UUID]): UUID сообщения, после которого читать историю.
             
         Returns:
-            List[Chat]: Список всех сообщений в чате.
+            Optional[List[Chat]]: Список сообщений в чате или None, если сообщения
+            before или after нет.
         """
         
         stmt = (
@@ -65,10 +106,67 @@ class Chat(Base):
            .options(
                 selectinload(Chat.user)
            )
-           .order_by(Chat.created_at.desc())
-           .limit(limit)
         )
+
+        position = tuple_(Chat.created_at, Chat.uuid)
+        if before is not None:
+            stmt = stmt.filter(position < Chat._position_of(before))
+        if after is not None:
+            stmt = stmt.filter(position > Chat._position_of(after))
+
+        if after is not None and before is None:
+            stmt = stmt.order_by(Chat.created_at.asc(), Chat.uuid.asc())
+        else:
+            stmt = stmt.order_by(Chat.created_at.desc(), Chat.uuid.desc())
         
+        result = await session.execute(stmt.limit(limit))
+        messages = result.scalars().all()
+        # Несуществующий якорь тоже даёт пустую страницу: проверяем его только в этом случае
+        if not messages:
+            for anchor in (before, after):
+                if anchor is not None and not await Chat.exists(session, anchor):
+                    return None
+        return messages
+
+    @staticmethod
+    async def exists(session: AsyncSession, message_uuid: UUID) -> bool:
+        stmt = select(Chat.uuid).filter(Chat.uuid == message_uuid)
         result = await session.execute(stmt)
-        return result.scalars().all()
+        return result.first() is not None
+
+    @staticmethod
+    def search_select(query, text: str):
+        """
+        Сообщения, подходящие под поисковый запрос; столбцы совпадают с Task.search_select.
+
+        Args:
+            query: Выражение tsquery.
+            text (str): Исходный текст запроса для сравнения по триграммам.
+        """
+
+        rank = func.greatest(func.ts_rank_cd(Chat.search_vector, query), func.similarity(Chat.message, text))
+        return (
+            select(
+                literal_column("'chat'").label('kind'),
+                Chat.uuid,
+                cast(rank, Float).label('rank'),
+                Chat.created_at,
+                cast(null(), String).label('title'),
+                Chat.message.label('text'),
+                cast(null(), PostgresUUID(as_uuid=True)).label('project_uuid'),
+                Chat.user_id,
+            )
+            .filter(or_(Chat.search_vector.op('@@')(query), Chat.message.op('%')(text)))
+        )
+
+    @staticmethod
+    def _position_of(message_uuid: UUID):
+        """Позиция (created_at, uuid) сообщения как подзапрос для сравнения по индексу."""
         
+        anchor = aliased(Chat)
+        return (
+            select(anchor.created_at, anchor.uuid)
+            .filter(anchor.uuid == message_uuid)
+            .correlate(None)
+            .scalar_subquery()
+        )
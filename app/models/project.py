@@ -1,12 +1,13 @@
-from sqlalchemy import String, BigInteger, Sequence, DateTime, UUID as PostgresUUID, delete, select
+from sqlalchemy import String, BigInteger, Integer, Sequence, DateTime, UUID as PostgresUUID, delete, func, select, text, update
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
 from app.core.base import Base
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 from uuid import UUID, uuid4
 from app.models.task import Task
 from app.models import project as project_schemas
+from app.schemas import task as task_schemas
 
 class Project(Base):
     __tablename__ = 'project'
@@ -16,7 +17,9 @@ class Project(Base):
     description: Mapped[str] = mapped_column(String(500), nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
+    # Номер версии для If-Match: каждое изменение проекта увеличивает его на 1
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text('1'))
 
     tasks = relationship("Task", back_populates="project")
 
@@ -39,6 +42,79 @@ class Project(Base):
         
         result = await session.execute(stmt)
         return result.scalars().all()
+
+    @staticmethod
+    async def get_tree_rows(session: AsyncSession, project_uuid: Optional[UUID] = None) -> List[Dict[str, Any]]:
+        """
+        Проекты с задачами и ответственными без ORM-объектов: два запроса (проекты и
+        задачи с JOIN пользователей), строки собираются в словари формы ProjectInfo.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            project_uuid (Optional[UUID]): Только этот проект; по умолчанию все.
+
+        Returns:
+            List[Dict[str, Any]]: Проекты с вложенными tasks.
+        """
+
+        projects_stmt = select(Project.uuid, Project.title, Project.description, Project.created_at, Project.updated_at, Project.version)
+        tasks_stmt = Task.info_select()
+        if project_uuid is not None:
+            projects_stmt = projects_stmt.filter(Project.uuid == project_uuid)
+            tasks_stmt = tasks_stmt.filter(Task.project_uuid == project_uuid)
+
+        projects = {}
+        for row in await session.execute(projects_stmt):
+            projects[row.uuid] = {**row._asdict(), 'tasks': []}
+        if not projects:
+            return []
+
+        for row in await session.execute(tasks_stmt):
+            project = projects.get(row.project_uuid)
+            if project is not None:
+                project['tasks'].append(Task.info_row(row))
+        return list(projects.values())
+
+    @staticmethod
+    async def get_summaries(session: AsyncSession) -> List[Dict[str, Any]]:
+        """
+        Облегчённый список проектов: количество задач по статусам и время последнего
+        изменения считаются одним GROUP BY, без загрузки задач и пользователей.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+
+        Returns:
+            List[Dict[str, Any]]: Сводка по каждому проекту.
+        """
+
+        status_counts = [
+            func.count(Task.uuid).filter(Task.status == task_status).label(task_status.value)
+            for task_status in task_schemas.TaskStatus
+        ]
+        stmt = (
+            select(
+                Project.uuid,
+                Project.title,
+                Project.description,
+                Project.created_at,
+                Project.updated_at,
+                func.greatest(Project.updated_at, func.max(Task.updated_at)).label('last_updated_at'),
+                func.count(Task.uuid).label('tasks_total'),
+                *status_counts,
+            )
+            .outerjoin(Task, Task.project_uuid == Project.uuid)
+            .group_by(Project.uuid)
+            .order_by(Project.created_at)
+        )
+
+        result = await session.execute(stmt)
+        summaries = []
+        for row in result.mappings():
+            summary = {key: row[key] for key in ('uuid', 'title', 'description', 'created_at', 'updated_at', 'last_updated_at', 'tasks_total')}
+            summary['task_counts'] = {task_status.value: row[task_status.value] for task_status in task_schemas.TaskStatus}
+            summaries.append(summary)
+        return summaries
     
     @staticmethod
     async def get_by_uuid(session: AsyncSession, project_uuid: UUID) -> Optional['Project']:
@@ -52,6 +128,123 @@ class Project(Base):
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
     
+    @staticmethod
+    async def get_version(session: AsyncSession, project_uuid: UUID) -> Optional[Tuple[datetime, int, int]]:
+        """
+        Версия проекта с задачами для ETag: последнее изменение проекта, его задач
+        и их ответственных, число задач (учитывает удаление задач) и столбец version.
+
+        Returns:
+            Optional[Tuple[datetime, int, int]]: (last_modified, tasks_count, version) или None, если проекта нет.
+        """
+        from app.models.user import User
+
+        stmt = (
+            select(
+                func.greatest(Project.updated_at, func.max(Task.updated_at), func.max(User.updated_at)),
+                func.count(Task.uuid),
+                Project.version,
+            )
+            .outerjoin(Task, Task.project_uuid == Project.uuid)
+            .outerjoin(User, User.id == Task.user_id)
+            .filter(Project.uuid == project_uuid)
+            .group_by(Project.uuid)
+        )
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
+    @staticmethod
+    async def get_list_version(session: AsyncSession, include_users: bool = False) -> Tuple[Optional[datetime], int]:
+        """
+        Версия списка проектов для ETag: последнее изменение проектов, задач, счётчиков
+        task_stats (их меняют и удаление задач, и смена статуса или ответственного) и,
+        если ответ их содержит, пользователей, а также число проектов (удаление проекта).
+        Максимумы берутся из индексов по updated_at, задачи не пересчитываются.
+
+        Returns:
+            Tuple[Optional[datetime], int]: (last_modified, projects_count).
+        """
+        from app.models.stats import TaskStats
+        from app.models.user import User
+
+        timestamps = [
+            select(func.max(Project.updated_at)).scalar_subquery(),
+            select(func.max(Task.updated_at)).scalar_subquery(),
+            select(func.max(TaskStats.updated_at)).scalar_subquery(),
+        ]
+        if include_users:
+            timestamps.append(select(func.max(User.updated_at)).scalar_subquery())
+
+        stmt = select(
+            func.greatest(*timestamps),
+            select(func.count()).select_from(Project).scalar_subquery(),
+        )
+        result = await session.execute(stmt)
+        return tuple(result.one())
+
+    @staticmethod
+    async def exists(session: AsyncSession, project_uuid: UUID) -> bool:
+        stmt = select(Project.uuid).filter(Project.uuid == project_uuid)
+        result = await session.execute(stmt)
+        return result.first() is not None
+    
+    @staticmethod
+    async def update_returning(
+        session: AsyncSession,
+        project_uuid: UUID,
+        changes: Dict[str, Any],
+        versions: Optional[List[int]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Изменение проекта одним UPDATE ... RETURNING, версия проверяется в WHERE.
+        Без изменений проект только читается с той же проверкой, и версия не растёт.
+        Транзакцию фиксирует вызывающий код.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            project_uuid (UUID): UUID проекта.
+            changes (Dict[str, Any]): Новые значения столбцов.
+            versions (Optional[List[int]]): Если заданы, меняется только проект одной из этих версий.
+
+        Returns:
+            Optional[Dict[str, Any]]: Поля проекта или None, если проекта нет или версия не совпала.
+        """
+
+        columns = (Project.uuid, Project.title, Project.description, Project.created_at, Project.updated_at, Project.version)
+        if changes:
+            stmt = (
+                update(Project)
+                .filter(Project.uuid == project_uuid)
+                .values(**changes, updated_at=datetime.now(), version=Project.version + 1)
+                .returning(*columns)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            # Новая версия без изменений сделала бы устаревшими ETag у других клиентов
+            stmt = select(*columns).filter(Project.uuid == project_uuid)
+        if versions is not None:
+            stmt = stmt.filter(Project.version.in_(versions))
+
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        return row._asdict() if row is not None else None
+
+    @staticmethod
+    async def delete_returning(session: AsyncSession, project_uuid: UUID, versions: Optional[List[int]] = None) -> bool:
+        """
+        Удаление проекта одним DELETE ... RETURNING. Транзакцию фиксирует вызывающий код.
+
+        Returns:
+            bool: False, если проекта нет или версия не совпала.
+        """
+
+        stmt = delete(Project).filter(Project.uuid == project_uuid).returning(Project.uuid)
+        if versions is not None:
+            stmt = stmt.filter(Project.version.in_(versions))
+        result = await session.execute(stmt)
+        return result.first() is not None
+
     @staticmethod
     async def delete_project(session: AsyncSession, project_uuid: UUID) -> bool:
         stmt = delete(Project).filter(Project.uuid == project_uuid)
@@ -0,0 +1,182 @@
+from sqlalchemy import BigInteger, DateTime, Integer, ForeignKey, select, text, UUID as PostgresUUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+from app.core.base import Base
+from app.schemas import task as task_schemas
+
+STATUSES = [task_status.value for task_status in task_schemas.TaskStatus]
+
+# Приращения счётчиков по строкам оператора: +1 за новую версию строки, -1 за старую
+_DELTA_SELECT = "SELECT project_uuid, user_id, {sums} FROM ({rows}) AS delta GROUP BY project_uuid, user_id HAVING {changed}"
+_DELTA_UPSERT = (
+    "INSERT INTO task_stats AS s (project_uuid, user_id, {columns}) {select} ORDER BY project_uuid, user_id "
+    "ON CONFLICT (project_uuid, user_id) DO UPDATE SET {increments}, updated_at = clock_timestamp()::timestamp"
+)
+
+
+def _apply_delta(*sources: str) -> str:
+    """UPSERT приращений из таблиц переходов ('new_rows' = +1, 'old_rows' = -1)."""
+
+    rows = " UNION ALL ".join(
+        f"SELECT project_uuid, user_id, status::text AS status, {1 if source == 'new_rows' else -1} AS n FROM {source}"
+        for source in sources
+    )
+    select = _DELTA_SELECT.format(
+        sums=", ".join(f"coalesce(sum(n) FILTER (WHERE status = '{status}'), 0)" for status in STATUSES),
+        rows=rows,
+        # Правка заголовка или комментария не меняет счётчиков: такие группы не пишем
+        changed=" OR ".join(f"coalesce(sum(n) FILTER (WHERE status = '{status}'), 0) <> 0" for status in STATUSES),
+    )
+    return _DELTA_UPSERT.format(
+        columns=", ".join(STATUSES),
+        select=select,
+        increments=", ".join(f"{status} = s.{status} + EXCLUDED.{status}" for status in STATUSES),
+    )
+
+
+# Триггеры уровня оператора с таблицами переходов: групповые INSERT/UPDATE/DELETE и COPY
+# дают одну запись в task_stats на пару (проект, ответственный), а не на каждую строку
+TRIGGER_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION task_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {_apply_delta("new_rows")};
+        ELSIF TG_OP = 'UPDATE' THEN
+            {_apply_delta("new_rows", "old_rows")};
+        ELSE
+            {_apply_delta("old_rows")};
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    "CREATE OR REPLACE TRIGGER task_stats_insert AFTER INSERT ON task "
+    "REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION task_stats_apply()",
+    "CREATE OR REPLACE TRIGGER task_stats_update AFTER UPDATE ON task "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION task_stats_apply()",
+    "CREATE OR REPLACE TRIGGER task_stats_delete AFTER DELETE ON task "
+    "REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION task_stats_apply()",
+]
+
+_COUNT_TASKS = (
+    "SELECT project_uuid, user_id, "
+    + ", ".join(f"count(*) FILTER (WHERE status = '{status}')" for status in STATUSES)
+    + " FROM task GROUP BY project_uuid, user_id"
+)
+_INSERT_STATS = f"INSERT INTO task_stats (project_uuid, user_id, {', '.join(STATUSES)}) "
+_REBUILD = _INSERT_STATS + _COUNT_TASKS
+
+# Первичное заполнение, когда таблица появилась на базе, где задачи уже есть
+BACKFILL_DDL = _INSERT_STATS + f"SELECT * FROM ({_COUNT_TASKS}) AS counts WHERE NOT EXISTS (SELECT 1 FROM task_stats)"
+
+
+class TaskStats(Base):
+    """
+    Счётчики задач по статусам для пары (проект, ответственный). Поддерживаются
+    триггерами на task в той же транзакции, что и запись задач; приложение их только читает.
+    """
+
+    __tablename__ = 'task_stats'
+
+    project_uuid: Mapped[UUID] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey('project.uuid', ondelete='CASCADE'), primary_key=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey('user.id', ondelete='CASCADE'), primary_key=True, index=True)
+    todo: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    in_progress: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    done: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text('0'))
+    # Время последнего изменения счётчиков: меняется и при удалении задач, которое
+    # не оставляет следа в updated_at задач (версия списка проектов для ETag)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=text('clock_timestamp()::timestamp'), index=True)
+
+    @staticmethod
+    def _counts(row: Any) -> Dict[str, Any]:
+        counts = {status: row[status] or 0 for status in STATUSES}
+        return {'total': sum(counts.values()), 'task_counts': counts}
+
+    @staticmethod
+    async def get_for_project(session: AsyncSession, project_uuid: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Статистика проекта: итог по статусам и разбивка по ответственным. Читает
+        только строки task_stats проекта — стоимость не зависит от числа задач.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            project_uuid (UUID): UUID проекта.
+
+        Returns:
+            Optional[Dict[str, Any]]: Данные формы ProjectStats или None, если проекта нет.
+        """
+        from app.models.project import Project
+
+        stmt = (
+            select(Project.uuid, TaskStats.user_id, *(getattr(TaskStats, status) for status in STATUSES))
+            .outerjoin(TaskStats, TaskStats.project_uuid == Project.uuid)
+            .filter(Project.uuid == project_uuid)
+            .order_by(TaskStats.user_id)
+        )
+        rows = (await session.execute(stmt)).mappings().all()
+        if not rows:
+            return None
+
+        assignees = [
+            {'user_id': row['user_id'], **TaskStats._counts(row)}
+            for row in rows
+            if row['user_id'] is not None and any(row[status] for status in STATUSES)
+        ]
+        totals = {status: sum(assignee['task_counts'][status] for assignee in assignees) for status in STATUSES}
+        return {'project_uuid': project_uuid, **TaskStats._counts(totals), 'assignees': assignees}
+
+    @staticmethod
+    async def get_for_user(session: AsyncSession, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Нагрузка пользователя: задачи по статусам в целом и по проектам.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            user_id (int): id пользователя.
+
+        Returns:
+            Optional[Dict[str, Any]]: Данные формы UserWorkload или None, если пользователя нет.
+        """
+        from app.models.user import User
+
+        stmt = (
+            select(User.id, TaskStats.project_uuid, *(getattr(TaskStats, status) for status in STATUSES))
+            .outerjoin(TaskStats, TaskStats.user_id == User.id)
+            .filter(User.id == user_id)
+            .order_by(TaskStats.project_uuid)
+        )
+        rows = (await session.execute(stmt)).mappings().all()
+        if not rows:
+            return None
+
+        projects = [
+            {'project_uuid': row['project_uuid'], **TaskStats._counts(row)}
+            for row in rows
+            if row['project_uuid'] is not None and any(row[status] for status in STATUSES)
+        ]
+        totals = {status: sum(project['task_counts'][status] for project in projects) for status in STATUSES}
+        return {'user_id': user_id, **TaskStats._counts(totals), 'projects': projects}
+
+    @staticmethod
+    def rebuild_sync(conn: Connection) -> int:
+        """
+        Пересчёт счётчиков с нуля по таблице task (ремонт после ручных правок БД
+        или отключённых триггеров). Запись задач на время пересчёта блокируется,
+        чтобы триггеры не применили приращения к удаляемым строкам.
+
+        Args:
+            conn (Connection): Синхронное соединение внутри транзакции.
+
+        Returns:
+            int: Число записанных строк статистики.
+        """
+
+        conn.execute(text("LOCK TABLE task IN SHARE MODE"))
+        conn.execute(text("LOCK TABLE task_stats IN EXCLUSIVE MODE"))
+        conn.execute(text("DELETE FROM task_stats"))
+        return conn.execute(text(_REBUILD)).rowcount
@@ -1,9 +1,11 @@
 from fastapi import HTTPException, status
-from sqlalchemy import String, BigInteger, Sequence, DateTime, Enum, and_, delete, select, ForeignKey, UUID as PostgresUUID
+from sqlalchemy import String, BigInteger, Integer, Sequence, DateTime, Enum, Float, Index, Computed, and_, any_, bindparam, cast, column, delete, func, insert, literal, literal_column, or_, select, tuple_, union_all, update, values, ForeignKey, text, UUID as PostgresUUID
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
 from app.core.base import Base
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from datetime import datetime
 from app.schemas import user as user_schemas
 from sqlalchemy.exc import IntegrityError
@@ -13,6 +15,14 @@ from app.schemas import user as user_schemas
 from app.utils import user as user_utils
 from app.schemas import task as task_schemas
 
+# Поисковый вектор: заголовок, описание и комментарий с весами A/B/C в русской и английской морфологии
+SEARCH_VECTOR = " || ".join(
+    f"setweight(to_tsvector('{config}', coalesce({field}, '')), '{weight}')"
+    for field, weight in (("title", "A"), ("description", "B"), ("comment", "C"))
+    for config in ("russian", "english")
+)
+
+
 class Task(Base):
     __tablename__ = 'task'
 
@@ -25,11 +35,28 @@ class Task(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey('user.id'))
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
+    # Номер версии для If-Match: каждое изменение задачи увеличивает его на 1
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text('1'))
+    # Генерируемый столбец: БД пересчитывает его при каждой записи строки, в ORM не загружается
+    search_vector: Mapped[str] = mapped_column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True), deferred=True)
 
     user = relationship("User", back_populates="tasks")
     project = relationship("Project", back_populates="tasks")
 
+    # Составные индексы под keyset-пагинацию GET /task: каждый фильтр
+    # превращается в range scan по (..., created_at, uuid)
+    __table_args__ = (
+        Index('ix_task_created_at_uuid', 'created_at', 'uuid'),
+        Index('ix_task_user_id_created_at_uuid', 'user_id', 'created_at', 'uuid'),
+        Index('ix_task_user_id_status_created_at_uuid', 'user_id', 'status', 'created_at', 'uuid'),
+        Index('ix_task_project_uuid_created_at_uuid', 'project_uuid', 'created_at', 'uuid'),
+        Index('ix_task_project_uuid_status_created_at_uuid', 'project_uuid', 'status', 'created_at', 'uuid'),
+        # Полнотекстовый поиск и нечёткий поиск по заголовку (pg_trgm)
+        Index('ix_task_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_task_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
+
     @staticmethod
     async def create_task(session: AsyncSession, payload: task_schemas.TaskCreate) -> 'Task':
         """
@@ -55,21 +82,343 @@ class Task(Base):
         return new_task
     
     @staticmethod
-    async def get_all(session: AsyncSession, start_date: datetime = None, end_date: datetime = None, user_id: int = None) -> List['Task']:
+    async def find_references(session: AsyncSession, user_ids: Iterable[int], project_uuids: Iterable[UUID]) -> Tuple[Set[int], Set[UUID]]:
+        """
+        Проверка существования пользователей и проектов одним запросом.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            user_ids (Iterable[int]): ID ответственных.
+            project_uuids (Iterable[UUID]): UUID проектов.
+
+        Returns:
+            Tuple[Set[int], Set[UUID]]: Существующие ID пользователей и UUID проектов.
+        """
+        from app.models.user import User
+        from app.models.project import Project
+
+        stmt = union_all(
+            select(literal("user").label("kind"), cast(User.id, String).label("key"))
+            .filter(User.id == any_(bindparam("user_ids", list(user_ids), type_=ARRAY(BigInteger)))),
+            select(literal("project").label("kind"), cast(Project.uuid, String).label("key"))
+            .filter(Project.uuid == any_(bindparam("project_uuids", list(project_uuids), type_=ARRAY(PostgresUUID(as_uuid=True))))),
+        )
+        result = await session.execute(stmt)
+
+        users, projects = set(), set()
+        for kind, key in result:
+            if kind == "user":
+                users.add(int(key))
+            else:
+                projects.add(UUID(key))
+        return users, projects
+
+    @staticmethod
+    async def bulk_create(session: AsyncSession, payloads: List[task_schemas.TaskCreate]) -> List[UUID]:
+        """
+        Создание задач одним многострочным INSERT. Транзакцию фиксирует вызывающий код.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            payloads (List[task_schemas.TaskCreate]): Проверенные данные задач.
+
+        Returns:
+            List[UUID]: UUID созданных задач в порядке payloads.
+        """
+
+        if not payloads:
+            return []
+
+        now = datetime.now()
+        rows = [
+            {
+                "uuid": uuid4(),
+                "title": payload.title,
+                "description": payload.description,
+                "status": task_schemas.TaskStatus.todo,
+                "user_id": payload.user_id,
+                "project_uuid": payload.project_uuid,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for payload in payloads
+        ]
+        await session.execute(insert(Task).values(rows))
+        return [row["uuid"] for row in rows]
+
+    @staticmethod
+    async def get_owners_for_update(session: AsyncSession, task_uuids: Iterable[UUID]) -> Dict[UUID, int]:
+        """
+        Ответственные за задачи; строки блокируются до конца транзакции.
+
+        Returns:
+            Dict[UUID, int]: UUID задачи -> ID ответственного (только для существующих задач).
+        """
+
+        stmt = (
+            select(Task.uuid, Task.user_id)
+            .filter(Task.uuid == any_(bindparam("task_uuids", list(task_uuids), type_=ARRAY(PostgresUUID(as_uuid=True)))))
+            .with_for_update()
+        )
+        result = await session.execute(stmt)
+        return {task_uuid: user_id for task_uuid, user_id in result}
+
+    @staticmethod
+    async def bulk_update(session: AsyncSession, items: List[task_schemas.TaskBulkUpdateItem], owner_id: Optional[int] = None) -> Dict[UUID, UUID]:
         """
-        Получение всех задач из базы данных с фильтрацией.
+        Изменение задач одним UPDATE ... FROM (VALUES ...). Незаданные поля не меняются.
+        Транзакцию фиксирует вызывающий код.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            items (List[task_schemas.TaskBulkUpdateItem]): Изменения, не более одного на задачу.
+            owner_id (Optional[int]): Если задан, меняются только задачи этого пользователя.
+
+        Returns:
+            Dict[UUID, UUID]: UUID изменённых задач -> UUID их проектов.
+        """
+
+        if not items:
+            return {}
+
+        changes = values(
+            column("uuid", Task.uuid.type),
+            column("title", Task.title.type),
+            column("description", Task.description.type),
+            column("status", Task.status.type),
+            column("comment", Task.comment.type),
+            name="changes",
+        ).data([(item.uuid, item.title, item.description, item.status, item.comment) for item in items])
+
+        # Столбцы, где во всех строках NULL, PostgreSQL считает text: приводим к типу колонки
+        stmt = (
+            update(Task)
+            .filter(Task.uuid == changes.c.uuid)
+            .values(
+                title=func.coalesce(cast(changes.c.title, Task.title.type), Task.title),
+                description=func.coalesce(cast(changes.c.description, Task.description.type), Task.description),
+                status=func.coalesce(cast(changes.c.status, Task.status.type), Task.status),
+                comment=func.coalesce(cast(changes.c.comment, Task.comment.type), Task.comment),
+                updated_at=datetime.now(),
+                version=Task.version + 1,
+            )
+            .returning(Task.uuid, Task.project_uuid)
+            .execution_options(synchronize_session=False)
+        )
+        if owner_id is not None:
+            stmt = stmt.filter(Task.user_id == owner_id)
+
+        result = await session.execute(stmt)
+        return {task_uuid: project_uuid for task_uuid, project_uuid in result}
+
+    @staticmethod
+    async def bulk_delete(session: AsyncSession, task_uuids: Iterable[UUID]) -> Dict[UUID, UUID]:
+        """
+        Удаление задач одним DELETE ... WHERE uuid = ANY(...). Транзакцию фиксирует вызывающий код.
+
+        Returns:
+            Dict[UUID, UUID]: UUID удалённых задач -> UUID их проектов.
+        """
+
+        stmt = (
+            delete(Task)
+            .filter(Task.uuid == any_(bindparam("task_uuids", list(task_uuids), type_=ARRAY(PostgresUUID(as_uuid=True)))))
+            .returning(Task.uuid, Task.project_uuid)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(stmt)
+        return {task_uuid: project_uuid for task_uuid, project_uuid in result}
+
+    @staticmethod
+    def search_select(query, text: str):
+        """
+        Задачи, подходящие под поисковый запрос: совпадение по search_vector или
+        похожий заголовок (триграммы, опечатки). Столбцы совпадают с Chat.search_select
+        для объединения через UNION ALL.
+
+        Args:
+            query: Выражение tsquery.
+            text (str): Исходный текст запроса для сравнения по триграммам.
+        """
+
+        rank = func.greatest(func.ts_rank_cd(Task.search_vector, query), func.similarity(Task.title, text))
+        return (
+            select(
+                literal_column("'task'").label('kind'),
+                Task.uuid,
+                cast(rank, Float).label('rank'),
+                Task.created_at,
+                Task.title.label('title'),
+                Task.description.label('text'),
+                Task.project_uuid,
+                Task.user_id,
+            )
+            .filter(or_(Task.search_vector.op('@@')(query), Task.title.op('%')(text)))
+        )
+
+    @staticmethod
+    async def get_project_uuids_for_user(session: AsyncSession, user_id: int) -> Set[UUID]:
+        """
+        Проекты, в которых у пользователя есть задачи: их ответы содержат данные пользователя.
+
+        Returns:
+            Set[UUID]: UUID проектов.
+        """
+
+        stmt = select(Task.project_uuid).filter(Task.user_id == user_id).distinct()
+        result = await session.execute(stmt)
+        return set(result.scalars().all())
+
+    @staticmethod
+    async def get_all(
+        session: AsyncSession,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        user_id: int = None,
+        project_uuid: UUID = None,
+        status: task_schemas.TaskStatus = None,
+        order: task_schemas.SortOrder = task_schemas.SortOrder.desc,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> List['Task']:
+        """
+        Получение страницы задач из базы данных с фильтрацией и keyset-пагинацией.
 
         Args:
             session (AsyncSession): Асинхронная сессия SQLAlchemy.
             start_date (datetime): Начальная дата для фильтрации.
             end_date (datetime): Конечная дата для фильтрации.
-            responsible_user_id (int): ID ответственного лица.
+            user_id (int): ID ответственного лица.
+            project_uuid (UUID): UUID проекта.
+            status (task_schemas.TaskStatus): Статус задачи.
+            order (task_schemas.SortOrder): Порядок сортировки по дате создания.
+            after (Optional[Tuple[datetime, UUID]]): Позиция (created_at, uuid), после которой начинается страница.
+            limit (int): Максимальное количество задач.
+
+        Returns:
+            List[Task]: Список задач страницы.
+        """
+
+        stmt = Task._page(
+            select(Task).options(selectinload(Task.user)),
+            start_date, end_date, user_id, project_uuid, status, order, after, limit,
+        )
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_all_rows(
+        session: AsyncSession,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        user_id: int = None,
+        project_uuid: UUID = None,
+        status: task_schemas.TaskStatus = None,
+        order: task_schemas.SortOrder = task_schemas.SortOrder.desc,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Та же страница, что get_all, но одним запросом с JOIN ответственного и без
+        ORM-объектов: строки сразу превращаются в словари формы TaskInfo.
+
+        Returns:
+            List[Dict[str, Any]]: Задачи страницы с вложенным user.
+        """
+
+        stmt = Task._page(
+            Task.info_select(),
+            start_date, end_date, user_id, project_uuid, status, order, after, limit,
+        )
+        result = await session.execute(stmt)
+        return [Task.info_row(row) for row in result]
+
+    @staticmethod
+    def info_columns() -> List[Any]:
+        """Столбцы TaskInfo и InfoUser ответственного: для SELECT и для RETURNING."""
+        from app.models.user import User
+
+        return [
+            Task.uuid, Task.title, Task.description, Task.status, Task.comment,
+            Task.project_uuid, Task.created_at, Task.updated_at, Task.version, Task.user_id,
+            User.full_name.label('user_full_name'),
+            User.role.label('user_role'),
+            User.avatar_image.label('user_avatar_image'),
+            User.created_at.label('user_created_at'),
+        ]
+
+    @staticmethod
+    def info_select():
+        """SELECT столбцов TaskInfo и InfoUser ответственного (для чтения без ORM)."""
+        from app.models.user import User
+
+        return select(*Task.info_columns()).join(User, User.id == Task.user_id)
+
+    @staticmethod
+    def info_row(row) -> Dict[str, Any]:
+        """Строка info_select в виде словаря TaskInfo."""
+
+        return {
+            'uuid': row.uuid,
+            'title': row.title,
+            'description': row.description,
+            'status': row.status,
+            'comment': row.comment,
+            'project_uuid': row.project_uuid,
+            'created_at': row.created_at,
+            'updated_at': row.updated_at,
+            'version': row.version,
+            'user': {
+                'id': row.user_id,
+                'full_name': row.user_full_name,
+                'role': row.user_role,
+                'avatar_image': row.user_avatar_image,
+                'created_at': row.user_created_at,
+            },
+        }
+
+    @staticmethod
+    async def get_page_version(
+        session: AsyncSession,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        user_id: int = None,
+        project_uuid: UUID = None,
+        status: task_schemas.TaskStatus = None,
+        order: task_schemas.SortOrder = task_schemas.SortOrder.desc,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+    ) -> Tuple[Optional[datetime], int, Optional[str]]:
+        """
+        Версия страницы get_all с теми же параметрами: время последнего изменения
+        задач и их ответственных, число задач и хеш их UUID. Читает только индекс
+        страницы и строки пользователей, без загрузки и сериализации задач.
 
         Returns:
-            List[Task]: Список всех задач.
+            Tuple[Optional[datetime], int, Optional[str]]: (last_modified, count, identity).
         """
+        from app.models.user import User
+        from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+        page = Task._page(
+            select(Task.uuid, Task.updated_at, Task.user_id),
+            start_date, end_date, user_id, project_uuid, status, order, after, limit,
+        ).subquery()
+        stmt = (
+            select(
+                func.max(func.greatest(page.c.updated_at, User.updated_at)),
+                func.count(),
+                func.md5(func.string_agg(cast(page.c.uuid, String), aggregate_order_by(literal(","), page.c.uuid))),
+            )
+            .select_from(page)
+            .outerjoin(User, User.id == page.c.user_id)
+        )
+        result = await session.execute(stmt)
+        return tuple(result.one())
 
-        stmt = select(Task).options(selectinload(Task.user))
+    @staticmethod
+    def _page(stmt, start_date, end_date, user_id, project_uuid, status, order, after, limit):
+        """Фильтры, порядок и limit страницы GET /task поверх переданного select."""
 
         # Добавление фильтров
         filters = []
@@ -79,12 +428,25 @@ class Task(Base):
             filters.append(Task.created_at <= end_date)
         if user_id:
             filters.append(Task.user_id == user_id)
+        if project_uuid:
+            filters.append(Task.project_uuid == project_uuid)
+        if status:
+            filters.append(Task.status == status)
+
+        position = tuple_(Task.created_at, Task.uuid)
+        if order == task_schemas.SortOrder.asc:
+            if after:
+                filters.append(position > tuple_(*after))
+            stmt = stmt.order_by(Task.created_at.asc(), Task.uuid.asc())
+        else:
+            if after:
+                filters.append(position < tuple_(*after))
+            stmt = stmt.order_by(Task.created_at.desc(), Task.uuid.desc())
 
         if filters:
             stmt = stmt.where(and_(*filters))
 
-        result = await session.execute(stmt)
-        return result.scalars().all()
+        return stmt.limit(limit)
     
     @staticmethod
     async def get_by_uuid(session: AsyncSession, task_uuid: UUID) -> Optional['Task']:
@@ -108,6 +470,157 @@ class Task(Base):
         task = result.scalar_one_or_none()
         return task
     
+    @staticmethod
+    async def get_version(session: AsyncSession, task_uuid: UUID) -> Optional[Tuple[datetime, int]]:
+        """
+        Версия задачи для ETag: время последнего изменения задачи или её ответственного
+        и столбец version.
+
+        Returns:
+            Optional[Tuple[datetime, int]]: (last_modified, version) или None, если задачи нет.
+        """
+        from app.models.user import User
+
+        stmt = (
+            select(Task.last_modified(), Task.version)
+            .outerjoin(User, User.id == Task.user_id)
+            .filter(Task.uuid == task_uuid)
+        )
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
+    @staticmethod
+    def last_modified():
+        """Время последнего изменения задачи или её ответственного (запрос соединяет task и "user")."""
+        from app.models.user import User
+
+        return func.greatest(Task.updated_at, User.updated_at).label('last_modified')
+
+    @staticmethod
+    async def stream_export_rows(conn: AsyncConnection, project_uuid: UUID, batch_size: int = 1000) -> AsyncIterator[List[Any]]:
+        """
+        Построчное чтение задач проекта для экспорта через серверный курсор.
+
+        Args:
+            conn (AsyncConnection): Соединение, на котором открывается курсор.
+            project_uuid (UUID): UUID проекта.
+            batch_size (int): Сколько строк забирать из курсора за раз.
+
+        Yields:
+            List[Row]: Пачки строк (title, description, full_name, comment).
+        """
+
+        result = await conn.stream(Task._export_rows_select(project_uuid, batch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    @staticmethod
+    def stream_export_rows_sync(conn: Connection, project_uuid: UUID, batch_size: int = 1000) -> Iterator[List[Any]]:
+        """Синхронный вариант stream_export_rows для воркеров фоновых задач."""
+
+        result = conn.execute(Task._export_rows_select(project_uuid, batch_size))
+        for rows in result.partitions():
+            yield rows
+
+    @staticmethod
+    def count_for_project_sync(conn: Connection, project_uuid: UUID) -> int:
+        """Число задач проекта (для прогресса экспорта в фоновой задаче)."""
+
+        return conn.execute(select(func.count()).select_from(Task).filter(Task.project_uuid == project_uuid)).scalar_one()
+
+    @staticmethod
+    def _export_rows_select(project_uuid: UUID, batch_size: int):
+        from app.models.user import User
+
+        return (
+            select(Task.title, Task.description, User.full_name, Task.comment)
+            .join(User, Task.user_id == User.id)
+            .filter(Task.project_uuid == project_uuid)
+            .order_by(Task.created_at, Task.uuid)
+            .execution_options(yield_per=batch_size)
+        )
+
+    @staticmethod
+    async def update_returning(
+        session: AsyncSession,
+        task_uuid: UUID,
+        changes: Dict[str, Any],
+        owner_id: Optional[int] = None,
+        versions: Optional[List[int]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Изменение задачи одним UPDATE ... FROM "user" ... RETURNING: права и версия
+        проверяются в WHERE, ответ с ответственным возвращается тем же запросом.
+        Без изменений задача только читается с теми же условиями, и версия не растёт.
+        Транзакцию фиксирует вызывающий код.
+
+        Args:
+            session (AsyncSession): Асинхронная сессия SQLAlchemy.
+            task_uuid (UUID): UUID задачи.
+            changes (Dict[str, Any]): Новые значения столбцов.
+            owner_id (Optional[int]): Если задан, меняется только задача этого пользователя.
+            versions (Optional[List[int]]): Если заданы, меняется только задача одной из этих версий.
+
+        Returns:
+            Optional[Dict[str, Any]]: Задача в виде словаря TaskInfo (и last_modified для ETag)
+            или None, если условие не выполнено.
+        """
+        from app.models.user import User
+
+        if changes:
+            # Core-UPDATE по таблице: ORM-вариант не умеет RETURNING столбцов присоединённой таблицы
+            stmt = (
+                update(Task.__table__)
+                .filter(Task.uuid == task_uuid, User.id == Task.user_id)
+                .values(**changes, updated_at=datetime.now(), version=Task.version + 1)
+                .returning(*Task.info_columns(), Task.last_modified())
+            )
+        else:
+            # Новая версия без изменений сделала бы устаревшими ETag у других клиентов
+            stmt = (
+                select(*Task.info_columns(), Task.last_modified())
+                .select_from(Task.__table__)
+                .filter(Task.uuid == task_uuid, User.id == Task.user_id)
+            )
+        if owner_id is not None:
+            stmt = stmt.filter(Task.user_id == owner_id)
+        if versions is not None:
+            stmt = stmt.filter(Task.version.in_(versions))
+
+        result = await session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return {**Task.info_row(row), 'last_modified': row.last_modified}
+
+    @staticmethod
+    async def delete_returning(session: AsyncSession, task_uuid: UUID, versions: Optional[List[int]] = None) -> Optional[UUID]:
+        """
+        Удаление задачи одним DELETE ... RETURNING. Транзакцию фиксирует вызывающий код.
+
+        Returns:
+            Optional[UUID]: UUID проекта удалённой задачи или None, если задачи нет или версия не совпала.
+        """
+
+        stmt = delete(Task).filter(Task.uuid == task_uuid).returning(Task.project_uuid)
+        if versions is not None:
+            stmt = stmt.filter(Task.version.in_(versions))
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_owner_id(session: AsyncSession, task_uuid: UUID) -> Optional[int]:
+        """
+        Ответственный задачи: объясняет, почему условная запись не затронула строк.
+
+        Returns:
+            Optional[int]: id ответственного или None, если задачи нет.
+        """
+
+        result = await session.execute(select(Task.user_id).filter(Task.uuid == task_uuid))
+        return result.scalar_one_or_none()
+
     @staticmethod
     async def delete_task(session: AsyncSession, task_uuid: UUID) -> bool:
         """
@@ -3,7 +3,7 @@ from sqlalchemy import String, BigInteger, Sequence, DateTime, Enum, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.base import Base
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from app.schemas import user as user_schemas
 from sqlalchemy.exc import IntegrityError
@@ -32,6 +32,8 @@ class User(Base):
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     password_changed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    # Имя, роль и аватар входят в ответы о задачах и проектах: от этого поля зависят их ETag
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
 
     tasks = relationship("Task", back_populates="user")
     chat = relationship("Chat", back_populates="user")
@@ -134,4 +136,16 @@ class User(Base):
         """
         stmt = select(User)
         result = await session.execute(stmt)
-        return result.scalars().all()
\ No newline at end of file
+        return result.scalars().all()
+
+    @staticmethod
+    async def get_all_rows(session: AsyncSession) -> List[Dict[str, Any]]:
+        """
+        Все пользователи в виде словарей схемы user_schemas.User, без ORM-объектов.
+
+        Returns:
+            List[Dict[str, Any]]: id, full_name, role, avatar_image каждого пользователя.
+        """
+        stmt = select(User.id, User.full_name, User.role, User.avatar_image)
+        result = await session.execute(stmt)
+        return [row._asdict() for row in result]
\ No newline at end of file
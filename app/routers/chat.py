@@ -1,29 +1,75 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from typing import List
-from app.core.dependencies import SessionDep, get_current_user
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, Depends, status
+from typing import List, Optional, Set
+from app.core import database
+from app.core.dependencies import ReadSessionDep, get_current_user
 from app.models.chat import Chat
 from app.models.user import User
 from app.utils import user as user_utils
 from app.schemas import chat as chat_schemas
 from app.core.dependencies import UserTokenDep
 from app.schemas import user as user_schemas
+from app.core.broadcast import broadcaster
+from app.core.config import settings
+from app.utils.chat import ChatConnection, WS_UNKNOWN_MESSAGE, chat_writer, validate_message
 import json
 
 router_chat = APIRouter(prefix="/chat", tags=["Чат"])
-active_connections: List[WebSocket] = []
+active_connections: Set[ChatConnection] = set()
 
 @router_chat.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, session: SessionDep, token: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    token: str,
+    after: Optional[UUID] = None,
+    batch: Optional[bool] = None,
+):
     await websocket.accept()
-    active_connections.append(websocket)
-    
-    current_user = await get_current_user(session, token=token)
-    
+    # Живые сообщения копятся в очереди соединения, пока не отправлены пропущенные.
+    # batch=true — клиент принимает кадры-массивы из нескольких сообщений
+    connection = ChatConnection(websocket, coalesce=batch)
+
     try:
+        # Сессия нужна только на авторизацию и чтение пропущенных: соединение пула возвращается
+        # до цикла приёма, иначе каждый открытый сокет держал бы его "idle in transaction"
+        async with database.SessionLocal() as session:
+            try:
+                auth_user = await get_current_user(session, token=token)
+            except HTTPException:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                return
+            # Имя и аватар для рассылки загружаются один раз на соединение
+            current_user = await User.get_by_id(session, auth_user.id)
+
+            # Рассылка идёт только авторизованным сокетам
+            active_connections.add(connection)
+            missed = []
+            if after is not None:
+                # Лишнее сообщение показывает, что пропущено больше CHAT_REPLAY_LIMIT
+                missed = await Chat.get_all(session, settings.CHAT_REPLAY_LIMIT + 1, after=after)
+
+        if missed is None:
+            await websocket.close(code=WS_UNKNOWN_MESSAGE, reason="Unknown message in 'after'")
+            return
+        await replay(connection, missed)
+        connection.start()
+    
         while True:
             data = await websocket.receive_text()
-            message = chat_schemas.ChatMessageCreate(
+            error = validate_message(data)
+            if error is not None:
+                connection.send(error_frame(error))
+                continue
+            # Запись идёт общим пакетом с сообщениями других сокетов, без отдельного commit на сообщение
+            try:
+                stored = await chat_writer.write(current_user.id, data)
+            except Exception:
+                connection.send(error_frame("Message not saved"))
+                continue
+            message = chat_schemas.ChatMessage(
+                uuid=stored.uuid,
                 message=data, 
+                created_at=stored.created_at,
                 user=user_schemas.InfoUser(
                     id=current_user.id,
                     full_name=current_user.full_name,
@@ -32,14 +78,18 @@ async def websocket_endpoint(websocket: WebSocket, session: SessionDep, token: s
                     avatar_image=current_user.avatar_image
                 )
             )
-            new_message = await Chat.create_chat_message(session, message, current_user.id)
             await broadcast(message)
     except WebSocketDisconnect:
-        active_connections.remove(websocket)
+        pass
+    finally:
+        active_connections.discard(connection)
+        await connection.stop()
 
-async def broadcast(message: chat_schemas.ChatMessageCreate):
-    message_json = json.dumps({
+def serialize_message(message: chat_schemas.ChatMessage) -> str:
+    return json.dumps({
+        "uuid": str(message.uuid),
         "message": message.message,
+        "created_at": message.created_at.isoformat(),
         "user": {
             "id": message.user.id,
             "full_name": message.user.full_name,
@@ -48,14 +98,60 @@ async def broadcast(message: chat_schemas.ChatMessageCreate):
             "avatar_image": message.user.avatar_image
         }
     })
+
+def error_frame(message: str) -> str:
+    """Кадр об ошибке, который получает только отправитель несохранённого сообщения"""
+
+    return json.dumps({"event": "error", "message": message})
+
+async def broadcast(message: chat_schemas.ChatMessage):
+    await broadcaster.publish(serialize_message(message))
+
+async def replay(connection: ChatConnection, messages: List[Chat]):
+    """
+    Отправка пропущенных при переподключении сообщений (дубликаты с живыми отбрасываются клиентом по uuid).
+    Если пропущено больше CHAT_REPLAY_LIMIT, следом идёт кадр {"event": "replay_truncated", "after": <uuid>}:
+    остальное клиент дочитывает через GET /chat/messages?after=<uuid>.
+    """
+    
+    truncated = len(messages) > settings.CHAT_REPLAY_LIMIT
+    messages = messages[:settings.CHAT_REPLAY_LIMIT]
+    frames = [serialize_message(chat_schemas.ChatMessage.model_validate(message, from_attributes=True)) for message in messages]
+    if frames:
+        if connection.coalesce:
+            await connection.websocket.send_text("[" + ",".join(frames) + "]")
+        else:
+            for frame in frames:
+                await connection.websocket.send_text(frame)
+    if truncated:
+        await connection.websocket.send_text(json.dumps({"event": "replay_truncated", "after": str(messages[-1].uuid)}))
+
+async def deliver(message_json: str):
+    """Постановка сообщения из транспорта рассылки в очереди сокетов этого процесса, без ожидания отправки"""
     
-    for connection in active_connections:
-        try:
-            await connection.send_text(message_json)
-        except Exception as e:
-            print(f"Error sending message: {e}")
-            active_connections.remove(connection) 
-@router_chat.get("/messages")
-async def get_messages(session: SessionDep, limit: int = 150):
-    messages = await Chat.get_all(session, limit)
+    for connection in list(active_connections):
+        if not connection.send(message_json):
+            active_connections.discard(connection)
+
+async def startup():
+    await chat_writer.start()
+    await broadcaster.connect(deliver)
+
+async def shutdown():
+    await broadcaster.disconnect()
+    await chat_writer.stop()
+
+@router_chat.get(
+    "/messages",
+    response_model=List[chat_schemas.ChatMessage],
+)
+async def get_messages(
+    session: ReadSessionDep,
+    limit: int = Query(150, ge=1, le=500),
+    before: Optional[UUID] = Query(None, description="UUID сообщения: вернуть более старые (от новых к старым)"),
+    after: Optional[UUID] = Query(None, description="UUID сообщения: вернуть пропущенные более новые (от старых к новым)"),
+):
+    messages = await Chat.get_all(session, limit, before=before, after=after)
+    if messages is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"message": "Message not found"})
     return messages
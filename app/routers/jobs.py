@@ -0,0 +1,164 @@
+import os
+from types import ModuleType, SimpleNamespace
+from typing import Any, Dict
+from uuid import UUID, uuid4
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.dependencies import SessionDep, UserTokenDep
+from app.models.project import Project
+from app.schemas import job as job_schemas
+from app.schemas import user as user_schemas
+
+router_jobs = APIRouter(prefix="/jobs", tags=["Фоновые задачи"])
+
+# Состояния Celery -> статус для клиента. Неизвестный или истёкший id Celery тоже считает PENDING:
+# такие id отличаются отсутствием аргументов, которые _enqueue сохраняет до отправки задачи
+JOB_STATUSES = {
+    "PENDING": job_schemas.JobStatus.queued,
+    "RECEIVED": job_schemas.JobStatus.queued,
+    "RETRY": job_schemas.JobStatus.queued,
+    "STARTED": job_schemas.JobStatus.running,
+    job_schemas.PROGRESS: job_schemas.JobStatus.running,
+    "SUCCESS": job_schemas.JobStatus.succeeded,
+    "FAILURE": job_schemas.JobStatus.failed,
+    "REVOKED": job_schemas.JobStatus.failed,
+}
+
+
+def _job_tasks() -> ModuleType:
+    """Задачи Celery импортируются при первом обращении: воркер API стартует без Celery и kombu."""
+
+    from app.jobs import tasks as job_tasks
+
+    return job_tasks
+
+
+async def _load(job_id: str) -> Dict[str, Any]:
+    """Статус, результат и аргументы задачи одним чтением хранилища (в пуле потоков: клиент блокирующий)."""
+
+    meta = await run_in_threadpool(_job_tasks().celery_app.backend.get_task_meta, job_id)
+    return {"id": job_id, **meta}
+
+
+def _register(job_id: str, task_name: str, kwargs: Dict[str, Any]) -> None:
+    """Записывает PENDING с именем и аргументами задачи в хранилище статусов (блокирующий вызов)."""
+
+    request = SimpleNamespace(id=job_id, task=task_name, args=[], kwargs=kwargs)
+    _job_tasks().celery_app.backend.store_result(job_id, None, "PENDING", request=request)
+
+
+async def _enqueue(request: Request, response: Response, task, **kwargs: Any) -> job_schemas.JobInfo:
+    """
+    Ставит задачу в очередь под заранее выбранным id. Владелец и аргументы сохраняются
+    до отправки в брокер, поэтому GET /jobs/{id} знает задачу, даже пока её не взял воркер.
+    """
+
+    job_id = str(uuid4())
+    await run_in_threadpool(_register, job_id, task.name, kwargs)
+    # Отправка в брокер блокирующая; в режиме JOBS_EAGER здесь же выполняется сама задача
+    await run_in_threadpool(task.apply_async, kwargs=kwargs, task_id=job_id)
+    response.headers["Location"] = str(request.url_for("get_job", job_id=job_id))
+    return _job_info(request, await _load(job_id))
+
+
+def _check_owner(meta: Dict[str, Any], current_user: user_schemas.AuthUser) -> None:
+    # Без сохранённых аргументов задача не ставилась через API или её статус уже истёк
+    kwargs = meta.get("kwargs")
+    if not kwargs or (kwargs.get("owner_id") != current_user.id and current_user.role != user_schemas.Roles.ADMIN):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"message": "Задача не найдена"})
+
+
+def _job_info(request: Request, meta: Dict[str, Any]) -> job_schemas.JobInfo:
+    state, result = meta["status"], meta.get("result")
+    info = job_schemas.JobInfo(id=meta["id"], status=JOB_STATUSES.get(state, job_schemas.JobStatus.queued))
+
+    if state == job_schemas.PROGRESS and isinstance(result, dict):
+        info.progress = job_schemas.JobProgress(done=result.get("done", 0), total=result.get("total", 0))
+    elif info.status == job_schemas.JobStatus.succeeded:
+        info.progress = job_schemas.JobProgress(done=result.get("rows", 0), total=result.get("rows", 0))
+        # Файл есть только у экспорта; у пересчёта статистики результат — сам статус
+        if "path" in result:
+            info.result_url = str(request.url_for("get_job_result", job_id=meta["id"]))
+    elif info.status == job_schemas.JobStatus.failed:
+        info.error = type(result).__name__ if isinstance(result, BaseException) else "Задача отменена"
+    return info
+
+
+@router_jobs.post(
+    path="/tasks-xlsx",
+    response_model=job_schemas.JobInfo,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Поставить экспорт задач проекта в Excel в очередь"
+)
+async def enqueue_tasks_xlsx(
+    session: SessionDep,
+    current_user: UserTokenDep,
+    request: Request,
+    response: Response,
+    project_uuid: UUID = Query(..., description="UUID проекта"),
+):
+    if not await Project.exists(session, project_uuid):
+        raise HTTPException(status_code=404, detail={"message": "Project not found"})
+
+    return await _enqueue(
+        request,
+        response,
+        _job_tasks().export_tasks_xlsx,
+        project_uuid=str(project_uuid),
+        owner_id=current_user.id,
+    )
+
+
+@router_jobs.post(
+    path="/task-stats-rebuild",
+    response_model=job_schemas.JobInfo,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Пересчитать статистику задач по проектам и пользователям"
+)
+async def enqueue_task_stats_rebuild(
+    current_user: UserTokenDep,
+    request: Request,
+    response: Response,
+):
+    if not current_user.role == user_schemas.Roles.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Доступ запрещен"})
+
+    return await _enqueue(request, response, _job_tasks().rebuild_task_stats, owner_id=current_user.id)
+
+
+@router_jobs.get(
+    path="/{job_id}",
+    response_model=job_schemas.JobInfo,
+    summary="Статус и прогресс фоновой задачи"
+)
+async def get_job(
+    job_id: str,
+    current_user: UserTokenDep,
+    request: Request,
+):
+    meta = await _load(job_id)
+    _check_owner(meta, current_user)
+    return _job_info(request, meta)
+
+
+@router_jobs.get(
+    path="/{job_id}/result",
+    summary="Скачать результат фоновой задачи"
+)
+async def get_job_result(
+    job_id: str,
+    current_user: UserTokenDep,
+):
+    meta = await _load(job_id)
+    _check_owner(meta, current_user)
+
+    if meta["status"] != "SUCCESS":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={"message": "Задача ещё не завершена"})
+    result = meta["result"]
+    if "path" not in result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"message": "У задачи нет файла результата"})
+    if not os.path.exists(result["path"]):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail={"message": "Результат задачи удалён"})
+
+    return FileResponse(result["path"], media_type=result["media_type"], filename=result["filename"])
@@ -2,26 +2,56 @@ from uuid import UUID
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from typing import Any, Dict, List, Optional
-from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response, status, Path
-from fastapi.responses import JSONResponse, FileResponse
-from app.core.dependencies import SessionDep
+from typing import Any, Dict, List, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status, Path
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from app.core.dependencies import SessionDep, ReadSessionDep
 from app.models.task import Task
 from app.schemas import task as task_schemas
 from app.models.user import User
 from app.utils import user as user_utils
 from app.schemas import user as user_schemas
-from app.core.dependencies import UserTokenDep
+from app.core.dependencies import UserTokenDep, records_write
 from app.models.project import Project
+from app.models.stats import TaskStats
 from app.schemas import project as project_schemas
-import pandas as pd
+from app.utils import export as export_utils
+from app.utils import conditional as conditional_utils
+from app.core.project_cache import CachedResponse, project_cache
+from app.utils import render as render_utils
+from pydantic import TypeAdapter
+import os
 
 
 
 router_project = APIRouter(prefix="/project", tags=["Проект"])
 
+# Ответы GET собираются из строк без ORM, сериализуются один раз и в таком виде попадают в кэш
+project_adapter = TypeAdapter(task_schemas.ProjectInfo)
+projects_tree_adapter = TypeAdapter(List[task_schemas.ProjectInfo])
+projects_summary_adapter = TypeAdapter(List[project_schemas.ProjectSummary])
+
+
+def _send_cached(request: Request, cached: CachedResponse) -> Response:
+    if conditional_utils.is_not_modified(request, cached.etag, cached.last_modified):
+        return conditional_utils.not_modified(cached.etag, cached.last_modified)
+    response = Response(cached.body, media_type="application/json")
+    conditional_utils.set_validators(response, cached.etag, cached.last_modified)
+    return response
+
+
+async def _raise_write_rejected(session: AsyncSession, project_uuid: UUID) -> None:
+    """Условная запись не затронула строк: проекта нет или If-Match не совпал."""
+
+    if not await Project.exists(session, project_uuid):
+        raise HTTPException(status_code=404, detail={"message": "Проект не найден"})
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={"message": "Проект изменён другим запросом"})
+
+
 @router_project.post(
     path="",
+    dependencies=[Depends(records_write)],
     summary="Создать проект"
 )
 async def create_project(
@@ -33,41 +63,61 @@ async def create_project(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Доступ запрещен"})
     
     new_project = await Project.create_project(session, payload)
+    await project_cache.invalidate([new_project.uuid], "project_create")
     return new_project
 
 
 @router_project.get(
     path="",
     summary="Получить все проекты",
-    response_model=List[task_schemas.ProjectInfo]
+    response_model=Union[List[project_schemas.ProjectSummary], List[task_schemas.ProjectInfo]]
 )
 async def get_projects(
     session: SessionDep,
     current_user: UserTokenDep,
+    request: Request,
+    include_tasks: bool = Query(False, description="Вернуть проекты с полным деревом задач вместо сводки"),
 ):
-    projects = await Project.get_all(session)
-    return projects    
+    key = project_cache.list_key(project_cache.TREE if include_tasks else project_cache.SUMMARIES)
+    cached, generation = await project_cache.get(key)
+    if cached is not None:
+        return _send_cached(request, cached)
+
+    last_modified, projects_count = await Project.get_list_version(session, include_users=include_tasks)
+    etag = conditional_utils.make_etag("projects", include_tasks, last_modified, projects_count)
+    if conditional_utils.is_not_modified(request, etag, last_modified):
+        return conditional_utils.not_modified(etag, last_modified)
+
+    if include_tasks:
+        body = render_utils.render_json(projects_tree_adapter, await Project.get_tree_rows(session))
+    else:
+        body = render_utils.render_json(projects_summary_adapter, await Project.get_summaries(session))
+
+    cached = CachedResponse(body, etag, last_modified)
+    await project_cache.set(key, cached, generation)
+    return _send_cached(request, cached)
     
     
 @router_project.delete(
     path="/{project_uuid}",
+    dependencies=[Depends(records_write)],
     summary="Удалить проект",
     # response_model=List[task_schemas.ProjectInfo]
 )
 async def delete_project(
     session: SessionDep,
     current_user: UserTokenDep,
-    project_uuid = Path(..., title="UUID проекта")
+    request: Request,
+    project_uuid: UUID = Path(..., title="UUID проекта")
 ):
     if not current_user.role == user_schemas.Roles.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Доступ запрещен"})
-    
-    project = await Project.get_by_uuid(session, project_uuid)
-    
-    if project is None:
-        raise HTTPException(status_code=404, detail={"message": "Проект не найден"})
-    
-    await Project.delete_project(session, project_uuid)
+
+    if not await Project.delete_returning(session, project_uuid, conditional_utils.if_match_versions(request)):
+        await _raise_write_rejected(session, project_uuid)
+
+    await session.commit()
+    await project_cache.invalidate([project_uuid], "project_delete")
     return {"message": "Проект удален"}
 
 @router_project.get(
@@ -79,34 +129,72 @@ async def get_project_by_id(
     session: SessionDep,
     project_uuid: UUID,
     current_user: UserTokenDep,
+    request: Request,
 ):
-    project = await Project.get_by_uuid(session, project_uuid)
-    if project is None:
+    key = project_cache.detail_key(project_uuid)
+    cached, generation = await project_cache.get(key)
+    if cached is not None:
+        return _send_cached(request, cached)
+
+    version = await Project.get_version(session, project_uuid)
+    if version is None:
         raise HTTPException(status_code=404, detail={"message": "Проект не найден"})
-    return project
+
+    # Версия проекта — часть ETag до точки: его можно передать в If-Match при PUT/DELETE
+    last_modified, tasks_count, project_version = version
+    etag = conditional_utils.version_etag(project_version, last_modified, tasks_count)
+    if conditional_utils.is_not_modified(request, etag, last_modified):
+        return conditional_utils.not_modified(etag, last_modified)
+
+    projects = await Project.get_tree_rows(session, project_uuid)
+    if not projects:
+        raise HTTPException(status_code=404, detail={"message": "Проект не найден"})
+
+    cached = CachedResponse(render_utils.render_json(project_adapter, projects[0]), etag, last_modified)
+    await project_cache.set(key, cached, generation)
+    return _send_cached(request, cached)
+
+
+@router_project.get(
+    path="/{project_uuid}/stats",
+    summary="Количество задач проекта по статусам и ответственным",
+    response_model=project_schemas.ProjectStats
+)
+async def get_project_stats(
+    session: ReadSessionDep,
+    project_uuid: UUID,
+    current_user: UserTokenDep,
+):
+    stats = await TaskStats.get_for_project(session, project_uuid)
+    if stats is None:
+        raise HTTPException(status_code=404, detail={"message": "Проект не найден"})
+    return stats
 
 
     
-@router_project.put("/{project_uuid}")
+@router_project.put(
+    path="/{project_uuid}",
+    dependencies=[Depends(records_write)],
+    response_model=project_schemas.Project
+)
 async def update_project(
     project_uuid: UUID,
     session: SessionDep,
+    request: Request,
+    response: Response,
     title: Optional[str] = None,
     description: Optional[str] = None,
 ):
-    project = await Project.get_by_uuid(session, project_uuid)
-    if not project:
-        raise HTTPException(status_code=404, detail={"message":"Project not found"})
-
-    if title is not None:
-        project.title = title
-    if description is not None:
-        project.description = description
-    
-    session.add(project)
-    await session.commit()
-    await session.refresh(project)
+    changes = {name: value for name, value in (("title", title), ("description", description)) if value is not None}
+    # If-Match проверяется в WHERE: без предварительной загрузки проекта с задачами
+    project = await Project.update_returning(session, project_uuid, changes, conditional_utils.if_match_versions(request))
+    if project is None:
+        await _raise_write_rejected(session, project_uuid)
 
+    if changes:
+        await session.commit()
+        await project_cache.invalidate([project_uuid], "project_update")
+    response.headers["ETag"] = conditional_utils.version_etag(project["version"])
     return project
 
 
@@ -118,23 +206,32 @@ async def export_tasks(
     project_uuid: UUID,
     session: SessionDep,
 ):
-    project = await Project.get_by_uuid(session, project_uuid)
-    if not project:
+    if not await Project.exists(session, project_uuid):
         raise HTTPException(status_code=404, detail={"message":"Project not found"})
 
-    tasks_data = []
-    
-    for task in project.tasks:
-        print("Вошли в цикл")
+    path = await export_utils.build_tasks_xlsx(project_uuid)
+
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename="tasks.xlsx",
+        background=BackgroundTask(os.remove, path),
+    )
 
-        tasks_data.append({
-            "Заголовок": task.title,
-            "Описание": task.description,
-            "Ответственный": task.user.full_name,
-            "Комментарии": task.comment
-        })
 
-    df = pd.DataFrame(tasks_data)
-    df.to_excel("tasks_export.xlsx", index=False)
+@router_project.get(
+    path="/{project_uuid}/tasks.csv",
+    summary="Экспортировать задачи в CSV",
+)
+async def export_tasks_csv(
+    project_uuid: UUID,
+    session: SessionDep,
+):
+    if not await Project.exists(session, project_uuid):
+        raise HTTPException(status_code=404, detail={"message":"Project not found"})
 
-    return FileResponse("tasks_export.xlsx", media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename="tasks.xlsx")
\ No newline at end of file
+    return StreamingResponse(
+        export_utils.stream_tasks_csv(project_uuid),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="tasks.csv"'},
+    )
@@ -0,0 +1,38 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from app.core.dependencies import ReadSessionDep, UserTokenDep
+from app.schemas import search as search_schemas
+from app.utils import pagination as pagination_utils
+from app.utils import search as search_utils
+
+router_search = APIRouter(prefix="/search", tags=["Поиск"])
+
+@router_search.get(
+    path="",
+    response_model=search_schemas.SearchPage,
+    summary="Поиск по задачам и сообщениям чата"
+)
+async def search(
+    session: ReadSessionDep,
+    current_user: UserTokenDep,
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос: слова, \"фраза\", or, -исключение"),
+    scope: search_schemas.SearchScope = Query(search_schemas.SearchScope.all, description="Где искать"),
+    limit: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor)"),
+):
+    if not q.strip():
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail={"message": "Пустой запрос"})
+
+    hits = await search_utils.search(
+        session,
+        q,
+        scope=scope,
+        after=pagination_utils.decode_rank_cursor(cursor),
+        limit=limit + 1,
+    )
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = pagination_utils.encode_rank_cursor(hits[-1].rank, hits[-1].uuid)
+    return search_schemas.SearchPage(items=hits, next_cursor=next_cursor)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, status
+from app.core import database
+from app.core.dependencies import UserTokenDep
+from app.core.auth_cache import auth_cache
+from app.core.project_cache import project_cache
+from app.core.static import avatar_files
+from app.schemas import user as user_schemas
+from app.utils import user as user_utils
+
+router_system = APIRouter(prefix="/system", tags=["Система"])
+
+@router_system.get(
+    path="/stats",
+    summary="Внутренняя статистика кэшей",
+)
+async def get_stats(
+    current_user: UserTokenDep,
+):
+    if not current_user.role == user_schemas.Roles.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Доступ запрещен"})
+    
+    return {
+        "database_pool": database.pool_stats(),
+        "database_replicas": database.replicas.stats(),
+        "auth_cache": auth_cache.stats(),
+        "project_cache": project_cache.stats(),
+        "password_hashing": user_utils.password_executor.stats(),
+        "avatar_files": avatar_files.stats(),
+    }
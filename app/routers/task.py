@@ -6,19 +6,27 @@ from typing import List
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response, status, Path
 from fastapi.responses import JSONResponse
-from app.core.dependencies import SessionDep
+from app.core.dependencies import SessionDep, ReadSessionDep
 from app.models.task import Task
 from app.schemas import task as task_schemas
 from app.models.user import User
 from app.utils import user as user_utils
 from app.schemas import user as user_schemas
-from app.core.dependencies import UserTokenDep
+from app.core.dependencies import UserTokenDep, records_write
+from app.utils import pagination as pagination_utils
+from app.utils import conditional as conditional_utils
+from app.core.project_cache import project_cache
+from app.utils import render as render_utils
+from pydantic import TypeAdapter
 
 
 router_task = APIRouter(prefix="/task", tags=["Задачи"])
 
+task_page_adapter = TypeAdapter(task_schemas.TaskPage)
+
 @router_task.post(
     path="",
+    dependencies=[Depends(records_write)],
     summary="Создать задачу"
 )
 async def create_task(
@@ -34,22 +42,187 @@ async def create_task(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Access denied"})
     
     new_task = await Task.create_task(session, payload)
+    await project_cache.invalidate([new_task.project_uuid], "task_create")
     return new_task
 
 @router_task.get(
     path="",
-    response_model=List[task_schemas.TaskInfo],
+    response_model=task_schemas.TaskPage,
     summary="Получить все задачи"
 )
 async def get_tasks(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: UserTokenDep,
+    request: Request,
     start_date: datetime = Query(None, description="Начальная дата фильтрации"),
     end_date: datetime = Query(None, description="Конечная дата фильтрации"),
     user_id: int = Query(None, description="ID пользователя"),
+    project_uuid: UUID = Query(None, description="UUID проекта"),
+    status_task: Optional[task_schemas.TaskStatus] = Query(None, alias="status", description="Статус задачи"),
+    order: task_schemas.SortOrder = Query(task_schemas.SortOrder.desc, description="Сортировка по дате создания"),
+    limit: int = Query(50, ge=1, le=500, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы (next_cursor)"),
+):
+    filters = dict(
+        start_date=start_date,
+        end_date=end_date,
+        user_id=user_id,
+        project_uuid=project_uuid,
+        status=status_task,
+        order=order,
+    )
+    # Курсор действует только для тех фильтров и сортировки, с которыми выдан
+    scope = pagination_utils.cursor_scope(**filters)
+    page = dict(filters, after=pagination_utils.decode_cursor(cursor, scope), limit=limit + 1)
+
+    # Дешёвая проверка версии страницы: при совпадении ETag задачи не загружаются
+    last_modified, count, identity = await Task.get_page_version(session, **page)
+    etag = conditional_utils.make_etag("tasks", request.url.query, last_modified, count, identity)
+    if conditional_utils.is_not_modified(request, etag, last_modified):
+        return conditional_utils.not_modified(etag, last_modified)
+
+    tasks = await Task.get_all_rows(session, **page)
+
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_cursor = pagination_utils.encode_cursor(tasks[-1]["created_at"], tasks[-1]["uuid"], scope)
+
+    response = render_utils.json_response(task_page_adapter, {"items": tasks, "next_cursor": next_cursor})
+    conditional_utils.set_validators(response, etag, last_modified)
+    return response
+
+def _too_long(**fields: Optional[str]) -> Optional[str]:
+    for name, value in fields.items():
+        if value is not None and len(value) > Task.__table__.c[name].type.length:
+            return f"Field '{name}' is too long"
+    return None
+
+def _bulk_result(results: List[task_schemas.TaskBulkItemResult]) -> task_schemas.TaskBulkResult:
+    results.sort(key=lambda result: result.index)
+    succeeded = sum(1 for result in results if result.status_code < 400)
+    return task_schemas.TaskBulkResult(succeeded=succeeded, failed=len(results) - succeeded, results=results)
+
+# Маршруты /bulk объявлены раньше /{task_uuid}, иначе "bulk" попадёт в параметр пути
+@router_task.post(
+    path="/bulk",
+    dependencies=[Depends(records_write)],
+    response_model=task_schemas.TaskBulkResult,
+    summary="Создать несколько задач"
+)
+async def create_tasks_bulk(
+    session: SessionDep,
+    payload: task_schemas.TaskBulkCreate,
+    current_user: UserTokenDep,
+):
+    if not current_user.role == user_schemas.Roles.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Access denied"})
+
+    users, projects = await Task.find_references(
+        session,
+        {item.user_id for item in payload.tasks},
+        {item.project_uuid for item in payload.tasks},
+    )
+
+    results = []
+    valid = []
+    for index, item in enumerate(payload.tasks):
+        error = _too_long(title=item.title, description=item.description)
+        if item.user_id not in users:
+            results.append(task_schemas.TaskBulkItemResult(index=index, status_code=404, message="Пользователь не найден"))
+        elif item.project_uuid not in projects:
+            results.append(task_schemas.TaskBulkItemResult(index=index, status_code=404, message="Проект не найден"))
+        elif error:
+            results.append(task_schemas.TaskBulkItemResult(index=index, status_code=422, message=error))
+        else:
+            valid.append((index, item))
+
+    created = await Task.bulk_create(session, [item for _, item in valid])
+    await session.commit()
+    if created:
+        await project_cache.invalidate([item.project_uuid for _, item in valid], "task_bulk_create")
+
+    for (index, _), task_uuid in zip(valid, created):
+        results.append(task_schemas.TaskBulkItemResult(index=index, uuid=task_uuid, status_code=201))
+    return _bulk_result(results)
+
+@router_task.patch(
+    path="/bulk",
+    dependencies=[Depends(records_write)],
+    response_model=task_schemas.TaskBulkResult,
+    summary="Изменить несколько задач"
+)
+async def update_tasks_bulk(
+    session: SessionDep,
+    payload: task_schemas.TaskBulkUpdate,
+    current_user: UserTokenDep,
 ):
-    tasks = await Task.get_all(session, start_date=start_date, end_date=end_date, user_id=user_id)
-    return tasks
+    if current_user.role not in (user_schemas.Roles.ADMIN, user_schemas.Roles.MEMBER):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Access denied"})
+
+    owners = await Task.get_owners_for_update(session, {item.uuid for item in payload.tasks})
+    # Участник может изменять только свои задачи
+    owner_id = current_user.id if current_user.role == user_schemas.Roles.MEMBER else None
+
+    results = []
+    valid = []
+    seen = set()
+    for index, item in enumerate(payload.tasks):
+        error = _too_long(title=item.title, description=item.description, comment=item.comment)
+        if item.uuid in seen:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=item.uuid, status_code=409, message="Duplicate task in request"))
+        elif item.uuid not in owners:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=item.uuid, status_code=404, message="Task not found"))
+        elif owner_id is not None and owners[item.uuid] != owner_id:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=item.uuid, status_code=403, message="Member can only modify their own tasks"))
+        elif error:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=item.uuid, status_code=422, message=error))
+        else:
+            valid.append((index, item))
+        seen.add(item.uuid)
+
+    updated = await Task.bulk_update(session, [item for _, item in valid], owner_id=owner_id)
+    await session.commit()
+    if updated:
+        await project_cache.invalidate(updated.values(), "task_bulk_update")
+
+    for index, item in valid:
+        if item.uuid in updated:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=item.uuid, status_code=200))
+        else:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=item.uuid, status_code=404, message="Task not found"))
+    return _bulk_result(results)
+
+@router_task.delete(
+    path="/bulk",
+    dependencies=[Depends(records_write)],
+    response_model=task_schemas.TaskBulkResult,
+    summary="Удалить несколько задач"
+)
+async def delete_tasks_bulk(
+    session: SessionDep,
+    payload: task_schemas.TaskBulkDelete,
+    current_user: UserTokenDep,
+):
+    if not current_user.role == user_schemas.Roles.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Access denied"})
+
+    deleted = await Task.bulk_delete(session, set(payload.uuids))
+    await session.commit()
+    if deleted:
+        await project_cache.invalidate(deleted.values(), "task_bulk_delete")
+
+    results = []
+    seen = set()
+    for index, task_uuid in enumerate(payload.uuids):
+        if task_uuid in seen:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=task_uuid, status_code=409, message="Duplicate task in request"))
+        elif task_uuid in deleted:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=task_uuid, status_code=200))
+        else:
+            results.append(task_schemas.TaskBulkItemResult(index=index, uuid=task_uuid, status_code=404, message="Task not found"))
+        seen.add(task_uuid)
+    return _bulk_result(results)
 
 @router_task.get(
     path="/{task_uuid}",
@@ -58,75 +231,99 @@ async def get_tasks(
 )
 async def get_task_by_id(
     task_uuid: UUID,
-    session: SessionDep
+    session: ReadSessionDep,
+    request: Request,
+    response: Response,
 ):
+    version = await Task.get_version(session, task_uuid)
+    if version is None:
+        raise HTTPException(status_code=404, detail={"message": "Task not found"})
+
+    # Тот же валидатор, что у PUT: его можно передать в If-Match
+    last_modified, task_version = version
+    etag = conditional_utils.version_etag(task_version, last_modified)
+    if conditional_utils.is_not_modified(request, etag, last_modified):
+        return conditional_utils.not_modified(etag, last_modified)
+
     task = await Task.get_by_uuid(session, task_uuid)
     if task is None:
         raise HTTPException(status_code=404, detail={"message": "Task not found"})
+    conditional_utils.set_validators(response, etag, last_modified)
     return task
 
+async def _raise_write_rejected(session: AsyncSession, task_uuid: UUID, owner_id: Optional[int] = None) -> None:
+    """Условная запись не затронула строк: причина выясняется одним запросом, только на этом пути."""
+
+    task_owner_id = await Task.get_owner_id(session, task_uuid)
+    if task_owner_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"message": "Task not found"})
+    if owner_id is not None and task_owner_id != owner_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"message": "Member can only modify their own tasks"}
+        )
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail={"message": "Task was modified by another request"})
+
 @router_task.put(
     path="/{task_uuid}",
+    dependencies=[Depends(records_write)],
+    response_model=task_schemas.TaskInfo,
     summary="Изменить данные о задаче"
 )
 async def update_task(
     task_uuid: UUID,
     session: SessionDep,
     current_user: UserTokenDep,
+    request: Request,
+    response: Response,
     title: Optional[str] = Query(None),
     description: Optional[str] = Query(None),
     status_task: Optional[task_schemas.TaskStatus] = Query(None),
     comment: Optional[str] = Query(None)
 ):
-    task = await Task.get_by_uuid(session, task_uuid)
-    if not task:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"message": "Task not found"})
-
-    # Проверка прав доступа
+    # Проверка прав доступа: админ меняет любые задачи, участник — только свои
     if current_user.role == user_schemas.Roles.ADMIN:
-        # Админ может изменять все поля задачи
-        pass
+        owner_id = None
     elif current_user.role == user_schemas.Roles.MEMBER:
-        # Обычный пользователь может изменять только статус и комментарий задачи, если она своя
-        if task.user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail={"message": "Member can only modify their own tasks"}
-            )
+        owner_id = current_user.id
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Access denied"})
-    print("com")
-
-    if title is not None:
-        task.title = title
-    if description is not None:
-        task.description = description
-    if status_task is not None:
-        task.status = status_task
-    if comment is not None:
-        print("com")
-        task.comment = comment
 
-    await session.commit()
-    await session.refresh(task)
+    changes = {
+        name: value
+        for name, value in (("title", title), ("description", description), ("status", status_task), ("comment", comment))
+        if value is not None
+    }
+    # Права и If-Match проверяются в WHERE: без предварительного чтения задачи
+    task = await Task.update_returning(session, task_uuid, changes, owner_id, conditional_utils.if_match_versions(request))
+    if task is None:
+        await _raise_write_rejected(session, task_uuid, owner_id)
+
+    if changes:
+        await session.commit()
+        await project_cache.invalidate([task["project_uuid"]], "task_update")
+    response.headers["ETag"] = conditional_utils.version_etag(task["version"], task["last_modified"])
     return task
 
 @router_task.delete(
     path="/{task_uuid}",
+    dependencies=[Depends(records_write)],
     status_code=status.HTTP_200_OK,
     summary="Удалить задачу"
 )
 async def delete_task(
     task_uuid: UUID,
     session: SessionDep,
-    current_user: UserTokenDep
+    current_user: UserTokenDep,
+    request: Request,
 ):
     if not current_user.role == user_schemas.Roles.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Access denied"})
-    
-    task = await Task.get_by_uuid(session, task_uuid)
-    if task is None:
-        raise HTTPException(status_code=404, detail={"message": "Task not found"})
 
-    await Task.delete_task(session, task_uuid)  # Implement this method in your Task model
+    project_uuid = await Task.delete_returning(session, task_uuid, conditional_utils.if_match_versions(request))
+    if project_uuid is None:
+        await _raise_write_rejected(session, task_uuid)
+
+    await session.commit()
+    await project_cache.invalidate([project_uuid], "task_delete")
     return JSONResponse(status_code=status.HTTP_200_OK, content={"message": "Успешно удалено"})
\ No newline at end of file
@@ -1,14 +1,23 @@
 from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Body, Depends, Form, HTTPException, Request, Response, status, Path, UploadFile
 from fastapi.responses import JSONResponse
-from app.core.dependencies import SessionDep
+from app.core.dependencies import SessionDep, ReadSessionDep
 from app.schemas import user as user_schemas
 from app.models.user import User
 from app.utils import user as user_utils
-from app.core.dependencies import UserTokenDep
+from app.core.dependencies import UserTokenDep, records_write
+from app.core.auth_cache import auth_cache
+from app.core.project_cache import project_cache
+from app.models.task import Task
+from app.models.stats import TaskStats
+from app.schemas import project as project_schemas
+from app.utils import render as render_utils
+from pydantic import TypeAdapter
 
 router_user = APIRouter(prefix="/user", tags=["Пользователь"])
 
+users_adapter = TypeAdapter(List[user_schemas.User])
+
 @router_user.post(
     path="/signin",
     summary="Авторизация пользователя",
@@ -108,7 +117,7 @@ async def signup(
     status_code=status.HTTP_200_OK,
 )
 async def get_all_users(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: UserTokenDep,
 ):
     user = await User.get_by_id(session, current_user.id)
@@ -122,17 +131,38 @@ async def get_all_users(
     status_code=status.HTTP_200_OK,
 )
 async def get_all_users(
-    session: SessionDep,
+    session: ReadSessionDep,
     current_user: UserTokenDep,
 ):
     if not current_user.role == user_schemas.Roles.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Доступ запрещен"})
     
-    users = await User.get_all_users(session)
-    return users
+    users = await User.get_all_rows(session)
+    return render_utils.json_response(users_adapter, users)
+
+
+@router_user.get(
+    path="/{user_id}/workload",
+    summary="Нагрузка пользователя: задачи по статусам и проектам",
+    response_model=project_schemas.UserWorkload,
+    status_code=status.HTTP_200_OK,
+)
+async def get_user_workload(
+    session: ReadSessionDep,
+    current_user: UserTokenDep,
+    user_id: int,
+):
+    if current_user.id != user_id and current_user.role != user_schemas.Roles.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Доступ запрещен"})
+
+    workload = await TaskStats.get_for_user(session, user_id)
+    if workload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"message": "Пользователь не найден"})
+    return workload
     
 @router_user.put(
     path="/me",
+    dependencies=[Depends(records_write)],
     response_model=user_schemas.InfoUser
 )
 async def update_user(
@@ -141,26 +171,34 @@ async def update_user(
     full_name: Optional[str] = None,
     avatar_image: Optional[UploadFile] = Form(None)
 ):
+    user = await User.get_by_id(session, current_user.id)
+    
     if full_name is not None:
-        current_user.full_name = full_name
+        user.full_name = full_name
     
     if avatar_image:
         path_image = await user_utils.save_avatar_image(avatar_image)
-        current_user.avatar_image = path_image
+        user.avatar_image = path_image
 
     await session.commit()
-    await session.refresh(current_user)
+    await session.refresh(user)
+    await auth_cache.invalidate(user.id)
+    # Имя и аватар входят в ответы о проектах, где у пользователя есть задачи
+    if full_name is not None or avatar_image:
+        await project_cache.invalidate(await Task.get_project_uuids_for_user(session, user.id), "user_update", summaries=False)
 
-    return current_user
+    return user
 
 
 @router_user.put(
     path="/id/{user_id}",
+    dependencies=[Depends(records_write)],
     response_model=user_schemas.InfoUser
 )
 async def update_user(
     session: SessionDep,
     current_user: UserTokenDep,
+    user_id: int,
     full_name: Optional[str] = None,
     description: Optional[str] = None,
     role: Optional[user_schemas.Roles] = None,
@@ -168,23 +206,31 @@ async def update_user(
 ):
     if not current_user.role == user_schemas.Roles.ADMIN:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"message": "Доступ запрещен"})
+    
+    user = await User.get_by_id(session, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"message": "Пользователь не найден"})
         
     if full_name is not None:
-        current_user.full_name = full_name
+        user.full_name = full_name
         
     if description is not None:
-        current_user.description = full_name
+        user.description = description
         
     if role is not None:
-        current_user.role = role
+        user.role = role
     
     
     if avatar_image:
         path_image = await user_utils.save_avatar_image(avatar_image)
-        current_user.avatar_image = path_image
+        user.avatar_image = path_image
     
-    session.add(current_user)
+    session.add(user)
     await session.commit()
-    await session.refresh(current_user)
+    await session.refresh(user)
+    await auth_cache.invalidate(user.id)
+    # Описание в ответы о проектах не входит
+    if full_name is not None or role is not None or avatar_image:
+        await project_cache.invalidate(await Task.get_project_uuids_for_user(session, user.id), "user_update", summaries=False)
 
-    return current_user
\ No newline at end of file
+    return user
\ No newline at end of file
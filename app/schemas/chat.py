@@ -1,4 +1,5 @@
 from uuid import UUID
+from datetime import datetime
 from pydantic import BaseModel
 from app.schemas import user as user_schemas
 
@@ -10,4 +11,5 @@ class ChatMessageCreate(BaseModel):
 class ChatMessage(BaseModel):
     uuid: UUID
     message: str
+    created_at: datetime
     user: user_schemas.InfoUser
\ No newline at end of file
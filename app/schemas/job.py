@@ -0,0 +1,24 @@
+import enum
+from typing import Optional
+from pydantic import BaseModel
+
+# Состояние Celery для задачи, которая сообщила прогресс (done/total в meta)
+PROGRESS = "PROGRESS"
+
+
+class JobStatus(enum.Enum):
+    queued = 'queued'
+    running = 'running'
+    succeeded = 'succeeded'
+    failed = 'failed'
+
+class JobProgress(BaseModel):
+    done: int
+    total: int
+
+class JobInfo(BaseModel):
+    id: str
+    status: JobStatus
+    progress: Optional[JobProgress] = None
+    result_url: Optional[str] = None
+    error: Optional[str] = None
@@ -3,9 +3,54 @@ from typing import Optional, List
 import enum
 from app.schemas import user as user_schemas
 from datetime import datetime
+from uuid import UUID
 
 
 class ProjectCreate(BaseModel):
     title: str
     description: Optional[str] = None
     
+class Project(BaseModel):
+    uuid: UUID
+    title: str
+    description: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    version: int
+
+class TaskStatusCounts(BaseModel):
+    todo: int = 0
+    in_progress: int = 0
+    done: int = 0
+    
+class ProjectSummary(BaseModel):
+    uuid: UUID
+    title: str
+    description: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    last_updated_at: datetime
+    tasks_total: int
+    task_counts: TaskStatusCounts
+
+class AssigneeStats(BaseModel):
+    user_id: int
+    total: int
+    task_counts: TaskStatusCounts
+
+class ProjectStats(BaseModel):
+    project_uuid: UUID
+    total: int
+    task_counts: TaskStatusCounts
+    assignees: List[AssigneeStats]
+
+class ProjectWorkload(BaseModel):
+    project_uuid: UUID
+    total: int
+    task_counts: TaskStatusCounts
+
+class UserWorkload(BaseModel):
+    user_id: int
+    total: int
+    task_counts: TaskStatusCounts
+    projects: List[ProjectWorkload]
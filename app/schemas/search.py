@@ -0,0 +1,25 @@
+import enum
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class SearchScope(enum.Enum):
+    all = 'all'
+    tasks = 'tasks'
+    chat = 'chat'
+
+class SearchHit(BaseModel):
+    kind: str
+    uuid: UUID
+    rank: float
+    created_at: datetime
+    title: Optional[str] = None
+    text: Optional[str] = None
+    project_uuid: Optional[UUID] = None
+    user_id: int
+
+class SearchPage(BaseModel):
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
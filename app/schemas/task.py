@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 import enum
+from app.core.config import settings
 from app.schemas import user as user_schemas
 from datetime import datetime
 from uuid import UUID
@@ -15,6 +16,10 @@ class TaskStatus(enum.Enum):
     todo = 'todo'
     in_progress = 'in_progress'
     done = 'done'
+
+class SortOrder(enum.Enum):
+    asc = 'asc'
+    desc = 'desc'
     
 class TaskInfo(BaseModel):
     uuid: UUID
@@ -25,8 +30,41 @@ class TaskInfo(BaseModel):
     project_uuid: UUID
     created_at: datetime
     updated_at: datetime
+    version: int
     
     user: user_schemas.InfoUser
+
+class TaskPage(BaseModel):
+    items: List[TaskInfo]
+    next_cursor: Optional[str] = None
+
+class TaskBulkCreate(BaseModel):
+    tasks: List[TaskCreate] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+class TaskBulkUpdateItem(BaseModel):
+    uuid: UUID
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[TaskStatus] = None
+    comment: Optional[str] = None
+
+class TaskBulkUpdate(BaseModel):
+    tasks: List[TaskBulkUpdateItem] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+class TaskBulkDelete(BaseModel):
+    uuids: List[UUID] = Field(..., min_length=1, max_length=settings.TASK_BULK_MAX_ITEMS)
+
+class TaskBulkItemResult(BaseModel):
+    """Результат по одному элементу запроса: index — позиция элемента в запросе"""
+    index: int
+    uuid: Optional[UUID] = None
+    status_code: int
+    message: Optional[str] = None
+
+class TaskBulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[TaskBulkItemResult]
     
 class ProjectInfo(BaseModel):
     uuid: UUID
@@ -34,5 +72,6 @@ class ProjectInfo(BaseModel):
     description: Optional[str] = None
     created_at: datetime
     updated_at: datetime
+    version: int
     tasks: List[TaskInfo]
         
\ No newline at end of file
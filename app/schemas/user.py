@@ -1,8 +1,10 @@
-from pydantic import BaseModel, EmailStr, Field, validator, field_validator
+from pydantic import BaseModel, EmailStr, Field, computed_field, validator, field_validator
+from typing import Dict, Optional
 import enum
 import re
 from fastapi import HTTPException, status
 from datetime import datetime
+from app.utils import avatar as avatar_utils
 
 class Roles(enum.Enum):
     """Схема ролей для пользователей"""
@@ -71,6 +73,11 @@ class User(BaseModel):
     role: Roles
     avatar_image: str
 
+    @computed_field
+    @property
+    def avatar_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        return avatar_utils.avatar_variants(self.avatar_image)
+
     
 class LoginSuccessful(BaseModel):
     """Схема для ответа 200 OK"""
@@ -110,6 +117,17 @@ class InfoUser(BaseModel):
     avatar_image: str
     created_at: datetime
 
+    @computed_field
+    @property
+    def avatar_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        return avatar_utils.avatar_variants(self.avatar_image)
+
+class AuthUser(BaseModel):
+    """Данные пользователя, которых достаточно для авторизации запроса"""
+    id: int
+    role: Roles
+    password_changed_at: datetime
+
 class UserNotFound(BaseModel):
     """Схема для ответа 404 Not Found"""
     message: str = "Пользователь не найден"
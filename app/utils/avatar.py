@@ -0,0 +1,164 @@
+import hashlib
+import os
+import re
+import shutil
+import uuid
+from io import BytesIO
+from typing import Dict, Optional
+from fastapi import HTTPException, UploadFile, status
+from app.core.config import settings
+from app.core.workers import BoundedExecutor
+
+ALLOWED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+ALLOWED_FORMATS = ("PNG", "JPEG", "GIF", "WEBP")
+READ_CHUNK_SIZE = 64 * 1024
+
+# static/avatars/<sha256>/<размер>.<формат>
+VARIANT_PATH_RE = re.compile(r"^(?P<base>.+/(?P<digest>[0-9a-f]{64}))/(?P<size>\d+)\.(?P<ext>png|jpg)$")
+
+avatar_executor = BoundedExecutor(
+    name="avatar",
+    max_workers=settings.AVATAR_WORKERS,
+    max_pending=settings.AVATAR_MAX_PENDING,
+)
+
+
+async def _read_limited(image: UploadFile, max_bytes: int) -> bytes:
+    """Читает загрузку частями и прерывает её, как только превышен лимит размера."""
+
+    chunks = []
+    size = 0
+    while True:
+        chunk = await image.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail={"message": f"Image is too large. Maximum size is {max_bytes} bytes."},
+            )
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def _render_variants(data: bytes, target_dir: str) -> None:
+    """
+    Декодирует изображение и сохраняет квадратные миниатюры AVATAR_SIZES
+    в WebP и в запасном формате (PNG с прозрачностью, иначе JPEG).
+    Выполняется в пуле avatar_executor.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = settings.AVATAR_MAX_PIXELS
+    try:
+        img = Image.open(BytesIO(data))
+        if img.format not in ALLOWED_FORMATS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Invalid image format. Only PNG, JPG, JPEG, GIF, WEBP are allowed."})
+
+        # Размеры известны из заголовка до декодирования: отсекаем «бомбы» заранее
+        width, height = img.size
+        if width * height > settings.AVATAR_MAX_PIXELS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Image resolution is too large."})
+
+        largest = max(settings.AVATAR_SIZES)
+        if img.format == "JPEG":
+            img.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(img)
+
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+        square = ImageOps.fit(img, (largest, largest), method=Image.Resampling.LANCZOS)
+    except HTTPException:
+        raise
+    except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Image resolution is too large."})
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": f"Error processing the image: {str(e)}"})
+
+    fallback_ext = "png" if has_alpha else "jpg"
+    for size in sorted(settings.AVATAR_SIZES, reverse=True):
+        variant = square if size == largest else square.resize((size, size), Image.Resampling.LANCZOS)
+        variant.save(os.path.join(target_dir, f"{size}.webp"), format="WEBP", quality=80, method=4)
+        if has_alpha:
+            variant.save(os.path.join(target_dir, f"{size}.png"), format="PNG", optimize=True)
+        else:
+            variant.save(os.path.join(target_dir, f"{size}.jpg"), format="JPEG", quality=80, optimize=True, progressive=True)
+
+    with open(os.path.join(target_dir, "fallback"), "w") as f:
+        f.write(fallback_ext)
+
+
+def _fallback_path(variant_dir: str, size: int) -> Optional[str]:
+    try:
+        with open(os.path.join(variant_dir, "fallback")) as f:
+            ext = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return f"{variant_dir}/{size}.{ext}"
+
+
+async def save_avatar(image: UploadFile, upload_dir: str = "static/avatars") -> str:
+    """
+    Сохраняет аватар как набор миниатюр под хешем содержимого.
+
+    Загрузка читается с ограничением AVATAR_MAX_UPLOAD_BYTES, декодирование и
+    масштабирование выполняются в пуле avatar_executor. Одинаковые файлы попадают
+    в один и тот же каталог, поэтому повторная загрузка не обрабатывается заново.
+
+    Args:
+        image (UploadFile): Загруженный файл.
+        upload_dir (str): Каталог с аватарами.
+
+    Returns:
+        str: Путь к самой крупной миниатюре в запасном формате (значение User.avatar_image).
+    """
+
+    if not image.filename or not image.filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Invalid image format. Only PNG, JPG, JPEG, GIF, WEBP are allowed."})
+
+    data = await _read_limited(image, settings.AVATAR_MAX_UPLOAD_BYTES)
+    digest = hashlib.sha256(data).hexdigest()
+    variant_dir = os.path.join(upload_dir, digest)
+    largest = max(settings.AVATAR_SIZES)
+
+    existing = _fallback_path(variant_dir, largest)
+    if existing is not None:
+        return existing
+
+    # Миниатюры пишутся во временный каталог и публикуются одним rename
+    tmp_dir = os.path.join(upload_dir, f".{digest}.{uuid.uuid4().hex}")
+    os.makedirs(tmp_dir)
+    try:
+        await avatar_executor.run(_render_variants, data, tmp_dir)
+        try:
+            os.rename(tmp_dir, variant_dir)
+        except OSError:
+            # Тот же файл параллельно обработал другой запрос
+            if _fallback_path(variant_dir, largest) is None:
+                raise
+    finally:
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return _fallback_path(variant_dir, largest)
+
+
+def avatar_variants(avatar_image: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """
+    Набор миниатюр для значения User.avatar_image.
+
+    Returns:
+        Optional[Dict[str, Dict[str, str]]]: {"32": {"webp": ..., "fallback": ...}, ...}
+        или None для аватаров, сохранённых до появления миниатюр.
+    """
+
+    match = VARIANT_PATH_RE.match(avatar_image or "")
+    if match is None:
+        return None
+
+    base, ext = match.group("base"), match.group("ext")
+    return {
+        str(size): {"webp": f"{base}/{size}.webp", "fallback": f"{base}/{size}.{ext}"}
+        for size in sorted(settings.AVATAR_SIZES)
+    }
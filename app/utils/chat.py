@@ -0,0 +1,218 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Optional
+from fastapi import WebSocket, status
+from app.core.config import settings
+from app.core import database
+from app.models.chat import Chat
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DISCONNECT = "disconnect"
+# Код закрытия сокета (диапазон приложения 4000-4999): сообщения из ?after= нет
+WS_UNKNOWN_MESSAGE = 4404
+# Длина столбца chat.message
+MESSAGE_MAX_LENGTH = Chat.__table__.c.message.type.length
+
+
+def validate_message(message: str) -> Optional[str]:
+    """
+    Проверка сообщения по ограничениям столбца chat.message до постановки в пакет записи.
+
+    Returns:
+        Optional[str]: Текст ошибки или None, если сообщение можно сохранить.
+    """
+    if len(message) > MESSAGE_MAX_LENGTH:
+        return f"Message is longer than {MESSAGE_MAX_LENGTH} characters"
+    # PostgreSQL не хранит нулевой символ в текстовых столбцах
+    if "\x00" in message:
+        return "Message contains a NUL character"
+    return None
+
+
+class ChatConnection:
+    """
+    Исходящая очередь одного WebSocket-клиента.
+
+    send() никогда не ждёт сеть: кадр кладётся в ограниченный буфер, а отдельная
+    задача-писатель отправляет его клиенту. Медленный клиент задерживает только
+    свою очередь, а при переполнении срабатывает политика CHAT_OVERFLOW_POLICY.
+    Сообщения, накопившиеся за время одной отправки, уходят одним кадром (JSON-массивом).
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: Optional[int] = None,
+        overflow_policy: Optional[str] = None,
+        coalesce: Optional[bool] = None,
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue or settings.CHAT_SEND_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or settings.CHAT_OVERFLOW_POLICY
+        self.coalesce = settings.CHAT_COALESCE_FRAMES if coalesce is None else coalesce
+        if self.overflow_policy not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DISCONNECT):
+            raise ValueError(f"Unknown CHAT_OVERFLOW_POLICY: {self.overflow_policy}")
+
+        self.closed = False
+        self.dropped = 0
+        self._buffer: Deque[str] = deque()
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self.closed = True
+        self._ready.set()
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+    def send(self, message: str) -> bool:
+        """
+        Ставит сообщение в очередь клиента без ожидания.
+
+        Returns:
+            bool: False, если соединение закрыто или отключено за переполнение.
+        """
+        if self.closed:
+            return False
+
+        if len(self._buffer) >= self.max_queue:
+            if self.overflow_policy == OVERFLOW_DISCONNECT:
+                self.closed = True
+                self._ready.set()
+                return False
+            self._buffer.popleft()
+            self.dropped += 1
+
+        self._buffer.append(message)
+        self._ready.set()
+        return True
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+
+                while self._buffer and not self.closed:
+                    if self.coalesce and len(self._buffer) > 1:
+                        frames = list(self._buffer)
+                        self._buffer.clear()
+                        await self.websocket.send_text("[" + ",".join(frames) + "]")
+                    else:
+                        await self.websocket.send_text(self._buffer.popleft())
+
+                if self.closed:
+                    self._buffer.clear()
+                    await self.websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Error sending message: {e}")
+            self.closed = True
+
+
+class ChatWriter:
+    """
+    Групповая запись сообщений чата.
+
+    write() ставит сообщение в очередь и ждёт подтверждения записи. Фоновая задача
+    собирает накопившиеся сообщения (не более CHAT_WRITE_BATCH_SIZE, ожидая новые
+    не дольше CHAT_WRITE_FLUSH_INTERVAL_MS) и сохраняет их одним многострочным
+    INSERT в одной транзакции, после чего подтверждает каждое сообщение его uuid
+    и created_at. Если пакет не записался, сообщения записываются по одному, и
+    ошибку получает только то, которое не удалось сохранить.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval_ms: Optional[int] = None, max_queue: Optional[int] = None):
+        self.batch_size = batch_size or settings.CHAT_WRITE_BATCH_SIZE
+        self.flush_interval = (settings.CHAT_WRITE_FLUSH_INTERVAL_MS if flush_interval_ms is None else flush_interval_ms) / 1000
+        self.max_queue = max_queue or settings.CHAT_WRITE_QUEUE_SIZE
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Дописывает всё, что уже в очереди, и останавливает фоновую задачу."""
+        if self._flusher is None:
+            return
+        await self._queue.put(None)
+        await self._flusher
+        self._flusher = None
+
+    async def write(self, user_id: int, message: str):
+        """
+        Сохраняет сообщение в составе ближайшего пакета.
+
+        Returns:
+            Row: uuid и created_at сохранённого сообщения (после фиксации транзакции).
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(({"user_id": user_id, "message": message}, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    if self._queue.empty():
+                        timeout = deadline - loop.time()
+                        if timeout <= 0:
+                            break
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch) -> None:
+        try:
+            async with database.engine.begin() as conn:
+                rows = await Chat.insert_chat_messages(conn, [values for values, _ in batch])
+        except Exception as e:
+            if len(batch) > 1:
+                # Одна неподходящая строка отменяет весь INSERT: остальные сообщения не должны теряться
+                logger.warning(f"Chat batch write failed, retrying {len(batch)} messages one by one: {e}")
+                for item in batch:
+                    await self._flush([item])
+                return
+            logger.exception("Chat message write failed")
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(e)
+            return
+
+        for (_, future), row in zip(batch, rows):
+            if not future.done():
+                future.set_result(row)
+
+
+chat_writer = ChatWriter()
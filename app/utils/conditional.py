@@ -0,0 +1,96 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, List, Optional
+from fastapi import Request, Response, status
+
+# Ответы зависят от пользователя: общие кэши не хранят, браузер перепроверяет каждый раз
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Слабый ETag из версии данных (updated_at, количество, идентификаторы) и
+    параметров запроса, от которых зависит представление.
+    """
+
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return 'W/"' + hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest() + '"'
+
+
+def _http_date(value: datetime) -> str:
+    # В БД хранится локальное время без часового пояса
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Проверка If-None-Match / If-Modified-Since. Если передан If-None-Match,
+    If-Modified-Since не учитывается (RFC 9110, 13.1.3).
+    """
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Слабое сравнение: W/ не учитывается
+        opaque = etag.removeprefix("W/")
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or opaque in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified is not None:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
+
+
+def version_etag(version: int, *parts: Any) -> str:
+    """
+    Сильный ETag записи: её столбец version, который клиент передаёт в If-Match при изменении.
+    Если ответ включает связанные данные (ответственного, задачи проекта), их версия
+    добавляется через точку: "<version>.<хэш>". If-Match сравнивает только version.
+    """
+
+    if not parts:
+        return f'"{version}"'
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'"{version}.' + hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest()[:16] + '"'
+
+
+def if_match_versions(request: Request) -> Optional[List[int]]:
+    """
+    Версии из If-Match (теги version_etag, в том числе из ответа GET). None — заголовка нет
+    или передан *, запись не проверяется; пустой список — ни один тег не является версией,
+    и условие не выполнится.
+    """
+
+    if_match = request.headers.get("if-match")
+    if if_match is None or if_match.strip() == "*":
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        # Слабые теги в If-Match не совпадают ни с чем (RFC 9110, 13.1.1)
+        tag = tag.strip()
+        if not (len(tag) >= 2 and tag.startswith('"') and tag.endswith('"')):
+            continue
+        version = tag[1:-1].split(".", 1)[0]
+        if version.isdigit():
+            versions.append(int(version))
+    return versions
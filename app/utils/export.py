@@ -0,0 +1,115 @@
+import csv
+import io
+import os
+import tempfile
+from typing import Any, AsyncIterator, Callable, Optional, Sequence
+from uuid import UUID
+from starlette.concurrency import run_in_threadpool
+from app.core import database
+from app.models.task import Task
+
+EXPORT_COLUMNS = ["Заголовок", "Описание", "Ответственный", "Комментарии"]
+EXPORT_BATCH_SIZE = 1000
+
+
+def _csv_chunk(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_tasks_csv(project_uuid: UUID) -> AsyncIterator[bytes]:
+    """
+    Потоковый CSV с задачами проекта: строки читаются серверным курсором
+    и отдаются клиенту пачками, целиком в памяти файл не собирается.
+
+    Args:
+        project_uuid (UUID): UUID проекта.
+
+    Yields:
+        bytes: Очередной фрагмент CSV (UTF-8 с BOM, чтобы Excel понял кодировку).
+    """
+
+    yield "\ufeff".encode("utf-8") + _csv_chunk([EXPORT_COLUMNS])
+
+    # Своё соединение: генератор выполняется уже после закрытия сессии запроса
+    async with database.engine.connect() as conn:
+        async for rows in Task.stream_export_rows(conn, project_uuid, EXPORT_BATCH_SIZE):
+            yield await run_in_threadpool(_csv_chunk, rows)
+
+
+def _xlsx_append(sheet, rows: Sequence[Sequence[Any]]) -> None:
+    for row in rows:
+        sheet.append(list(row))
+
+
+def _xlsx_save(workbook, path: str) -> None:
+    workbook.save(path)
+
+
+async def build_tasks_xlsx(project_uuid: UUID) -> str:
+    """
+    Собирает XLSX с задачами проекта во временном файле запроса.
+
+    openpyxl в режиме write_only сбрасывает строки на диск по мере записи,
+    поэтому память не зависит от числа задач. Вся работа с книгой идёт в пуле потоков.
+
+    Args:
+        project_uuid (UUID): UUID проекта.
+
+    Returns:
+        str: Путь к временному файлу; удалить его должен вызывающий код.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Задачи")
+    sheet.append(EXPORT_COLUMNS)
+
+    fd, path = tempfile.mkstemp(prefix="tasks_export_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        async with database.engine.connect() as conn:
+            async for rows in Task.stream_export_rows(conn, project_uuid, EXPORT_BATCH_SIZE):
+                await run_in_threadpool(_xlsx_append, sheet, rows)
+
+        await run_in_threadpool(_xlsx_save, workbook, path)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return path
+
+
+def write_tasks_xlsx(project_uuid: UUID, path: str, on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Синхронная сборка XLSX для воркеров фоновых задач: читает задачи через
+    синхронный движок и сообщает прогресс после каждой пачки строк.
+
+    Args:
+        project_uuid (UUID): UUID проекта.
+        path (str): Куда сохранить файл.
+        on_progress (Optional[Callable[[int, int], None]]): Вызывается с (записано, всего).
+
+    Returns:
+        int: Число выгруженных задач.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Задачи")
+    sheet.append(EXPORT_COLUMNS)
+
+    done = 0
+    with database.get_engine_sync().connect() as conn:
+        total = Task.count_for_project_sync(conn, project_uuid)
+        if on_progress is not None:
+            on_progress(done, total)
+        for rows in Task.stream_export_rows_sync(conn, project_uuid, EXPORT_BATCH_SIZE):
+            _xlsx_append(sheet, rows)
+            done += len(rows)
+            if on_progress is not None:
+                on_progress(done, total)
+
+    _xlsx_save(workbook, path)
+    return done
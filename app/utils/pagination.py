@@ -0,0 +1,110 @@
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+
+
+def cursor_scope(**params: Any) -> str:
+    """
+    Отпечаток фильтров и сортировки, для которых выдан курсор.
+
+    Позиция курсора имеет смысл только в той же выборке: с другими фильтрами или
+    обратной сортировкой клиент молча пропустил бы или повторил записи.
+
+    Args:
+        **params: Фильтры и сортировка запроса (размер страницы не входит).
+
+    Returns:
+        str: Короткий хеш параметров.
+    """
+
+    raw = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(created_at: datetime, uuid: UUID, scope: str) -> str:
+    """
+    Кодирует позицию в ленте (created_at, uuid) в непрозрачный курсор.
+
+    Args:
+        created_at (datetime): Время создания последней записи страницы.
+        uuid (UUID): Идентификатор последней записи страницы.
+        scope (str): Отпечаток выборки из cursor_scope.
+
+    Returns:
+        str: Курсор для следующего запроса.
+    """
+
+    raw = json.dumps({"c": created_at.isoformat(), "u": str(uuid), "s": scope}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], scope: str) -> Optional[Tuple[datetime, UUID]]:
+    """
+    Раскодирует курсор, выданный encode_cursor.
+
+    Args:
+        cursor (Optional[str]): Курсор из запроса клиента.
+        scope (str): Отпечаток выборки текущего запроса из cursor_scope.
+
+    Returns:
+        Optional[Tuple[datetime, UUID]]: Позиция (created_at, uuid) или None, если курсор не передан.
+
+    Raises:
+        HTTPException: 400, если курсор повреждён или выдан для других фильтров или сортировки.
+    """
+
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        position = datetime.fromisoformat(data["c"]), UUID(data["u"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Invalid cursor"})
+
+    if data.get("s") != scope:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Cursor does not match the query filters or order"})
+    return position
+
+
+def encode_rank_cursor(rank: float, uuid: UUID) -> str:
+    """
+    Кодирует позицию в выдаче, упорядоченной по релевантности (rank, uuid).
+
+    Args:
+        rank (float): Релевантность последней записи страницы.
+        uuid (UUID): Идентификатор последней записи страницы.
+
+    Returns:
+        str: Курсор для следующего запроса.
+    """
+
+    raw = json.dumps({"r": rank, "u": str(uuid)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(cursor: Optional[str]) -> Optional[Tuple[float, UUID]]:
+    """
+    Раскодирует курсор, выданный encode_rank_cursor.
+
+    Args:
+        cursor (Optional[str]): Курсор из запроса клиента.
+
+    Returns:
+        Optional[Tuple[float, UUID]]: Позиция (rank, uuid) или None, если курсор не передан.
+    """
+
+    if not cursor:
+        return None
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return float(data["r"]), UUID(data["u"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Invalid cursor"})
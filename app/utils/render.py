@@ -0,0 +1,25 @@
+from typing import Any
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def render_json(adapter: TypeAdapter, data: Any) -> bytes:
+    """
+    Проверка и сериализация ответа в pydantic-core за один проход: без ORM-объектов,
+    jsonable_encoder и json.dumps, которыми FastAPI обрабатывает response_model.
+
+    Args:
+        adapter (TypeAdapter): Заранее собранный адаптер схемы ответа.
+        data (Any): Словари или списки словарей в форме схемы.
+
+    Returns:
+        bytes: JSON ответа.
+    """
+
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+def json_response(adapter: TypeAdapter, data: Any) -> Response:
+    """Response с JSON из render_json."""
+
+    return Response(render_json(adapter, data), media_type="application/json")
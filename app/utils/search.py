@@ -0,0 +1,68 @@
+import re
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, desc, func, literal_column, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.chat import Chat
+from app.models.task import Task
+from app.schemas import search as search_schemas
+
+# Слова запроса для префиксного поиска: буквы и цифры без подчёркиваний и операторов tsquery
+WORD_RE = re.compile(r"[^\W_]+")
+
+
+def build_tsquery(text: str):
+    """
+    tsquery поиска: фраза в синтаксисе websearch (кавычки, or, -слово) в русской и
+    английской морфологии, а также префиксы всех слов, чтобы находить недописанные слова.
+    """
+
+    query = (
+        func.websearch_to_tsquery(literal_column("'russian'::regconfig"), text)
+        .op('||')(func.websearch_to_tsquery(literal_column("'english'::regconfig"), text))
+    )
+
+    words = WORD_RE.findall(text.lower())[:settings.SEARCH_MAX_PREFIX_WORDS]
+    if words:
+        prefix = " & ".join(f"{word}:*" for word in words)
+        query = query.op('||')(func.to_tsquery(literal_column("'simple'::regconfig"), bindparam("prefix_query", prefix)))
+    return query
+
+
+async def search(
+    session: AsyncSession,
+    text: str,
+    scope: search_schemas.SearchScope = search_schemas.SearchScope.all,
+    after: Optional[Tuple[float, UUID]] = None,
+    limit: int = 20,
+) -> List[search_schemas.SearchHit]:
+    """
+    Задачи и сообщения чата по убыванию релевантности. Кандидатов отбирают GIN-индексы
+    search_vector и триграмм, ранжируются только они.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия SQLAlchemy.
+        text (str): Поисковый запрос.
+        scope (SearchScope): Где искать.
+        after (Optional[Tuple[float, UUID]]): Позиция (rank, uuid), после которой начинается страница.
+        limit (int): Размер страницы.
+
+    Returns:
+        List[SearchHit]: Найденные записи.
+    """
+
+    query = build_tsquery(text)
+    selects = []
+    if scope in (search_schemas.SearchScope.all, search_schemas.SearchScope.tasks):
+        selects.append(Task.search_select(query, text))
+    if scope in (search_schemas.SearchScope.all, search_schemas.SearchScope.chat):
+        selects.append(Chat.search_select(query, text))
+
+    hits = union_all(*selects).subquery() if len(selects) > 1 else selects[0].subquery()
+    stmt = select(hits).order_by(desc(hits.c.rank), desc(hits.c.uuid)).limit(limit)
+    if after is not None:
+        stmt = stmt.filter(tuple_(hits.c.rank, hits.c.uuid) < tuple_(*after))
+
+    result = await session.execute(stmt)
+    return [search_schemas.SearchHit.model_validate(row, from_attributes=True) for row in result]
@@ -3,17 +3,33 @@ import bcrypt
 import pytz
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.core.workers import BoundedExecutor
+from app.utils import avatar as avatar_utils
 import jwt
 from fastapi import HTTPException, UploadFile, status
+from fastapi.security.utils import get_authorization_scheme_param
 from sqlalchemy.ext.asyncio import AsyncSession
-from PIL import Image
-from io import BytesIO
 from uuid import UUID, uuid4
 import os
+from typing import Optional
+
+password_executor = BoundedExecutor(
+    name="bcrypt",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+def _hash_password(plain_password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(plain_password.encode('utf-8'), salt).decode('utf-8')
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 async def hash_password(plain_password: str) -> str:
     """
-    Хеширует предоставленный пароль с использованием bcrypt.
+    Хеширует предоставленный пароль с использованием bcrypt в пуле password_executor,
+    не блокируя event loop.
 
     Args:
         plain_password (str): Пароль для хеширования.
@@ -22,13 +38,12 @@ async def hash_password(plain_password: str) -> str:
         str: Хешированный пароль.
     """
     
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(plain_password.encode('utf-8'), salt)
-    return hashed_password.decode('utf-8')
+    return await password_executor.run(_hash_password, plain_password)
 
 async def check_password(plain_password: str, hashed_password: str) -> bool:
     """
     Проверяет, совпадает ли предоставленный пароль с хешированным паролем.
+    bcrypt выполняется в пуле password_executor, не блокируя event loop.
 
     Args:
         plain_password (str): Пароль для проверки.
@@ -38,7 +53,7 @@ async def check_password(plain_password: str, hashed_password: str) -> bool:
         bool: True, если пароли совпадают, False - в противном случае.
     """
     
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return await password_executor.run(_check_password, plain_password, hashed_password)
 
 
 async def get_moscow_time():
@@ -80,6 +95,22 @@ async def create_refresh_token(user: User):
     encoded_refresh_token = jwt.encode(jwt_data, settings.SECRET_KEY, "HS256")
     return encoded_refresh_token
 
+def get_token_user_id(authorization: Optional[str]) -> Optional[int]:
+    """
+    id пользователя из заголовка Authorization без обращения к БД.
+
+    Returns:
+        Optional[int]: None, если токена нет или он недействителен.
+    """
+
+    scheme, token = get_authorization_scheme_param(authorization)
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(jwt=token, key=settings.SECRET_KEY, algorithms=["HS256"]).get("sub")
+    except jwt.PyJWTError:
+        return None
+
 async def get_user_by_refresh_token(session: AsyncSession, refresh_token: str):
     """Получить пользователя по refresh-токену"""
 
@@ -109,40 +140,7 @@ async def get_user_by_refresh_token(session: AsyncSession, refresh_token: str):
     
     
     
-def _save_image(image: UploadFile, IMAGE_UPLOAD_DIR, quality=75):
-    allowed_extensions = (".png", ".jpg", ".jpeg", ".gif")
-    
-    if not image.filename.endswith(allowed_extensions):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"message": "Invalid image format. Only PNG, JPG, JPEG, GIF are allowed."})
-
-    file_extension = image.filename.split(".")[-1]
-    filename = f"{uuid4()}.{file_extension}"
-
-    filepath = os.path.join(IMAGE_UPLOAD_DIR, filename)
-
-    try:
-        # Открываем изображение через Pillow
-        img = Image.open(BytesIO(image.file.read()))
-
-        # Если изображение PNG с прозрачностью (RGBA), сохраняем как PNG с оптимизацией
-        if img.mode in ("RGBA", "LA"):
-            img.save(filepath, format="PNG", optimize=True)
-
-        # Если изображение не прозрачное или в формате JPEG, уменьшаем его вес с параметром качества
-        else:
-            if img.format in ("JPEG", "JPG"):
-                img.save(filepath, format="JPEG", quality=quality, optimize=True)
-            else:
-                img.save(filepath, format="PNG", optimize=True)
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing the image: {str(e)}")
-
-    return filepath
-
 async def save_avatar_image(image: UploadFile):
     if image is None: return None
-    IMAGE_UPLOAD_DIR = "static/avatars/"
-    return _save_image(image, IMAGE_UPLOAD_DIR)
-
-
+    IMAGE_UPLOAD_DIR = "static/avatars"
+    return await avatar_utils.save_avatar(image, IMAGE_UPLOAD_DIR)
@@ -0,0 +1,286 @@
+"""
+Нагрузочный тест HTTP API и чата.
+
+Запускается против работающего приложения (python main.py или uvicorn main:app)
+на данных из benchmarks.seed. Воркеры выполняют запросы по весам выбранного
+сценария, параллельно WebSocket-клиенты шлют сообщения в чат и измеряют время
+до получения своего сообщения обратно через рассылку.
+
+Печатает пропускную способность и p50/p95/p99 по каждой операции и сохраняет
+результаты в JSON (benchmarks/results/), чтобы сравнивать коммиты между собой:
+
+    python -m benchmarks.load --mix default --duration 60 --concurrency 64 --ws-clients 50
+    python -m benchmarks.load --compare benchmarks/results/<прошлый прогон>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+import websockets
+from sqlalchemy import select, text
+from app.core import database
+from app.models.project import Project
+from app.models.task import Task
+from benchmarks.seed import SEED_PASSWORD, SEED_PREFIX
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SAMPLE_SIZE = 1000
+
+# Операция -> вес в сценарии
+MIXES: Dict[str, Dict[str, int]] = {
+    "default": {"signin": 2, "task list": 35, "task detail": 15, "project summaries": 10, "project tree": 8, "task update": 15, "chat history": 15},
+    "read": {"task list": 50, "task detail": 20, "project summaries": 15, "project tree": 10, "chat history": 5},
+    "write": {"task update": 60, "task create": 20, "task list": 20},
+}
+
+
+class Context:
+    """Токены и выборка идентификаторов из засеянных данных."""
+
+    def __init__(self, tokens: List[str], logins: List[str], project_uuids: List[str], task_uuids: List[str], user_ids: List[int]):
+        self.tokens = tokens
+        self.logins = logins
+        self.project_uuids = project_uuids
+        self.task_uuids = task_uuids
+        self.user_ids = user_ids
+
+
+def _auth(ctx: Context, rng: random.Random) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {rng.choice(ctx.tokens)}"}
+
+
+OPERATIONS: Dict[str, Callable[[Context, random.Random], Dict[str, Any]]] = {
+    "signin": lambda ctx, rng: {"method": "POST", "url": "/user/signin", "json": {"login": rng.choice(ctx.logins), "password": SEED_PASSWORD}},
+    "task list": lambda ctx, rng: {"method": "GET", "url": "/task", "params": {"limit": 50}, "headers": _auth(ctx, rng)},
+    "task detail": lambda ctx, rng: {"method": "GET", "url": f"/task/{rng.choice(ctx.task_uuids)}", "headers": _auth(ctx, rng)},
+    "project summaries": lambda ctx, rng: {"method": "GET", "url": "/project", "headers": _auth(ctx, rng)},
+    "project tree": lambda ctx, rng: {"method": "GET", "url": f"/project/{rng.choice(ctx.project_uuids)}", "headers": _auth(ctx, rng)},
+    "task update": lambda ctx, rng: {
+        "method": "PUT", "url": f"/task/{rng.choice(ctx.task_uuids)}",
+        "params": {"comment": f"load {rng.randrange(10**6)}"}, "headers": _auth(ctx, rng),
+    },
+    "task create": lambda ctx, rng: {
+        "method": "POST", "url": "/task", "headers": _auth(ctx, rng),
+        "json": {"title": "Нагрузка", "user_id": rng.choice(ctx.user_ids), "project_uuid": rng.choice(ctx.project_uuids)},
+    },
+    "chat history": lambda ctx, rng: {"method": "GET", "url": "/chat/messages", "params": {"limit": 50}, "headers": _auth(ctx, rng)},
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    def add(self, name: str, seconds: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def fail(self, name: str, count: int = 1) -> None:
+        if self.recording:
+            self.errors[name] += count
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу; values должны быть отсортированы."""
+
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(round(q / 100 * len(values))) - 1))
+    return values[index]
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, Dict[str, Any]]:
+    summary = {}
+    for name in sorted(set(recorder.latencies) | set(recorder.errors)):
+        values = sorted(recorder.latencies.get(name, []))
+        summary[name] = {
+            "count": len(values),
+            "errors": recorder.errors.get(name, 0),
+            "rps": round(len(values) / duration, 1),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+        }
+    return summary
+
+
+async def load_context(client: httpx.AsyncClient, sessions: int) -> Context:
+    async with database.engine.connect() as conn:
+        admins = (await conn.execute(
+            text("SELECT id, login FROM \"user\" WHERE login LIKE :prefix AND role = 'ADMIN' ORDER BY id LIMIT :n"),
+            {"prefix": f"{SEED_PREFIX}\\_%", "n": sessions},
+        )).all()
+        users = (await conn.execute(
+            text("SELECT id, login FROM \"user\" WHERE login LIKE :prefix ORDER BY id LIMIT :n"),
+            {"prefix": f"{SEED_PREFIX}\\_%", "n": SAMPLE_SIZE},
+        )).all()
+        project_uuids = (await conn.execute(
+            select(Project.uuid).filter(Project.title.like(f"{SEED_PREFIX}:%")).limit(SAMPLE_SIZE)
+        )).scalars().all()
+        task_uuids = (await conn.execute(
+            select(Task.uuid).filter(Task.project_uuid.in_(project_uuids)).limit(SAMPLE_SIZE)
+        )).scalars().all()
+    await database.dispose_engines()
+
+    if not admins or not task_uuids:
+        raise SystemExit("No seeded data found, run python -m benchmarks.seed first")
+
+    # Сессии открываются под администраторами: им разрешены все операции сценариев
+    tokens = []
+    for _, login in admins:
+        response = await client.post("/user/signin", json={"login": login, "password": SEED_PASSWORD})
+        response.raise_for_status()
+        tokens.append(response.json()["token"])
+
+    return Context(
+        tokens,
+        logins=[login for _, login in users],
+        project_uuids=[str(uuid) for uuid in project_uuids],
+        task_uuids=[str(uuid) for uuid in task_uuids],
+        user_ids=[user_id for user_id, _ in users],
+    )
+
+
+async def http_worker(client: httpx.AsyncClient, ctx: Context, mix: Dict[str, int], recorder: Recorder, stop: asyncio.Event, seed: int) -> None:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while not stop.is_set():
+        name = rng.choices(names, weights)[0]
+        request = OPERATIONS[name](ctx, rng)
+        started = time.perf_counter()
+        try:
+            response = await client.request(**request)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        recorder.add(name, time.perf_counter() - started, ok)
+
+
+async def ws_client(ws_url: str, token: str, client_id: int, rate: float, recorder: Recorder, stop: asyncio.Event) -> None:
+    """Шлёт сообщения с частотой rate и замеряет время до их возврата через рассылку."""
+
+    pending: Dict[str, float] = {}
+
+    async def receive(ws) -> None:
+        async for frame in ws:
+            received = time.perf_counter()
+            payload = json.loads(frame)
+            for message in payload if isinstance(payload, list) else [payload]:
+                sent = pending.pop(message.get("message"), None)
+                if sent is not None:
+                    recorder.add("chat delivery", received - sent, True)
+
+    try:
+        async with websockets.connect(f"{ws_url}/chat/ws?token={token}&batch=true") as ws:
+            receiver = asyncio.create_task(receive(ws))
+            seq = 0
+            while not stop.is_set():
+                text_message = f"lt:{client_id}:{seq}"
+                pending[text_message] = time.perf_counter()
+                await ws.send(text_message)
+                seq += 1
+                await asyncio.sleep(1 / rate)
+            # Что не вернулось за секунду после остановки, считается потерянным
+            await asyncio.sleep(1)
+            receiver.cancel()
+            recorder.fail("chat delivery", len(pending))
+    except (OSError, websockets.WebSocketException):
+        recorder.fail("chat connect")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    header = f"{'operation':20} {'count':>8} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+    print(header)
+    for name, row in results.items():
+        line = (f"{name:20} {row['count']:>8} {row['errors']:>5} {row['rps']:>8} "
+                f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['max_ms']:>9}")
+        base = (baseline or {}).get(name)
+        if base and base["p99_ms"]:
+            line += f"   p99 {(row['p99_ms'] / base['p99_ms'] - 1) * 100:+.0f}%  rps {(row['rps'] / base['rps'] - 1) * 100 if base['rps'] else 0:+.0f}%"
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    mix = MIXES[args.mix]
+    recorder = Recorder()
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        ctx = await load_context(client, args.sessions)
+        ws_url = args.url.replace("http", "ws", 1)
+        tasks = [asyncio.create_task(http_worker(client, ctx, mix, recorder, stop, args.seed + i)) for i in range(args.concurrency)]
+        tasks += [
+            asyncio.create_task(ws_client(ws_url, ctx.tokens[i % len(ctx.tokens)], i, args.ws_rate, recorder, stop))
+            for i in range(args.ws_clients)
+        ]
+
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        duration = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*tasks)
+        recorder.recording = False
+
+    results = summarize(recorder, duration)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    print_report(results, baseline)
+
+    report = {
+        "commit": git_commit(),
+        "label": args.label,
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "args": {key: value for key, value in vars(args).items() if key != "compare"},
+        "duration_s": round(duration, 2),
+        "total_rps": round(sum(row["count"] for row in results.values()) / duration, 1),
+        "results": results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    path = os.path.join(args.output, f"{datetime.now():%Y%m%d-%H%M%S}-{report['commit'] or 'nogit'}-{args.mix}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"total {report['total_rps']} req/s, results saved to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8082")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=32, help="Параллельных HTTP-воркеров")
+    parser.add_argument("--sessions", type=int, default=20, help="Сколько пользователей авторизовать заранее")
+    parser.add_argument("--ws-clients", type=int, default=0)
+    parser.add_argument("--ws-rate", type=float, default=1.0, help="Сообщений в секунду от одного WebSocket-клиента")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--label", default=None, help="Произвольная метка прогона в JSON")
+    parser.add_argument("--output", default=RESULTS_DIR)
+    parser.add_argument("--compare", default=None, help="JSON прошлого прогона для сравнения")
+    asyncio.run(main(parser.parse_args()))
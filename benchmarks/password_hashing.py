@@ -0,0 +1,71 @@
+"""
+Задержка event loop во время одновременных входов.
+
+Запускает N проверок пароля bcrypt параллельно и параллельно с ними тикер,
+который каждые 5 мс измеряет, насколько позже запланированного он проснулся.
+Сравнивает старую схему (bcrypt прямо в event loop) с пулом password_executor.
+
+    python -m benchmarks.password_hashing --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import bcrypt
+from app.core.config import settings
+from app.utils import user as user_utils
+
+
+TICK = 0.005
+
+
+async def measure_lag(stop: asyncio.Event, samples: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        samples.append((time.perf_counter() - started - TICK) * 1000)
+
+
+async def inline_check(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+
+
+async def run_case(name: str, check, concurrency: int, hashed: str) -> dict:
+    stop = asyncio.Event()
+    samples: list = []
+    ticker = asyncio.create_task(measure_lag(stop, samples))
+    await asyncio.sleep(TICK * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(check("benchmark", hashed) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    samples.sort()
+    return {
+        "case": name,
+        "concurrency": concurrency,
+        "total_s": round(elapsed, 3),
+        "loop_lag_p50_ms": round(statistics.median(samples), 2),
+        "loop_lag_p99_ms": round(samples[int(len(samples) * 0.99) - 1], 2),
+        "loop_lag_max_ms": round(samples[-1], 2),
+    }
+
+
+async def main(concurrency: int) -> None:
+    hashed = bcrypt.hashpw(b"benchmark", bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode("utf-8")
+    results = [
+        await run_case("inline", inline_check, concurrency, hashed),
+        await run_case("executor", user_utils.check_password, concurrency, hashed),
+    ]
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,330 @@
+"""
+Бюджет SQL-запросов для маршрутов API.
+
+Засевает в базу из настроек (SQLALCHEMY_DATABASE_URL) два набора данных разного
+размера, вызывает каждый маршрут через ASGI-приложение и считает SQL-запросы и
+строки, которые он выполнил. Проверяет, что:
+
+* число запросов не превышает бюджет маршрута;
+* число строк не превышает бюджет там, где ответ ограничен страницей;
+* число запросов не зависит от размера данных (защита от N+1).
+
+Кэши авторизации и проектов перед каждым вызовом очищаются, поэтому бюджет
+учитывает загрузку пользователя и сборку ответа (кроме случаев с warm).
+Код возврата 1, если хотя бы одна проверка не прошла.
+
+Прогон пишет в базу, поэтому запускается только с --allow-writes (на тестовой базе).
+Логины и заголовки получают случайный префикс прогона; после прогона удаляются
+засеянные строки (по их id) и созданные маршрутами строки с этим префиксом.
+
+    python -m benchmarks.query_budget --allow-writes --scales 1 10
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid as uuid_lib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import httpx
+from sqlalchemy import delete, event, insert, or_, select
+from app.core import database
+from app.core.auth_cache import auth_cache
+from app.core.project_cache import project_cache
+from app.models.chat import Chat
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.schemas import task as task_schemas
+from app.schemas import user as user_schemas
+from app.utils import user as user_utils
+from main import app
+
+SEED_PREFIX = "qb"
+SEED_PASSWORD = "benchmark"
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    path: str
+    max_queries: int
+    # Ограничение на строки задаётся только для ответов фиксированного размера:
+    # авторизация + страница (limit + 1) + связанные пользователи страницы
+    max_rows: Optional[int] = None
+    json: Optional[Dict[str, Any]] = None
+    # Повторный запрос с If-None-Match из первого ответа: ожидается 304 без загрузки данных
+    revalidate: bool = False
+    # Повторный запрос после прогревающего: ответ из кэша проектов
+    warm: bool = False
+
+
+CASES = [
+    Case("user info", "GET", "/user/info", 2, max_rows=2),
+    Case("user list", "GET", "/user/list", 2),
+    Case("signin", "POST", "/user/signin", 1, max_rows=1, json={"login": "{admin_login}", "password": SEED_PASSWORD}),
+    Case("signup", "POST", "/user/signup", 3, max_rows=3, json={
+        "full_name": "Бюджет Запросов Тест", "login": "{prefix}_new", "password": "benchmark1", "confirm_password": "benchmark1",
+    }),
+    Case("update me", "PUT", "/user/me?full_name=Админ бюджета {scale}", 5),
+    Case("update user", "PUT", "/user/id/{member_id}?description=budget", 4, max_rows=4),
+    Case("user workload", "GET", "/user/{member_id}/workload", 2),
+    Case("project summaries", "GET", "/project", 3),
+    Case("project summaries 304", "GET", "/project", 1, max_rows=1, revalidate=True),
+    Case("project summaries cached", "GET", "/project", 1, max_rows=1, warm=True),
+    Case("project tree", "GET", "/project?include_tasks=true", 4),
+    Case("project detail", "GET", "/project/{project_uuid}", 4),
+    Case("project detail 304", "GET", "/project/{project_uuid}", 1, max_rows=1, revalidate=True),
+    Case("project detail cached", "GET", "/project/{project_uuid}", 1, max_rows=1, warm=True),
+    Case("project stats", "GET", "/project/{project_uuid}/stats", 2),
+    Case("create project", "POST", "/project", 3, max_rows=3, json={"title": "{prefix} created", "description": "budget"}),
+    Case("update project", "PUT", "/project/{project_uuid}?description=budget", 1, max_rows=1),
+    Case("tasks page", "GET", "/task?limit=50", 3, max_rows=1 + 1 + 51),
+    Case("tasks page 304", "GET", "/task?limit=50", 2, max_rows=2, revalidate=True),
+    Case("project tasks page", "GET", "/task?project_uuid={project_uuid}&limit=50", 3, max_rows=1 + 1 + 51),
+    Case("task detail", "GET", "/task/{task_uuid}", 3, max_rows=4),
+    Case("task detail 304", "GET", "/task/{task_uuid}", 1, max_rows=1, revalidate=True),
+    Case("create task", "POST", "/task", 4, max_rows=4, json={"title": "{prefix} created", "user_id": "{member_id}", "project_uuid": "{project_uuid}"}),
+    Case("update task", "PUT", "/task/{task_uuid}?comment=budget", 2, max_rows=2),
+    Case("delete task", "DELETE", "/task/{disposable_task_uuid}", 2, max_rows=2),
+    Case("bulk create tasks", "POST", "/task/bulk", 3, max_rows=1 + 2 + 3, json={"tasks": [
+        {"title": "{prefix} bulk", "user_id": "{member_id}", "project_uuid": "{project_uuid}"},
+    ] * 3}),
+    Case("bulk update tasks", "PATCH", "/task/bulk", 3, max_rows=1 + 2 + 2, json={"tasks": [
+        {"uuid": "{task_uuid}", "status": "done"}, {"uuid": "{bulk_task_uuid}", "comment": "budget"},
+    ]}),
+    Case("bulk delete tasks", "DELETE", "/task/bulk", 2, max_rows=1 + 1, json={"uuids": ["{bulk_task_uuid}", "{project_uuid}"]}),
+    Case("delete project", "DELETE", "/project/{disposable_project_uuid}", 2, max_rows=2),
+    Case("chat history", "GET", "/chat/messages?limit=50", 2, max_rows=1 + 50 + 50),
+    Case("tasks csv", "GET", "/project/{project_uuid}/tasks.csv", 2),
+    Case("tasks xlsx", "GET", "/project/{project_uuid}/tasks.xlsx", 2),
+    Case("system stats", "GET", "/system/stats", 1),
+    Case("search", "GET", "/search?q={prefix} task&limit=20", 2, max_rows=1 + 21),
+]
+
+
+@dataclass
+class Dataset:
+    scale: int
+    prefix: str
+    admin_id: int = 0
+    admin_login: str = ""
+    member_id: int = 0
+    project_uuid: str = ""
+    task_uuid: str = ""
+    disposable_task_uuid: str = ""
+    bulk_task_uuid: str = ""
+    disposable_project_uuid: str = ""
+    token: str = ""
+    user_ids: List[int] = field(default_factory=list)
+    project_uuids: List[uuid_lib.UUID] = field(default_factory=list)
+
+    def format(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return value.format(**vars(self))
+        if isinstance(value, dict):
+            return {key: self.format(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.format(item) for item in value]
+        return value
+
+
+class QueryCounter:
+    """
+    Считает запросы и строки на движке приложения; маршруты вызываются по одному.
+    Серверные курсоры (потоковый экспорт) числа строк не сообщают.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+
+    def reset(self) -> None:
+        self.queries = 0
+        self.rows = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.queries += 1
+        self.rows += max(cursor.rowcount, 0)
+
+
+async def seed(scale: int, password_hash: str) -> Dataset:
+    """Пользователи 3*scale, проекты 2*scale по 5*scale задач, сообщения 20*scale."""
+
+    # Случайная часть префикса: cleanup не заденет строки, которые создал не этот прогон
+    dataset = Dataset(scale=scale, prefix=f"{SEED_PREFIX}{uuid_lib.uuid4().hex[:8]}_{scale}")
+    now = datetime.now()
+    roles = [user_schemas.Roles.ADMIN, user_schemas.Roles.MEMBER, user_schemas.Roles.GUEST]
+
+    async with database.engine.begin() as conn:
+        users = await conn.execute(
+            insert(User).returning(User.id, User.login),
+            [
+                {
+                    "full_name": f"Бюджет {scale} {i}",
+                    "login": f"{dataset.prefix}_{i}",
+                    "password": password_hash,
+                    "role": roles[i % len(roles)],
+                }
+                for i in range(3 * scale)
+            ],
+        )
+        dataset.user_ids = [row.id for row in users]
+        dataset.admin_id, dataset.member_id = dataset.user_ids[0], dataset.user_ids[1]
+        dataset.admin_login = f"{dataset.prefix}_0"
+
+        projects = [{"uuid": uuid_lib.uuid4(), "title": f"{dataset.prefix} {i}", "created_at": now, "updated_at": now} for i in range(2 * scale + 1)]
+        await conn.execute(insert(Project), projects)
+        dataset.project_uuids = [project["uuid"] for project in projects]
+        dataset.project_uuid = str(projects[0]["uuid"])
+        dataset.disposable_project_uuid = str(projects[-1]["uuid"])
+
+        statuses = list(task_schemas.TaskStatus)
+        tasks = [
+            {
+                "uuid": uuid_lib.uuid4(),
+                "title": f"{dataset.prefix} task {p}.{i}",
+                "status": statuses[i % len(statuses)],
+                "project_uuid": project["uuid"],
+                "user_id": dataset.user_ids[i % len(dataset.user_ids)],
+                "created_at": now - timedelta(seconds=i),
+                "updated_at": now,
+            }
+            for p, project in enumerate(projects[:-1])
+            for i in range(5 * scale)
+        ]
+        await conn.execute(insert(Task), tasks)
+        dataset.task_uuid = str(tasks[0]["uuid"])
+        dataset.disposable_task_uuid = str(tasks[-1]["uuid"])
+        dataset.bulk_task_uuid = str(tasks[-2]["uuid"])
+
+        await conn.execute(
+            insert(Chat),
+            [{"user_id": dataset.user_ids[i % len(dataset.user_ids)], "message": f"{dataset.prefix} {i}"} for i in range(20 * scale)],
+        )
+
+        admin = (await conn.execute(select(User).filter(User.id == dataset.admin_id))).first()
+
+    dataset.token = await user_utils.create_access_token(admin)
+    return dataset
+
+
+async def cleanup(dataset: Dataset) -> None:
+    """Удаляет засеянные строки по id и строки, созданные маршрутами с префиксом прогона."""
+
+    # Префикс прогона содержит "_", который в LIKE означает любой символ
+    created = dataset.prefix.replace("_", "\\_") + "%"
+    async with database.engine.begin() as conn:
+        user_ids = select(User.id).filter(or_(User.id.in_(dataset.user_ids), User.login.like(created)))
+        project_uuids = select(Project.uuid).filter(or_(Project.uuid.in_(dataset.project_uuids), Project.title.like(created)))
+        await conn.execute(delete(Chat).filter(Chat.user_id.in_(user_ids)))
+        await conn.execute(delete(Task).filter(or_(Task.user_id.in_(user_ids), Task.project_uuid.in_(project_uuids))))
+        await conn.execute(delete(Project).filter(Project.uuid.in_(project_uuids)))
+        await conn.execute(delete(User).filter(User.id.in_(user_ids)))
+
+
+async def run_case(client: httpx.AsyncClient, counter: QueryCounter, case: Case, dataset: Dataset) -> Dict[str, Any]:
+    headers = {"Authorization": f"Bearer {dataset.token}"}
+    project_cache.local.clear()
+    if case.revalidate or case.warm:
+        primed = await client.request(case.method, dataset.format(case.path), headers=headers)
+        if case.revalidate:
+            headers["If-None-Match"] = primed.headers.get("etag", "")
+
+    auth_cache.local.clear()
+    counter.reset()
+
+    started = time.perf_counter()
+    response = await client.request(
+        case.method,
+        dataset.format(case.path),
+        json=dataset.format(case.json),
+        headers=headers,
+    )
+    elapsed = time.perf_counter() - started
+
+    return {
+        "case": case.name,
+        "scale": dataset.scale,
+        "status": response.status_code,
+        "queries": counter.queries,
+        "rows": counter.rows,
+        "ms": round(elapsed * 1000, 1),
+    }
+
+
+def check(case: Case, results: List[Dict[str, Any]]) -> List[str]:
+    errors = []
+    for result in results:
+        if result["status"] >= 400:
+            errors.append(f"{case.name}: HTTP {result['status']} at scale {result['scale']}")
+        if case.revalidate and result["status"] != 304:
+            errors.append(f"{case.name}: HTTP {result['status']} instead of 304 at scale {result['scale']}")
+        if result["queries"] > case.max_queries:
+            errors.append(f"{case.name}: {result['queries']} queries > budget {case.max_queries} at scale {result['scale']}")
+        if case.max_rows is not None and result["rows"] > case.max_rows:
+            errors.append(f"{case.name}: {result['rows']} rows > budget {case.max_rows} at scale {result['scale']}")
+
+    counts = {result["queries"] for result in results}
+    if len(counts) > 1:
+        errors.append(f"{case.name}: query count depends on data size: " + ", ".join(f"scale {r['scale']}: {r['queries']}" for r in results))
+    return errors
+
+
+async def main(scales: List[int], as_json: bool) -> int:
+    counter = QueryCounter()
+    # Маршруты чтения могут уйти на реплики (SQLALCHEMY_REPLICA_URLS): считаем запросы на всех движках
+    sync_engines = [database.engine.sync_engine, *(replica.engine.sync_engine for replica in database.replicas.replicas)]
+    for sync_engine in sync_engines:
+        event.listen(sync_engine, "after_cursor_execute", counter)
+
+    password_hash = await user_utils.hash_password(SEED_PASSWORD)
+    results: Dict[str, List[Dict[str, Any]]] = {case.name: [] for case in CASES}
+    transport = httpx.ASGITransport(app=app)
+    dataset = None
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://budget") as client:
+            for scale in scales:
+                dataset = await seed(scale, password_hash)
+                for case in CASES:
+                    results[case.name].append(await run_case(client, counter, case, dataset))
+                await cleanup(dataset)
+                dataset = None
+    finally:
+        for sync_engine in sync_engines:
+            event.remove(sync_engine, "after_cursor_execute", counter)
+        if dataset is not None:
+            await cleanup(dataset)
+        await database.dispose_engines()
+
+    errors = []
+    for case in CASES:
+        errors.extend(check(case, results[case.name]))
+        for result in results[case.name]:
+            if as_json:
+                print(json.dumps(result, ensure_ascii=False))
+            else:
+                print(f"{case.method:6} {case.name:20} scale={result['scale']:<4} status={result['status']} "
+                      f"queries={result['queries']}/{case.max_queries} rows={result['rows']} {result['ms']} ms")
+
+    for error in errors:
+        print(f"FAIL {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--json", action="store_true", help="Результаты в формате JSON Lines")
+    parser.add_argument(
+        "--allow-writes", action="store_true",
+        help="Подтверждение, что база из SQLALCHEMY_DATABASE_URL тестовая: прогон пишет в неё",
+    )
+    args = parser.parse_args()
+    if not args.allow_writes:
+        parser.error(f"seeds and deletes rows in {database.engine.url.render_as_string(hide_password=True)}; "
+                     "run it against a throwaway database with --allow-writes")
+    sys.exit(asyncio.run(main(args.scales, args.json)))
@@ -0,0 +1,152 @@
+"""
+Синтетический набор данных для нагрузочных тестов.
+
+Заполняет таблицы моделей приложения через COPY (asyncpg copy_records_to_table)
+пачками, поэтому миллионы строк загружаются за минуты и без роста памяти.
+Данные детерминированы (--seed), логины и заголовки начинаются с префикса lt,
+у всех пользователей пароль SEED_PASSWORD.
+
+    python -m benchmarks.seed --users 10000 --projects 1000 --tasks 5000000 --messages 10000000
+    python -m benchmarks.seed --reset-only
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid as uuid_lib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Sequence
+from sqlalchemy import delete, select, text
+from app.core import database
+from app.models.chat import Chat
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.schemas import task as task_schemas
+from app.schemas import user as user_schemas
+from app.utils import user as user_utils
+
+SEED_PREFIX = "lt"
+SEED_PASSWORD = "benchmark"
+CHUNK_SIZE = 50_000
+ROLES = [user_schemas.Roles.ADMIN] + [user_schemas.Roles.MEMBER] * 8 + [user_schemas.Roles.GUEST]
+
+
+def _chunks(rows: Iterator[Sequence[Any]], size: int) -> Iterator[List[Sequence[Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def copy_rows(table, columns: List[str], rows: Iterator[Sequence[Any]], total: int) -> None:
+    """COPY строк в таблицу модели пачками по CHUNK_SIZE с выводом прогресса."""
+
+    started = time.perf_counter()
+    done = 0
+    async with database.engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        for chunk in _chunks(rows, CHUNK_SIZE):
+            await raw.driver_connection.copy_records_to_table(table.name, columns=columns, records=chunk)
+            done += len(chunk)
+            rate = done / (time.perf_counter() - started)
+            print(f"\r{table.name}: {done}/{total} ({rate:,.0f} rows/s)", end="", flush=True)
+        await conn.commit()
+    print()
+
+
+async def reset() -> None:
+    """Удаляет данные, созданные этим скриптом."""
+
+    async with database.engine.begin() as conn:
+        user_ids = select(User.id).filter(User.login.like(f"{SEED_PREFIX}\\_%"))
+        project_uuids = select(Project.uuid).filter(Project.title.like(f"{SEED_PREFIX}:%"))
+        await conn.execute(delete(Chat).filter(Chat.user_id.in_(user_ids)))
+        await conn.execute(delete(Task).filter(Task.project_uuid.in_(project_uuids)))
+        await conn.execute(delete(Task).filter(Task.user_id.in_(user_ids)))
+        await conn.execute(delete(Project).filter(Project.uuid.in_(project_uuids)))
+        await conn.execute(delete(User).filter(User.login.like(f"{SEED_PREFIX}\\_%")))
+
+
+async def seed(users: int, projects: int, tasks: int, messages: int, seed_value: int) -> Dict[str, Any]:
+    rng = random.Random(seed_value)
+    now = datetime.now().replace(microsecond=0)
+    password_hash = await user_utils.hash_password(SEED_PASSWORD)
+
+    # id пользователей выдаёт последовательность модели, чтобы не разойтись с обычными вставками
+    async with database.engine.begin() as conn:
+        result = await conn.execute(text("SELECT nextval('user_id_seq_rand') FROM generate_series(1, :n)"), {"n": users})
+        user_ids = [row[0] for row in result]
+
+    user_columns = ["id", "full_name", "login", "password", "role", "avatar_image", "created_at", "password_changed_at", "updated_at"]
+    await copy_rows(User.__table__, user_columns, (
+        (user_id, f"Нагрузка {i}", f"{SEED_PREFIX}_{i}", password_hash, ROLES[i % len(ROLES)].name,
+         "static/avatars/default.jpeg", now, now, now)
+        for i, user_id in enumerate(user_ids)
+    ), users)
+
+    project_uuids = [uuid_lib.UUID(int=rng.getrandbits(128), version=4) for _ in range(projects)]
+    await copy_rows(Project.__table__, ["uuid", "title", "description", "created_at", "updated_at"], (
+        (project_uuid, f"{SEED_PREFIX}: проект {i}", f"Описание проекта {i}", now, now)
+        for i, project_uuid in enumerate(project_uuids)
+    ), projects)
+
+    statuses = [status.name for status in task_schemas.TaskStatus]
+
+    def task_rows() -> Iterator[Sequence[Any]]:
+        for i in range(tasks):
+            created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            yield (
+                uuid_lib.UUID(int=rng.getrandbits(128), version=4),
+                f"Задача {i}",
+                f"Описание задачи {i}",
+                rng.choice(statuses),
+                None,
+                rng.choice(project_uuids),
+                rng.choice(user_ids),
+                created_at,
+                created_at,
+            )
+
+    task_columns = ["uuid", "title", "description", "status", "comment", "project_uuid", "user_id", "created_at", "updated_at"]
+    await copy_rows(Task.__table__, task_columns, task_rows(), tasks)
+
+    def message_rows() -> Iterator[Sequence[Any]]:
+        started = now - timedelta(seconds=messages)
+        for i in range(messages):
+            yield (uuid_lib.UUID(int=rng.getrandbits(128), version=4), f"Сообщение {i}", rng.choice(user_ids), started + timedelta(seconds=i))
+
+    await copy_rows(Chat.__table__, ["uuid", "message", "user_id", "created_at"], message_rows(), messages)
+
+    async with database.engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("user", "project", "task", "chat"):
+            await conn.execute(text(f'ANALYZE "{table}"'))
+
+    return {"users": users, "projects": projects, "tasks": tasks, "messages": messages, "seed": seed_value}
+
+
+async def main(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    await reset()
+    if not args.reset_only:
+        summary = await seed(args.users, args.projects, args.tasks, args.messages, args.seed)
+        summary["seconds"] = round(time.perf_counter() - started, 1)
+        print(json.dumps(summary))
+    await database.dispose_engines()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=1_000)
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset-only", action="store_true", help="Только удалить ранее засеянные данные")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,123 @@
+"""
+Чтение и сериализация списков: ORM + response_model против Core-строк + TypeAdapter.
+
+Для каждого списка выполняет оба пути на данных из базы настроек и измеряет
+отдельно запрос (включая сборку ORM-объектов или словарей) и превращение
+результата в байты ответа. Старый путь повторяет то, что делает FastAPI с
+response_model: serialize_response и JSONResponse. Ответы обоих путей
+сравниваются, расхождение — код возврата 1.
+
+Нужны данные: например, python -m benchmarks.seed --tasks 100000.
+
+    python -m benchmarks.serialization --limits 50 500 5000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.core import database
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from app.routers.project import projects_tree_adapter
+from app.routers.task import task_page_adapter
+from app.routers.user import users_adapter
+from app.schemas import task as task_schemas
+from app.schemas import user as user_schemas
+from app.utils import render as render_utils
+
+
+async def orm_path(response_type: Any, load: Callable[..., Awaitable[Any]], *args: Any) -> Dict[str, Any]:
+    field = create_model_field(name="response", type_=response_type, mode="serialization")
+    async with database.SessionLocal() as session:
+        started = time.perf_counter()
+        content = await load(session, *args)
+        loaded = time.perf_counter()
+        body = JSONResponse(await serialize_response(field=field, response_content=content)).body
+        rendered = time.perf_counter()
+    return {"query_ms": (loaded - started) * 1000, "render_ms": (rendered - loaded) * 1000, "body": body}
+
+
+async def core_path(adapter: Any, load: Callable[..., Awaitable[Any]], *args: Any) -> Dict[str, Any]:
+    async with database.SessionLocal() as session:
+        started = time.perf_counter()
+        content = await load(session, *args)
+        loaded = time.perf_counter()
+        body = render_utils.render_json(adapter, content)
+        rendered = time.perf_counter()
+    return {"query_ms": (loaded - started) * 1000, "render_ms": (rendered - loaded) * 1000, "body": body}
+
+
+async def orm_tasks(session, limit: int) -> Dict[str, Any]:
+    return {"items": await Task.get_all(session, limit=limit), "next_cursor": None}
+
+
+async def core_tasks(session, limit: int) -> Dict[str, Any]:
+    return {"items": await Task.get_all_rows(session, limit=limit), "next_cursor": None}
+
+
+def cases(limits: List[int]):
+    for limit in limits:
+        yield (
+            f"GET /task?limit={limit}",
+            lambda limit=limit: orm_path(task_schemas.TaskPage, orm_tasks, limit),
+            lambda limit=limit: core_path(task_page_adapter, core_tasks, limit),
+        )
+    yield (
+        "GET /user/list",
+        lambda: orm_path(List[user_schemas.User], User.get_all_users),
+        lambda: core_path(users_adapter, User.get_all_rows),
+    )
+    yield (
+        "GET /project?include_tasks=true",
+        lambda: orm_path(List[task_schemas.ProjectInfo], Project.get_all),
+        lambda: core_path(projects_tree_adapter, Project.get_tree_rows),
+    )
+
+
+def _same(left: bytes, right: bytes) -> bool:
+    # Порядок проектов в дереве не задан: сравниваем без учёта порядка верхнего уровня
+    left, right = json.loads(left), json.loads(right)
+    if isinstance(left, list) and isinstance(right, list):
+        key = lambda item: json.dumps(item, sort_keys=True)
+        return sorted(left, key=key) == sorted(right, key=key)
+    return left == right
+
+
+async def run(name: str, orm, core, repeat: int) -> Dict[str, Any]:
+    # Прогрев: подготовленные запросы и ленивые части pydantic
+    orm_run, core_run = await orm(), await core()
+    result = {"case": name, "bytes": len(core_run["body"]), "same_body": _same(orm_run["body"], core_run["body"])}
+
+    for label, path in (("orm", orm), ("core", core)):
+        runs = [await path() for _ in range(repeat)]
+        result[f"{label}_query_ms"] = round(statistics.median(r["query_ms"] for r in runs), 2)
+        result[f"{label}_render_ms"] = round(statistics.median(r["render_ms"] for r in runs), 2)
+        result[f"{label}_total_ms"] = round(result[f"{label}_query_ms"] + result[f"{label}_render_ms"], 2)
+    result["speedup"] = round(result["orm_total_ms"] / result["core_total_ms"], 2) if result["core_total_ms"] else None
+    return result
+
+
+async def main(limits: List[int], repeat: int) -> int:
+    results = []
+    try:
+        for name, orm, core in cases(limits):
+            results.append(await run(name, orm, core, repeat))
+            print(json.dumps(results[-1], ensure_ascii=False))
+    finally:
+        await database.dispose_engines()
+    return 0 if all(result["same_body"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limits", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.limits, args.repeat)))
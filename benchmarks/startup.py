@@ -0,0 +1,136 @@
+"""
+Холодный старт воркера API: время импорта приложения и время до первого ответа.
+
+Импорт: --repeat раз выполняет `import main` в новом интерпретаторе (первый прогон
+не учитывается: он компилирует байткод) и выводит медиану, а по отдельному прогону
+с -X importtime — самые тяжёлые модули верхнего уровня. Отдельно проверяет, что при импорте не загружаются
+библиотеки, нужные только отдельным маршрутам или фоновым задачам. Превышение
+--max-import-ms или загрузка такой библиотеки — код возврата 1.
+
+Старт: запускает uvicorn main:app на свободном порту с настройками WEB_* и измеряет
+время до первого ответа GET /metrics (импорт, сборка приложения, прогрев пула БД).
+
+    python -m benchmarks.startup --repeat 5 --max-import-ms 2000
+    python -m benchmarks.startup --skip-server
+"""
+import argparse
+import json
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List
+from app.core.config import settings
+
+# Импортируются по требованию: экспорт, фоновые задачи, миниатюры аватаров, тесты
+LAZY_MODULES = ("celery", "kombu", "psycopg", "openpyxl", "PIL", "pandas", "starlette.testclient")
+
+PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = (time.perf_counter() - started) * 1000\n"
+    f"lazy = [name for name in {LAZY_MODULES!r} if any(loaded == name or loaded.startswith(name + '.') for loaded in sys.modules)]\n"
+    "print(json.dumps({'import_ms': elapsed, 'lazy_loaded': lazy}))\n"
+)
+# Строка -X importtime: "import time: <self us> | <cumulative us> | <отступ><модуль>"
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def measure_import(importtime: bool = False) -> Dict[str, Any]:
+    """Один импорт main в новом процессе; с importtime — ещё и время прямых импортов main."""
+
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", PROBE],
+        capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+
+    # Прямые импорты main (отступ в два пробела) с накопленным временем
+    top_level = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match and len(match.group(3)) == 2:
+            top_level[match.group(4)] = int(match.group(2)) / 1000
+    result["top_level_ms"] = top_level
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_server(workers: int, timeout: float) -> Dict[str, Any]:
+    """Время от запуска uvicorn до первого ответа 200 (при нескольких воркерах — самого быстрого)."""
+
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+        "--loop", settings.WEB_LOOP, "--http", settings.WEB_HTTP, "--log-level", "warning",
+    ]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode}: {process.stderr.read()[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=1) as response:
+                    if response.status == 200:
+                        return {"workers": workers, "ready_ms": round((time.perf_counter() - started) * 1000, 1)}
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"server not ready in {timeout} s")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main(args: argparse.Namespace) -> int:
+    # Первый прогон компилирует байткод, если его нет, и в статистику не входит
+    measure_import()
+    runs: List[Dict[str, Any]] = [measure_import() for _ in range(args.repeat)]
+
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    # -X importtime замедляет импорт, поэтому разбивка снимается отдельным прогоном
+    top_level = sorted(measure_import(importtime=True)["top_level_ms"].items(), key=lambda item: item[1], reverse=True)[:args.top]
+    lazy_loaded = sorted({name for run in runs for name in run["lazy_loaded"]})
+    print(json.dumps({
+        "case": "import main",
+        "import_ms": round(import_ms, 1),
+        "process_ms": round(statistics.median(run["process_ms"] for run in runs), 1),
+        "max_import_ms": args.max_import_ms,
+        "lazy_loaded": lazy_loaded,
+        "top_level_ms": {name: round(ms, 1) for name, ms in top_level},
+    }, ensure_ascii=False))
+
+    if not args.skip_server:
+        print(json.dumps({"case": "first response", **measure_server(args.workers, args.timeout)}))
+
+    errors = []
+    if import_ms > args.max_import_ms:
+        errors.append(f"import main took {import_ms:.0f} ms > {args.max_import_ms} ms")
+    if lazy_loaded:
+        errors.append(f"modules that must load lazily were imported at startup: {', '.join(lazy_loaded)}")
+    for error in errors:
+        print(f"FAIL {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=2000)
+    parser.add_argument("--top", type=int, default=10, help="Сколько самых тяжёлых импортов показать")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--skip-server", action="store_true", help="Только время импорта, без запуска uvicorn")
+    sys.exit(main(parser.parse_args()))
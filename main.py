@@ -2,26 +2,43 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi.staticfiles import StaticFiles
-import uvicorn
-import asyncio
-from app.routers import user, task, project, chat
+from contextlib import asynccontextmanager
+from app.routers import user, task, project, chat, system, search, jobs
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core import database
 from app.core.config import settings
-from fastapi.testclient import TestClient
+from app.core.static import avatar_files
+from app.core.metrics import MetricsMiddleware, metrics_endpoint
+from app.utils import avatar as avatar_utils
+from app.utils import user as user_utils
 from fastapi import FastAPI, HTTPException
 from fastapi.responses import JSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await database.warmup_pool()
+    await database.replicas.start()
+    await chat.startup()
+    yield
+    await chat.shutdown()
+    # Дожидаемся начатых хеширований и обработки аватаров
+    user_utils.password_executor.shutdown()
+    avatar_utils.avatar_executor.shutdown()
+    await database.replicas.stop()
+    await database.dispose_engines()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
     docs_url='/docs', 
     openapi_url='/openapi.json',
+    lifespan=lifespan,
 )
 
+app.mount("/static/avatars", avatar_files, name="avatars")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 app.add_middleware(
@@ -31,11 +48,16 @@ app.add_middleware(
   allow_credentials=True,
   allow_headers = ["*"]
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(user.router_user)
 app.include_router(project.router_project)
 app.include_router(task.router_task)
 app.include_router(chat.router_chat)
+app.include_router(system.router_system)
+app.include_router(search.router_search)
+app.include_router(jobs.router_jobs)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 
 @app.exception_handler(StarletteHTTPException)
@@ -43,19 +65,19 @@ async def starlette_exception_handler(request, exc):
     return JSONResponse(status_code=exc.status_code, content=exc.detail)
 
 if __name__ == '__main__':
+    import uvicorn
+
     database.create_tables()
     database.create_test_user()
-    
-    import os   
-    os.environ['PYTHONDONTWRITEBYTECODE'] = '1'
-    import sys
-    sys.dont_write_bytecode = True
-
-    for root, dirs, files in os.walk('.'):
-        for d in dirs:
-            if d == '__pycache__':
-                full_path = os.path.join(root, d)
-                os.system(f'rm -rf {full_path}')
-
-    uvicorn.run("main:app", host="0.0.0.0", port=8082, workers=1)
-    
\ No newline at end of file
+
+    # Схема готова до запуска воркеров: каждый из них только импортирует main:app
+    uvicorn.run(
+        "main:app",
+        host=settings.WEB_HOST,
+        port=settings.WEB_PORT,
+        workers=settings.WEB_WORKERS,
+        loop=settings.WEB_LOOP,
+        http=settings.WEB_HTTP,
+        timeout_keep_alive=settings.WEB_KEEP_ALIVE_SECONDS,
+        backlog=settings.WEB_BACKLOG,
+    )
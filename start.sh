@@ -14,9 +14,9 @@ done
 #   sleep 1
 # done
 
-# # Start the Celery worker
-# echo "Starting Celery worker..."
-# celery -A api.tasks.config.celery worker --loglevel=info &
+# Start the Celery worker (background jobs: exports, reports)
+echo "Starting Celery worker..."
+celery -A app.jobs.celery_app worker --loglevel=info --concurrency="${CELERY_CONCURRENCY:-2}" &
 
 # Wait a bit to ensure Celery has started
 sleep 5
@@ -0,0 +1,15 @@
+import pytest
+from sqlalchemy import create_engine, text
+from app.core.config import settings
+
+
+@pytest.fixture(scope="session")
+def live_database() -> None:
+    """Пропускает тест, если база данных из .env недоступна."""
+
+    url = settings.SQLALCHEMY_DATABASE_URL.replace("+asyncpg", "+psycopg")
+    try:
+        with create_engine(url, connect_args={"connect_timeout": 2}).connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception:
+        pytest.skip("database from .env is unreachable")
@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime
+import fakeredis
+import pytest
+from app.core.auth_cache import AuthCache
+from app.core.config import settings
+from app.schemas import user as user_schemas
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Два воркера со своими локальными кэшами и общим Redis."""
+
+    monkeypatch.setattr(settings, "AUTH_CACHE_REDIS", True)
+    server = fakeredis.FakeServer()
+    caches = []
+    for _ in range(2):
+        cache = AuthCache()
+        cache._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        caches.append(cache)
+    return caches
+
+
+def make_user(role: user_schemas.Roles) -> user_schemas.AuthUser:
+    return user_schemas.AuthUser(id=1, role=role, password_changed_at=datetime(2024, 1, 1))
+
+
+async def cache_from_db(cache: AuthCache, db_user: user_schemas.AuthUser) -> user_schemas.AuthUser:
+    """То же, что get_current_user: при промахе данные берутся из БД и сохраняются с поколением из get()."""
+
+    user, generation = await cache.get(db_user.id)
+    if user is None:
+        user = db_user
+        await cache.set(user, generation)
+    return user
+
+
+def test_invalidate_reaches_other_worker_after_local_ttl(workers, monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_CACHE_LOCAL_TTL_SECONDS", 0.05)
+    first, second = workers
+
+    async def scenario():
+        admin = make_user(user_schemas.Roles.ADMIN)
+        await cache_from_db(first, admin)
+        assert (await second.get(1))[0].role == user_schemas.Roles.ADMIN
+
+        # Роль понижена через первый воркер
+        await first.invalidate(1)
+        await asyncio.sleep(0.06)
+        assert (await second.get(1))[0] is None
+        assert (await cache_from_db(second, make_user(user_schemas.Roles.MEMBER))).role == user_schemas.Roles.MEMBER
+
+    asyncio.run(scenario())
+
+
+def test_read_before_invalidate_in_other_worker_is_not_cached(workers):
+    first, second = workers
+
+    async def scenario():
+        # Второй воркер промахнулся и читает из БД старую роль
+        user, generation = await second.get(1)
+        assert user is None
+
+        # Тем временем первый воркер сбрасывает пользователя
+        await first.invalidate(1)
+
+        # Прочитанное до сброса не должно обслуживать другие воркеры
+        await second.set(make_user(user_schemas.Roles.ADMIN), generation)
+        assert (await first.get(1))[0] is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+import asyncio
+import fakeredis
+from app.core.broadcast import LocalBroadcast, RedisBroadcast
+from app.utils.chat import ChatConnection
+
+
+class Subscriber:
+    """Обработчик рассылки, который складывает полученные сообщения в очередь."""
+
+    def __init__(self):
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def __call__(self, message: str) -> None:
+        await self.messages.put(message)
+
+    async def receive(self) -> str:
+        return await asyncio.wait_for(self.messages.get(), timeout=1)
+
+
+def redis_worker(server: fakeredis.FakeServer) -> RedisBroadcast:
+    return RedisBroadcast("redis://fake", "chat", client=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+
+def test_redis_publish_reaches_every_worker():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        first, second = redis_worker(server), redis_worker(server)
+        first_subscriber, second_subscriber = Subscriber(), Subscriber()
+        await first.connect(first_subscriber)
+        await second.connect(second_subscriber)
+
+        # Сообщение получают оба воркера, включая опубликовавший
+        await first.publish("hello")
+        assert await first_subscriber.receive() == "hello"
+        assert await second_subscriber.receive() == "hello"
+
+        await first.disconnect()
+        await second.disconnect()
+
+    asyncio.run(scenario())
+
+
+def test_redis_disconnect_unsubscribes_only_that_worker():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        first, second = redis_worker(server), redis_worker(server)
+        first_subscriber, second_subscriber = Subscriber(), Subscriber()
+        await first.connect(first_subscriber)
+        await second.connect(second_subscriber)
+
+        await first.disconnect()
+        assert first._listener is None and first._client is None
+
+        await second.publish("after disconnect")
+        assert await second_subscriber.receive() == "after disconnect"
+        await asyncio.sleep(0.05)
+        assert first_subscriber.messages.empty()
+
+        await second.disconnect()
+
+    asyncio.run(scenario())
+
+
+def test_local_publish_reaches_every_socket_of_the_process():
+    from app.routers import chat
+
+    async def scenario():
+        backend = LocalBroadcast()
+        await backend.connect(chat.deliver)
+        # Очереди сокетов без задач-писателей: доставленное остаётся в буфере
+        first, second = ChatConnection(websocket=None), ChatConnection(websocket=None)
+        chat.active_connections.update((first, second))
+        try:
+            await backend.publish("hello")
+            assert list(first._buffer) == ["hello"] and list(second._buffer) == ["hello"]
+
+            # Закрытый сокет снимается с рассылки при следующей публикации
+            first.closed = True
+            await backend.publish("after close")
+            assert first not in chat.active_connections
+            assert list(second._buffer) == ["hello", "after close"]
+
+            # После отключения транспорта публикация никуда не доставляется
+            await backend.disconnect()
+            await backend.publish("after disconnect")
+            assert list(second._buffer) == ["hello", "after close"]
+        finally:
+            chat.active_connections.difference_update((first, second))
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core import database
+from app.core.config import settings
+from app.models.chat import Chat
+from app.models.user import User
+from app.utils.chat import MESSAGE_MAX_LENGTH, ChatWriter
+
+
+pytestmark = pytest.mark.usefixtures("live_database")
+
+
+def test_bad_message_fails_alone_in_its_batch(monkeypatch):
+    async def scenario():
+        # Отдельный движок: глобальный привязан к циклу событий приложения
+        engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URL)
+        monkeypatch.setattr(database, "engine", engine)
+        # Интервал с запасом, чтобы все три сообщения попали в один пакет
+        writer = ChatWriter(batch_size=10, flush_interval_ms=200)
+        await writer.start()
+        try:
+            async with engine.connect() as conn:
+                user_id = (await conn.execute(select(User.id).filter(User.login == "admin"))).scalar_one()
+
+            results = await asyncio.gather(
+                writer.write(user_id, "group commit test: first"),
+                writer.write(user_id, "x" * (MESSAGE_MAX_LENGTH + 88)),
+                writer.write(user_id, "group commit test: second"),
+                return_exceptions=True,
+            )
+            first, bad, second = results
+            assert isinstance(bad, Exception)
+            assert not isinstance(first, Exception) and not isinstance(second, Exception)
+
+            async with engine.begin() as conn:
+                stored = await conn.execute(select(Chat.message).filter(Chat.uuid.in_([first.uuid, second.uuid])))
+                assert sorted(stored.scalars()) == ["group commit test: first", "group commit test: second"]
+                await conn.execute(delete(Chat).filter(Chat.uuid.in_([first.uuid, second.uuid])))
+        finally:
+            await writer.stop()
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_websocket_rejects_long_message_and_stays_open():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        token = client.post("/user/signin", json={"login": "admin", "password": "admin"}).json()["token"]
+        with client.websocket_connect(f"/chat/ws?token={token}") as websocket:
+            websocket.send_text("x" * (MESSAGE_MAX_LENGTH + 1))
+            assert json.loads(websocket.receive_text()) == {
+                "event": "error",
+                "message": f"Message is longer than {MESSAGE_MAX_LENGTH} characters",
+            }
+
+            websocket.send_text("websocket test")
+            message = json.loads(websocket.receive_text())
+            assert message["message"] == "websocket test"
+
+    # Сообщения чата через API не удаляются
+    with database.get_engine_sync().begin() as conn:
+        conn.execute(delete(Chat).filter(Chat.uuid == message["uuid"]))
@@ -0,0 +1,66 @@
+import pytest
+
+
+pytestmark = pytest.mark.usefixtures("live_database")
+
+
+@pytest.fixture(scope="module")
+def client(live_database):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as client:
+        token = client.post("/user/signin", json={"login": "admin", "password": "admin"}).json()["token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        yield client
+
+
+@pytest.fixture
+def project(client):
+    project = client.post("/project", json={"title": "If-Match test", "description": "test"}).json()
+    yield project
+    client.delete(f"/project/{project['uuid']}")
+
+
+@pytest.fixture
+def task(client, project):
+    admin_id = client.get("/user/info").json()["id"]
+    task = client.post("/task", json={"title": "If-Match test", "user_id": admin_id, "project_uuid": project["uuid"]}).json()
+    yield task
+    client.delete(f"/task/{task['uuid']}")
+
+
+def test_task_get_etag_is_accepted_by_if_match(client, task):
+    etag = client.get(f"/task/{task['uuid']}").headers["etag"]
+
+    updated = client.put(f"/task/{task['uuid']}?comment=first", headers={"If-Match": etag})
+    assert updated.status_code == 200
+    assert client.get(f"/task/{task['uuid']}").headers["etag"] == updated.headers["etag"]
+
+    # Тот же ETag после изменения устарел
+    assert client.put(f"/task/{task['uuid']}?comment=second", headers={"If-Match": etag}).status_code == 409
+    assert client.delete(f"/task/{task['uuid']}", headers={"If-Match": etag}).status_code == 409
+
+
+def test_project_get_etag_is_accepted_by_if_match(client, project):
+    etag = client.get(f"/project/{project['uuid']}").headers["etag"]
+
+    assert client.put(f"/project/{project['uuid']}?description=first", headers={"If-Match": etag}).status_code == 200
+    assert client.put(f"/project/{project['uuid']}?description=second", headers={"If-Match": etag}).status_code == 409
+
+    etag = client.get(f"/project/{project['uuid']}").headers["etag"]
+    assert client.get(f"/project/{project['uuid']}", headers={"If-None-Match": etag}).status_code == 304
+    assert client.delete(f"/project/{project['uuid']}", headers={"If-Match": etag}).status_code == 200
+
+
+def test_put_without_changes_keeps_the_version(client, task, project):
+    etag = client.get(f"/task/{task['uuid']}").headers["etag"]
+    unchanged = client.put(f"/task/{task['uuid']}", headers={"If-Match": etag})
+    assert unchanged.status_code == 200
+    assert unchanged.headers["etag"] == etag
+    assert client.put(f"/task/{task['uuid']}?comment=after", headers={"If-Match": etag}).status_code == 200
+
+    etag = client.get(f"/project/{project['uuid']}").headers["etag"]
+    assert client.put(f"/project/{project['uuid']}", headers={"If-Match": etag}).status_code == 200
+    assert client.get(f"/project/{project['uuid']}").headers["etag"] == etag
+    assert client.put(f"/project/{project['uuid']}?description=after", headers={"If-Match": etag}).status_code == 200
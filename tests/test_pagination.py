@@ -0,0 +1,29 @@
+from datetime import datetime
+from uuid import uuid4
+import pytest
+from fastapi import HTTPException
+from app.schemas import task as task_schemas
+from app.utils import pagination as pagination_utils
+
+
+def test_cursor_is_rejected_for_other_filters_or_order():
+    project_uuid = uuid4()
+    scope = pagination_utils.cursor_scope(project_uuid=project_uuid, order=task_schemas.SortOrder.desc)
+    position = (datetime(2024, 1, 1, 12, 30), uuid4())
+    cursor = pagination_utils.encode_cursor(*position, scope)
+
+    assert pagination_utils.decode_cursor(cursor, scope) == position
+
+    for other in (
+        pagination_utils.cursor_scope(project_uuid=project_uuid, order=task_schemas.SortOrder.asc),
+        pagination_utils.cursor_scope(project_uuid=uuid4(), order=task_schemas.SortOrder.desc),
+    ):
+        with pytest.raises(HTTPException) as error:
+            pagination_utils.decode_cursor(cursor, other)
+        assert error.value.status_code == 400
+
+
+def test_damaged_cursor_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        pagination_utils.decode_cursor("not-a-cursor", pagination_utils.cursor_scope())
+    assert error.value.status_code == 400
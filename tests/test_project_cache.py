@@ -0,0 +1,66 @@
+import asyncio
+from uuid import uuid4
+import fakeredis
+import pytest
+from app.core.config import settings
+from app.core.project_cache import CachedResponse, ProjectCache
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Два воркера со своими локальными кэшами и общим Redis."""
+
+    monkeypatch.setattr(settings, "PROJECT_CACHE_REDIS", True)
+    server = fakeredis.FakeServer()
+    caches = []
+    for _ in range(2):
+        cache = ProjectCache()
+        cache._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        caches.append(cache)
+    return caches
+
+
+def make_response(body: str) -> CachedResponse:
+    return CachedResponse(body.encode("utf-8"), f'"{body}"', None)
+
+
+def test_response_read_before_invalidate_in_other_worker_is_not_shared(workers):
+    first, second = workers
+    project_uuid = uuid4()
+    key = first.detail_key(project_uuid)
+
+    async def scenario():
+        # Первый воркер промахнулся и читает проект из БД
+        cached, generation = await first.get(key)
+        assert cached is None
+
+        # Тем временем второй воркер записал задачу и сбросил проект
+        await second.invalidate([project_uuid], "task_update")
+
+        # Ответ, собранный до записи, не должен обслуживать второй воркер
+        await first.set(key, make_response("before"), generation)
+        assert (await second.get(key))[0] is None
+
+        # Следующее чтение после сброса снова кэшируется для всех воркеров
+        cached, generation = await second.get(key)
+        await second.set(key, make_response("after"), generation)
+        assert (await first.get(key))[0].body == b"after"
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_reaches_other_worker_after_local_ttl(workers, monkeypatch):
+    monkeypatch.setattr(settings, "PROJECT_CACHE_LOCAL_TTL_SECONDS", 0.05)
+    first, second = workers
+    key = first.list_key(ProjectCache.SUMMARIES)
+
+    async def scenario():
+        _, generation = await first.get(key)
+        await first.set(key, make_response("before"), generation)
+        assert (await second.get(key))[0].body == b"before"
+
+        await first.invalidate([], "project_create")
+        await asyncio.sleep(0.06)
+        assert (await second.get(key))[0] is None
+
+    asyncio.run(scenario())
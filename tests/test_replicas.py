@@ -0,0 +1,68 @@
+import asyncio
+import fakeredis
+import pytest
+from app.core.config import settings
+from app.core.replicas import RecentWriters, Replica
+
+
+def test_write_in_one_worker_sends_reads_in_another_to_primary(monkeypatch):
+    monkeypatch.setattr(settings, "DB_REPLICA_STICKY_REDIS", True)
+    server = fakeredis.FakeServer()
+    first, second = RecentWriters(), RecentWriters()
+    for writers in (first, second):
+        writers._redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+
+    async def scenario():
+        assert not await second.is_recent(1)
+        await first.mark(1)
+        assert await second.is_recent(1)
+        assert not await second.is_recent(2)
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture(scope="module")
+def client(live_database):
+    """API, у которого основная БД подключена ещё и как реплика: видно, куда ушло чтение."""
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.core import database
+    from main import app
+
+    with TestClient(app) as client:
+        replica = Replica(database.engine, async_sessionmaker(database.engine, class_=AsyncSession, expire_on_commit=False))
+        database.replicas.replicas.append(replica)
+        try:
+            yield client, replica
+        finally:
+            database.replicas.replicas.remove(replica)
+
+
+def signin(client, login: str) -> dict:
+    token = client.post("/user/signin", json={"login": login, "password": login}).json()["token"]
+    client.cookies.clear()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_only_data_writes_make_reads_sticky(client):
+    client, replica = client
+    admin, guest = signin(client, "admin"), signin(client, "guest")
+
+    # Вход в систему ничего не пишет для реплик: чтение сразу после него идёт на реплику
+    reads = replica.reads
+    assert client.get("/task", headers=admin).status_code == 200
+    assert replica.reads == reads + 1
+
+    project = client.post("/project", json={"title": "Replica test", "description": "test"}, headers=admin).json()
+    try:
+        # Клиент с bearer-токеном без cookie видит свою запись: чтение идёт на основную БД
+        reads = replica.reads
+        assert client.get("/task", headers=admin).status_code == 200
+        assert replica.reads == reads
+
+        # Другие пользователи продолжают читать с реплики
+        assert client.get("/task", headers=guest).status_code == 200
+        assert replica.reads == reads + 1
+    finally:
+        client.delete(f"/project/{project['uuid']}", headers=admin)